@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк горячих путей с отслеживанием регрессий
+
+Запуск:
+    python benchmarks/bench_hot_paths.py                   # сравнить с baseline
+    python benchmarks/bench_hot_paths.py --save-baseline   # записать baseline
+    python benchmarks/bench_hot_paths.py --only normalize_phone export_csv --threshold 0.1
+
+Каждый случай гоняется timeit (число вызовов подбирается autorange),
+берётся лучший из --repeat прогонов - время одного вызова. Результат
+сравнивается с benchmarks/baseline.json: если случай медленнее baseline
+больше чем на --threshold (доля, по умолчанию 0.25), скрипт завершается
+с кодом 1 - так его можно ставить в CI.
+
+Абсолютные времена зависят от машины: baseline записывается на той же
+машине (или CI-раннере), где потом идёт сравнение. В JSON сохраняется
+версия Python и платформа, при несовпадении выводится предупреждение.
+
+Работает на отдельной in-memory SQLite базе, рабочую БД не трогает.
+Дашборд считается на --rows заявок (100k), экспорты - на --export-rows (10k).
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+from io import BytesIO
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django
+from django.conf import settings
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'baseline.json'
+
+
+def setup_database():
+    settings.DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def make_rows(count):
+    from hair_app.models import HairApplication
+    statuses = [code for code, _ in HairApplication.STATUS_CHOICES]
+    HairApplication.objects.bulk_create([
+        HairApplication(
+            length='50-60', color='блонд', structure='славянка',
+            age='взрослые', condition='натуральные',
+            name=f'Bench {i}', phone='+7 (911) 957-17-12',
+            email='bench@example.com', city='Москва',
+            status=statuses[i % len(statuses)],
+            estimated_price=35000,
+            final_price=33000 if i % 3 == 0 else None,
+        )
+        for i in range(count)
+    ], batch_size=5000)
+
+
+def make_photo():
+    from PIL import Image
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    file = BytesIO()
+    Image.new('RGB', (60, 40), color='red').save(file, 'JPEG')
+    return SimpleUploadedFile('photo.jpg', file.getvalue(), content_type='image/jpeg')
+
+
+# ====================
+# СЛУЧАИ
+# ====================
+
+def build_cases(export_rows):
+    from hair_app.admin_utils import export_applications_to_csv, export_applications_to_excel
+    from hair_app.admin_views import get_dashboard_stats
+    from hair_app.models import HairApplication, normalize_phone
+    from hair_app.price_calculator import calculate_hair_price
+    from hair_app.serializers import HairApplicationSerializer
+    from telegram_bot.formatters import format_application_full
+
+    app = HairApplication.objects.order_by('id').first()
+    app.comment = 'Волосы не крашены, стрижка в прошлом году'
+    export_queryset = HairApplication.objects.order_by('id')[:export_rows]
+    form = {
+        'length': '60-80', 'color': 'русые', 'structure': 'среднее',
+        'age': 'взрослые', 'condition': 'натуральные',
+        'name': 'Анна', 'phone': '8 911 957 17 12', 'city': 'Москва',
+    }
+
+    def serializer_validation():
+        serializer = HairApplicationSerializer(data={**form, 'photo1': make_photo()})
+        assert serializer.is_valid(), serializer.errors
+
+    def model_save():
+        app.status = 'viewed' if app.status == 'new' else 'new'
+        app.save()
+
+    return {
+        'calculate_hair_price': lambda: calculate_hair_price(65, 'русые', 'среднее', 'натуральные', 'взрослые'),
+        'normalize_phone': lambda: normalize_phone('8 (911) 957-17-12'),
+        'serializer_validation': serializer_validation,
+        'model_save': model_save,
+        'export_csv': lambda: export_applications_to_csv(export_queryset),
+        'export_xlsx': lambda: export_applications_to_excel(export_queryset),
+        'dashboard_stats': get_dashboard_stats,
+        'format_application_full': lambda: format_application_full(app),
+    }
+
+
+def measure(func, repeat):
+    """Лучшее время одного вызова из repeat прогонов, секунды"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+# ====================
+# BASELINE
+# ====================
+
+def machine_info():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+    }
+
+
+def load_baseline(path):
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def save_baseline(path, results):
+    data = {'machine': machine_info(), 'results': results}
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+    print(f'Baseline saved: {path}')
+
+
+def format_time(seconds):
+    if seconds < 1e-3:
+        return f'{seconds * 1e6:.1f} µs'
+    if seconds < 1:
+        return f'{seconds * 1e3:.2f} ms'
+    return f'{seconds:.2f} s'
+
+
+def compare(results, baseline, threshold):
+    """Печатает таблицу, возвращает список регрессий"""
+    regressions = []
+    print(f'{"case":<28} {"time":>12} {"baseline":>12} {"change":>9}')
+    for name, seconds in results.items():
+        base = (baseline or {}).get('results', {}).get(name)
+        if base is None:
+            print(f'{name:<28} {format_time(seconds):>12} {"-":>12} {"new":>9}')
+            continue
+        change = seconds / base - 1
+        mark = ''
+        if change > threshold:
+            mark = '  REGRESSION'
+            regressions.append(name)
+        print(f'{name:<28} {format_time(seconds):>12} {format_time(base):>12} {change:>+8.1%}{mark}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000, help='Заявок в базе для дашборда')
+    parser.add_argument('--export-rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='+', help='Запустить только эти случаи')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Допустимое замедление (0.25 = +25%%)')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='Записать результаты как baseline')
+    args = parser.parse_args()
+
+    setup_database()
+    make_rows(args.rows)
+    cases = build_cases(args.export_rows)
+
+    names = args.only or list(cases)
+    unknown = set(names) - set(cases)
+    if unknown:
+        parser.error(f'Unknown cases: {", ".join(sorted(unknown))}. Available: {", ".join(cases)}')
+
+    results = {name: measure(cases[name], args.repeat) for name in names}
+
+    baseline = load_baseline(args.baseline)
+    if baseline and baseline.get('machine') != machine_info():
+        print(f'Warning: baseline recorded on {baseline.get("machine")}, timings are not comparable')
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.save_baseline:
+        # --only обновляет только выбранные случаи
+        merged = {**(baseline or {}).get('results', {}), **results}
+        save_baseline(args.baseline, merged)
+        return
+    if regressions:
+        print(f'\n{len(regressions)} regression(s) over {args.threshold:.0%}: {", ".join(regressions)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
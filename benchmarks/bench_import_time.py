@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Время импорта модулей Telegram-бота (python -X importtime)
+
+Запуск:
+    python benchmarks/bench_import_time.py [--repeat 5] [--top 10]
+
+Каждый модуль импортируется в чистом процессе. Для модулей, которым нужны
+модели, Django настраивается заранее и в замер не входит - считается только
+то, что добавляет сам импорт (поэтому время django.setup() видно отдельно).
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# (модуль, нужен ли django.setup() до импорта)
+MODULES = (
+    ('telegram_bot.bot', False),
+    ('telegram_bot.client', True),
+    ('telegram_bot.formatters', False),
+    ('telegram_bot.keyboards', False),
+    ('telegram_bot.senders', True),
+    ('telegram_bot.handlers', True),
+    ('telegram_bot.webhook', True),
+)
+
+DJANGO_SETUP = 'import django; django.setup(); '
+
+
+def import_times(module, with_django):
+    """{модуль: cumulative us} для всех импортов, вызванных import module"""
+    code = (DJANGO_SETUP if with_django else '') + f'import sys; sys.stderr.write("-- start\\n"); import {module}'
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='config.settings', PYTHONPATH=str(BASE_DIR))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    stderr = result.stderr.split('-- start\n', 1)[1]
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        times[name.strip()] = int(cumulative_us)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=0, help='Показать самые тяжёлые вложенные импорты')
+    args = parser.parse_args()
+
+    print(f'{"module":<28} {"import, ms":>10}')
+    for module, with_django in MODULES:
+        best = min(import_times(module, with_django)[module] for _ in range(args.repeat))
+        print(f'{module:<28} {best / 1000:>10.1f}')
+        if args.top:
+            times = import_times(module, with_django)
+            heavy = sorted(
+                ((us, name) for name, us in times.items() if name != module and '.' not in name),
+                reverse=True
+            )[:args.top]
+            for us, name in heavy:
+                print(f'    {name:<24} {us / 1000:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк HairApplication.save(): сохранений в секунду
+
+Запуск:
+    python benchmarks/bench_model_save.py [--rows 2000] [--repeat 5]
+
+Работает на отдельной in-memory SQLite базе, рабочую БД не трогает.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django
+from django.conf import settings
+
+
+def setup_database():
+    settings.DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def make_rows(count):
+    from hair_app.models import HairApplication
+    HairApplication.objects.bulk_create([
+        HairApplication(
+            length='50-60', color='блонд', structure='славянка',
+            age='взрослые', condition='натуральные',
+            name=f'Bench {i}', phone='+79119571712', estimated_price=35000,
+        )
+        for i in range(count)
+    ])
+    return list(HairApplication.objects.all())
+
+
+def bench(label, apps, save, repeat):
+    # Лучший из нескольких прогонов - меньше шума от диска и GC
+    best = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for app in apps:
+            save(app)
+        elapsed = time.perf_counter() - start
+        best = max(best, len(apps) / elapsed)
+    print(f'{label:<40} {best:>10.0f} saves/sec')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_database()
+    apps = make_rows(args.rows)
+
+    def status_save(app):
+        app.status = 'viewed' if app.status == 'new' else 'new'
+        app.save()
+
+    def status_save_update_fields(app):
+        app.status = 'viewed' if app.status == 'new' else 'new'
+        app.save(update_fields=['status', 'updated_at'])
+
+    def phone_save(app):
+        app.phone = '89119571712' if app.phone != '89119571712' else '+79119571712'
+        app.save()
+
+    bench('status change, save()', apps, status_save, args.repeat)
+    bench('status change, save(update_fields=...)', apps, status_save_update_fields, args.repeat)
+    bench('phone change, save()', apps, phone_save, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
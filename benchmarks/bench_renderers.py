@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк JSON-рендеринга: JSONRenderer (stdlib json) против ORJSONRenderer
+
+Запуск:
+    python benchmarks/bench_renderers.py [--rows 5000] [--repeat 200]
+
+Payload'ы:
+    applications page - страница /api/applications/ (PAGE_SIZE строк)
+    applications all  - --rows строк списка заявок
+    dashboard         - /api/admin/dashboard/ + /api/admin/chart/ + /api/admin/recent/
+Работает на отдельной in-memory SQLite базе, рабочую БД не трогает.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django
+from django.conf import settings
+
+
+def setup_database():
+    settings.DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def make_rows(count):
+    from hair_app.models import HairApplication
+    HairApplication.objects.bulk_create([
+        HairApplication(
+            length='50-60', color='блонд', structure='славянка',
+            age='взрослые', condition='натуральные',
+            photo1=f'applications/2025/01/01/bench_{i}.jpg',
+            name=f'Bench {i}', phone='+7 (911) 957-17-12',
+            email='bench@example.com', city='Москва',
+            comment='Волосы не крашены, длина по срезу',
+            estimated_price=35000,
+        )
+        for i in range(count)
+    ], batch_size=5000)
+
+
+def build_payloads():
+    from hair_app.admin_views import get_dashboard_stats, get_chart_data
+    from hair_app.models import HairApplication
+    from hair_app.serializers import HairApplicationFastSerializer
+
+    rows = HairApplicationFastSerializer().serialize(HairApplication.objects.all())
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    recent = [
+        {
+            'id': row['id'], 'name': row['name'], 'phone': row['phone'],
+            'status': row['status'], 'created_at': row['created_at'],
+            'estimated_price': row['estimated_price'],
+        }
+        for row in rows[:10]
+    ]
+    return {
+        'applications page': {
+            'count': len(rows), 'next': None, 'previous': None,
+            'results': rows[:page_size],
+        },
+        'applications all': rows,
+        'dashboard': {
+            'stats': get_dashboard_stats(),
+            'chart': get_chart_data(),
+            'recent': {'applications': recent},
+        },
+    }
+
+
+def bench(label, render, data, repeat):
+    # Лучший из нескольких прогонов - меньше шума от GC
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = render(data)
+        best = min(best, time.perf_counter() - start)
+    print(f'{label:<44} {best * 1e6:>12.1f} us {len(body):>10} bytes')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_database()
+    make_rows(args.rows)
+
+    from rest_framework.renderers import JSONRenderer
+    from hair_app.renderers import ORJSONRenderer
+
+    for name, data in build_payloads().items():
+        repeat = max(3, args.repeat // 50) if name == 'applications all' else args.repeat
+        bench(f'{name}: JSONRenderer', JSONRenderer().render, data, repeat)
+        bench(f'{name}: ORJSONRenderer', ORJSONRenderer().render, data, repeat)
+
+
+if __name__ == '__main__':
+    main()
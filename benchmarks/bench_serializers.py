@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк сериализации списков: ModelSerializer + JSONRenderer
+против FastModelSerializer + ORJSONRenderer
+
+Запуск:
+    python benchmarks/bench_serializers.py [--sizes 75 100000] [--repeat 3]
+
+75 строк - размер прайс-листа, 100k - выгрузка всех заявок.
+Работает на отдельной in-memory SQLite базе, рабочую БД не трогает.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django
+from django.conf import settings
+
+
+def setup_database():
+    settings.DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def make_rows(count):
+    from hair_app.models import HairApplication
+    HairApplication.objects.all().delete()
+    HairApplication.objects.bulk_create([
+        HairApplication(
+            length='50-60', color='блонд', structure='славянка',
+            age='взрослые', condition='натуральные',
+            photo1=f'applications/2025/01/01/bench_{i}.jpg',
+            name=f'Bench {i}', phone='+7 (911) 957-17-12',
+            email='bench@example.com', city='Москва',
+            estimated_price=35000,
+        )
+        for i in range(count)
+    ], batch_size=5000)
+
+
+def drf_path():
+    from rest_framework.renderers import JSONRenderer
+    from hair_app.models import HairApplication
+    from hair_app.serializers import HairApplicationSerializer
+    data = HairApplicationSerializer(HairApplication.objects.all(), many=True).data
+    return JSONRenderer().render(data)
+
+
+def fast_path():
+    from hair_app.models import HairApplication
+    from hair_app.renderers import ORJSONRenderer
+    from hair_app.serializers import HairApplicationFastSerializer
+    data = HairApplicationFastSerializer().serialize(HairApplication.objects.all())
+    return ORJSONRenderer().render(data)
+
+
+def bench(label, rows, func, repeat):
+    # Лучший из нескольких прогонов - меньше шума от GC
+    best = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = max(best, rows / elapsed)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{label:<28} {best:>12.0f} rows/sec {peak / 1024 / 1024:>9.1f} MiB peak')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[75, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    setup_database()
+    for size in args.sizes:
+        make_rows(size)
+        print(f'--- {size} rows')
+        bench('ModelSerializer + json', size, drf_path, args.repeat)
+        bench('FastSerializer + orjson', size, fast_path, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
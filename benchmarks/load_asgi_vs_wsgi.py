@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Нагрузочный тест: gunicorn sync-воркеры (WSGI) против uvicorn-воркеров (ASGI)
+
+Запуск:
+    python benchmarks/load_asgi_vs_wsgi.py [--workers 4] [--concurrency 64] [--duration 10]
+
+Оба сервера поднимаются на временной SQLite базе (SQLITE_PATH) с одинаковым
+числом воркеров; лимиты DRF на время теста сняты. Клиент - aiohttp,
+держит --concurrency запросов в полёте по смеси endpoints.
+Можно указать уже запущенные серверы: --wsgi-url / --asgi-url.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+CALCULATOR_DATA = {
+    'length': '50-60', 'color': 'блонд', 'structure': 'славянка',
+    'age': 'взрослые', 'condition': 'натуральные',
+}
+
+# (метод, путь, JSON-тело)
+SCENARIO = (
+    ('GET', '/api/price-list/', None),
+    ('POST', '/api/calculate-price/', CALCULATOR_DATA),
+    ('GET', '/api/admin/dashboard/', None),
+    ('GET', '/api/admin/recent/', None),
+)
+
+SERVERS = {
+    'wsgi': ['config.wsgi:application', '--worker-class', 'sync'],
+    'asgi': ['config.asgi:application', '--worker-class', 'uvicorn_worker.UvicornWorker'],
+}
+
+
+def server_env(db_path):
+    env = dict(os.environ)
+    env.update({
+        'SQLITE_PATH': db_path,
+        'API_THROTTLE_ANON': '1000000/s',
+        'API_THROTTLE_USER': '1000000/s',
+        'DJANGO_SETTINGS_MODULE': 'config.settings',
+    })
+    return env
+
+
+def prepare_database(db_path):
+    env = server_env(db_path)
+    subprocess.run([sys.executable, 'manage.py', 'migrate', '--verbosity', '0'], cwd=BASE_DIR, env=env, check=True)
+    seed = (
+        'from hair_app.models import PriceList, HairApplication\n'
+        'PriceList.objects.bulk_create([PriceList(length="50-60", color=c, structure=s, condition="натуральные", base_price=30000)\n'
+        '    for c, _ in PriceList._meta.get_field("color").choices for s, _ in PriceList._meta.get_field("structure").choices],\n'
+        '    ignore_conflicts=True)\n'
+        'HairApplication.objects.bulk_create([HairApplication(length="50-60", color="блонд", structure="славянка",\n'
+        '    age="взрослые", condition="натуральные", name=f"Load {i}", phone="+7 (911) 957-17-12",\n'
+        '    estimated_price=35000) for i in range(500)])\n'
+    )
+    subprocess.run([sys.executable, 'manage.py', 'shell', '-c', seed], cwd=BASE_DIR, env=env, check=True)
+
+
+def start_server(kind, port, workers, db_path):
+    cmd = [
+        sys.executable, '-m', 'gunicorn', *SERVERS[kind],
+        '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--log-level', 'warning',
+    ]
+    return subprocess.Popen(cmd, cwd=BASE_DIR, env=server_env(db_path))
+
+
+async def wait_ready(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(url + '/api/price-list/') as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.3)
+    raise RuntimeError(f'{url} did not start in {timeout}s')
+
+
+async def run_load(url, concurrency, duration):
+    latencies = []
+    errors = 0
+    requests = itertools.cycle(SCENARIO)
+    deadline = time.monotonic() + duration
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async def client():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                method, path, body = next(requests)
+                start = time.perf_counter()
+                try:
+                    async with session.request(method, url + path, json=body) as response:
+                        await response.read()
+                        if response.status >= 400:
+                            errors += 1
+                except aiohttp.ClientError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        started = time.monotonic()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50': percentile(0.50),
+        'p95': percentile(0.95),
+        'p99': percentile(0.99),
+        'errors': errors,
+    }
+
+
+def report(kind, result):
+    print(
+        f'{kind:<6} {result["rps"]:>9.0f} req/s   '
+        f'p50 {result["p50"]:>7.1f} ms   p95 {result["p95"]:>7.1f} ms   '
+        f'p99 {result["p99"]:>7.1f} ms   errors {result["errors"]}'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--wsgi-url')
+    parser.add_argument('--asgi-url')
+    args = parser.parse_args()
+
+    urls = {'wsgi': args.wsgi_url, 'asgi': args.asgi_url}
+    processes = []
+    tmpdir = tempfile.TemporaryDirectory()
+    try:
+        if not all(urls.values()):
+            db_path = os.path.join(tmpdir.name, 'load.sqlite3')
+            prepare_database(db_path)
+            for port, kind in enumerate(SERVERS, start=18801):
+                if not urls[kind]:
+                    processes.append(start_server(kind, port, args.workers, db_path))
+                    urls[kind] = f'http://127.0.0.1:{port}'
+
+        print(f'workers={args.workers} concurrency={args.concurrency} duration={args.duration}s')
+        for kind, url in urls.items():
+            asyncio.run(wait_ready(url))
+            report(kind, asyncio.run(run_load(url, args.concurrency, args.duration)))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+        tmpdir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Нагрузочный сценарий пути заявки: лендинг, калькулятор, отправка с фото, дашборд
+
+Запуск против docker-compose (nginx на :80):
+    docker compose up -d
+    docker compose exec web python manage.py generate_applications 100000
+    python benchmarks/load_pipeline.py --url http://localhost \\
+        --admin-user admin --admin-password secret [--concurrency 32] [--duration 60]
+
+Лимиты DRF на время теста поднять в .env (иначе будут 429):
+    API_THROTTLE_ANON=1000000/s
+    API_THROTTLE_USER=1000000/s
+
+Клиенты (aiohttp) держат --concurrency запросов в полёте; каждый запрос
+выбирается по весам SCENARIO. Дашборд открывается под staff-сессией
+(/admin/), без --admin-user - JSON-статистика /api/admin/dashboard/.
+Итог - запросов в секунду и перцентили задержки по каждому шагу и в сумме.
+"""
+import argparse
+import asyncio
+import random
+import re
+import time
+from collections import defaultdict
+from io import BytesIO
+
+import aiohttp
+from PIL import Image
+
+CALCULATOR_DATA = {
+    'length': '60-80', 'color': 'русые', 'structure': 'среднее',
+    'age': 'взрослые', 'condition': 'натуральные',
+}
+
+APPLICATION_DATA = {
+    **CALCULATOR_DATA,
+    'name': 'Нагрузка',
+    'phone': '+7 (911) 957-17-12',
+    'city': 'Москва',
+}
+
+# (шаг, вес) - доли близки к реальному трафику: фото отправляет малая часть посетителей
+SCENARIO = (
+    ('landing', 35),
+    ('calculator', 30),
+    ('price_list', 15),
+    ('submit', 10),
+    ('dashboard', 10),
+)
+
+CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+def make_photo():
+    """JPEG ~ фото после уменьшения в браузере (шум - чтобы не сжимался в ноль)"""
+    image = Image.effect_noise((768, 1024), 40).convert('RGB')
+    file = BytesIO()
+    image.save(file, 'JPEG', quality=80)
+    return file.getvalue()
+
+
+async def admin_login(session, url, username, password):
+    async with session.get(url + '/admin/login/') as response:
+        page = await response.text()
+    match = CSRF_RE.search(page)
+    if not match:
+        raise RuntimeError('CSRF token not found on /admin/login/')
+    form = {
+        'csrfmiddlewaretoken': match.group(1),
+        'username': username,
+        'password': password,
+        'next': '/admin/',
+    }
+    headers = {'Referer': url + '/admin/login/'}
+    async with session.post(url + '/admin/login/', data=form, headers=headers, allow_redirects=False) as response:
+        if response.status != 302:
+            raise RuntimeError(f'Admin login failed: HTTP {response.status}')
+
+
+class Steps:
+    """Запросы сценария; каждый возвращает HTTP-статус"""
+
+    def __init__(self, url, session, admin_session, photo):
+        self.url = url
+        self.session = session
+        self.admin_session = admin_session
+        self.photo = photo
+
+    async def fetch(self, session, method, path, **kwargs):
+        async with session.request(method, self.url + path, **kwargs) as response:
+            await response.read()
+            return response.status
+
+    async def landing(self):
+        return await self.fetch(self.session, 'GET', '/')
+
+    async def calculator(self):
+        return await self.fetch(self.session, 'POST', '/api/calculate-price/', json=CALCULATOR_DATA)
+
+    async def price_list(self):
+        return await self.fetch(self.session, 'GET', '/api/price-list/')
+
+    async def submit(self):
+        form = aiohttp.FormData()
+        for key, value in APPLICATION_DATA.items():
+            form.add_field(key, value)
+        form.add_field('photo1', self.photo, filename='photo.jpg', content_type='image/jpeg')
+        return await self.fetch(self.session, 'POST', '/api/applications/', data=form)
+
+    async def dashboard(self):
+        if self.admin_session:
+            return await self.fetch(self.admin_session, 'GET', '/admin/')
+        return await self.fetch(self.session, 'GET', '/api/admin/dashboard/')
+
+
+async def run_load(args):
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    names, weights = zip(*SCENARIO)
+    rng = random.Random(args.seed)
+    connector = aiohttp.TCPConnector(limit=args.concurrency * 2)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+
+    # unsafe: куки и для --url с IP-адресом (127.0.0.1)
+    session_options = {'connector': connector, 'connector_owner': False, 'timeout': timeout}
+    async with aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True), **session_options) as session, \
+            aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True), **session_options) as admin_session:
+        if args.admin_user:
+            await admin_login(admin_session, args.url, args.admin_user, args.admin_password)
+        steps = Steps(args.url, session, admin_session if args.admin_user else None, make_photo())
+        deadline = time.monotonic() + args.duration
+
+        async def client():
+            while time.monotonic() < deadline:
+                name = rng.choices(names, weights)[0]
+                start = time.perf_counter()
+                try:
+                    status = await getattr(steps, name)()
+                    if status >= 400:
+                        errors[(name, status)] += 1
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    errors[(name, type(e).__name__)] += 1
+                latencies[name].append(time.perf_counter() - start)
+
+        started = time.monotonic()
+        await asyncio.gather(*(client() for _ in range(args.concurrency)))
+        elapsed = time.monotonic() - started
+    await connector.close()
+    return latencies, errors, elapsed
+
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+
+def report(latencies, errors, elapsed):
+    print(f'{"step":<12} {"requests":>9} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"max ms":>8}')
+    rows = dict(latencies)
+    rows['total'] = [value for values in latencies.values() for value in values]
+    for name, values in rows.items():
+        if not values:
+            continue
+        values.sort()
+        print(
+            f'{name:<12} {len(values):>9} {len(values) / elapsed:>8.1f} '
+            f'{percentile(values, 0.50):>8.1f} {percentile(values, 0.95):>8.1f} '
+            f'{percentile(values, 0.99):>8.1f} {values[-1] * 1000:>8.1f}'
+        )
+    if errors:
+        print('\nerrors:')
+        for (name, reason), count in sorted(errors.items(), key=lambda item: -item[1]):
+            print(f'  {name:<12} {reason!s:<20} {count}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://localhost', help='nginx из docker-compose или gunicorn напрямую')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--timeout', type=float, default=30, help='Таймаут запроса, с')
+    parser.add_argument('--admin-user')
+    parser.add_argument('--admin-password')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+    args.url = args.url.rstrip('/')
+
+    print(f'{args.url} concurrency={args.concurrency} duration={args.duration}s')
+    report(*asyncio.run(run_load(args)))
+
+
+if __name__ == '__main__':
+    main()
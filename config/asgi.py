@@ -1,5 +1,10 @@
 """
 ASGI config for hair purchase site project.
+
+Production (uvicorn-воркеры под gunicorn):
+    GUNICORN_WORKER_CLASS=uvicorn gunicorn -c gunicorn.conf.py
+
+В этом режиме API обслуживают async-версии views (settings.ASYNC_VIEWS).
 """
 
 import os
@@ -7,5 +12,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
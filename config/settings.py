@@ -7,6 +7,7 @@ Python 3.12+
 import os
 from pathlib import Path
 from decouple import config, Csv
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -41,6 +42,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'hair_app.middleware.PerformanceMiddleware',
+    'hair_app.middleware.ProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -50,6 +53,16 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Разработка: число SQL и N+1 в заголовках X-Query-Count / X-N-Plus-One и в логе
+# (hair_app/querybudget.py); N+1 - одинаковый SQL больше QUERY_REPEAT_THRESHOLD раз
+QUERY_INSPECTOR = config('QUERY_INSPECTOR', default=DEBUG, cast=bool)
+QUERY_REPEAT_THRESHOLD = config('QUERY_REPEAT_THRESHOLD', default=5, cast=int)
+if QUERY_INSPECTOR:
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('hair_app.middleware.PerformanceMiddleware') + 1,
+        'hair_app.middleware.QueryInspectorMiddleware',
+    )
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -77,10 +90,29 @@ ASGI_APPLICATION = 'config.asgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': config('SQLITE_PATH', default=str(BASE_DIR / 'db.sqlite3')),
+        # Секунды жизни соединения; процесс бота включает сам (пул потоков БД)
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=0, cast=int),
     }
 }
 
+# Cache
+# Redis из docker-compose (общий для всех gunicorn-воркеров), иначе память процесса
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -113,6 +145,20 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Кеш миниатюр фото для админки
+THUMBNAIL_CACHE_DIR = config('THUMBNAIL_CACHE_DIR', default=str(MEDIA_ROOT / 'thumbnails'))
+
+# Фото заявок: форма уменьшает их в браузере до PHOTO_MAX_DIMENSION по длинной
+# стороне; крупнее (клиент без canvas) - уменьшаются на сервере
+PHOTO_MAX_DIMENSION = config('PHOTO_MAX_DIMENSION', default=2048, cast=int)
+PHOTO_MAX_UPLOAD_SIZE = config('PHOTO_MAX_UPLOAD_SIZE', default=10 * 1024 * 1024, cast=int)
+
+# Загрузка фото частями (/api/uploads/): незавершённые файлы - вне MEDIA_ROOT,
+# nginx их не раздаёт; брошенные удаляет manage.py cleanup_uploads
+UPLOAD_TEMP_DIR = config('UPLOAD_TEMP_DIR', default=str(BASE_DIR / 'upload_tmp'))
+UPLOAD_CHUNK_SIZE = config('UPLOAD_CHUNK_SIZE', default=1024 * 1024, cast=int)
+UPLOAD_TTL_HOURS = config('UPLOAD_TTL_HOURS', default=24, cast=int)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -124,9 +170,14 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # orjson по умолчанию; HTML Browsable API - только в DEBUG
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
+        'hair_app.renderers.ORJSONRenderer',
+    ] + (['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
+    'DEFAULT_PARSER_CLASSES': [
+        'hair_app.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     # ➕ Rate limiting to prevent DDoS attacks
@@ -135,14 +186,35 @@ REST_FRAMEWORK = {
         'rest_framework.throttling.UserRateThrottle'
     ],
     'DEFAULT_THROTTLE_RATES': {
-        'anon': '100/hour',      # 100 requests per hour for anonymous users
-        'user': '1000/hour'      # 1000 requests per hour for authenticated users
+        'anon': config('API_THROTTLE_ANON', default='100/hour'),   # 100 requests per hour for anonymous users
+        'user': config('API_THROTTLE_USER', default='1000/hour'),  # 1000 requests per hour for authenticated users
+        'uploads': config('API_THROTTLE_UPLOADS', default='600/hour'),  # chunks of /api/uploads/
     }
 }
 
+# Замер запросов (hair_app/middleware.py) и /metrics (hair_app/metrics.py)
+PERF_SERVER_TIMING = config('PERF_SERVER_TIMING', default=True, cast=bool)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+# За nginx на том же хосте все запросы приходят с 127.0.0.1 - по умолчанию пусто,
+# доступ только staff или по METRICS_TOKEN; IP указывать, только если прокси нет
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='', cast=Csv())
+# Общий каталог снимков для нескольких воркеров; пусто - метрики одного процесса
+METRICS_DIR = config('METRICS_DIR', default='')
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=1.0, cast=float)
+
+# Профилирование запросов (hair_app/profiling.py): токен staff из админки
+# или выборка доли запросов; профили - в MEDIA_ROOT/profiles/
+PROFILE_SAMPLE_RATE = config('PROFILE_SAMPLE_RATE', default=0.0, cast=float)
+PROFILE_TOKEN_MAX_AGE = config('PROFILE_TOKEN_MAX_AGE', default=60 * 60, cast=int)
+PROFILE_MAX_COUNT = config('PROFILE_MAX_COUNT', default=200, cast=int)
+
+# ASGI-режим: async-версии API (hair_app/async_views.py). config/asgi.py включает сам
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+
 # CORS Settings
 CORS_ALLOW_ALL_ORIGINS = config('CORS_ALLOW_ALL', default=True, cast=bool)
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
 
 # CSRF Settings
 CSRF_TRUSTED_ORIGINS = [
@@ -175,6 +247,13 @@ EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@hair-purchase.ru')
 ADMIN_EMAIL = config('ADMIN_EMAIL', default='admin@hair-purchase.ru')
 
+# Сколько хранить ответ для Idempotency-Key (секунды).
+# Без REDIS_URL ответы в памяти процесса - повтор в другом воркере не узнаётся
+IDEMPOTENCY_KEY_TTL = config('IDEMPOTENCY_KEY_TTL', default=60 * 60 * 24, cast=int)
+
+# Повторная заявка с тем же телефоном/email в этом окне считается дублем
+DUPLICATE_APPLICATION_WINDOW_HOURS = config('DUPLICATE_APPLICATION_WINDOW_HOURS', default=24, cast=int)
+
 # Yandex Metrika
 YANDEX_METRIKA_ID = config('YANDEX_METRIKA_ID', default='')
 
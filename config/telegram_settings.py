@@ -6,6 +6,9 @@ from decouple import config
 # Telegram Bot Token
 TELEGRAM_BOT_TOKEN = config('TELEGRAM_BOT_TOKEN', default='')
 
+# Чат, куда бот присылает уведомления о новых заявках
+TELEGRAM_ADMIN_CHAT_ID = config('TELEGRAM_ADMIN_CHAT_ID', default='')
+
 # Main admin Telegram ID
 TELEGRAM_MAIN_ADMIN_ID = config('TELEGRAM_MAIN_ADMIN_ID', default=0, cast=int)
 
@@ -13,3 +16,15 @@ TELEGRAM_MAIN_ADMIN_ID = config('TELEGRAM_MAIN_ADMIN_ID', default=0, cast=int)
 TELEGRAM_USE_WEBHOOK = config('TELEGRAM_USE_WEBHOOK', default=False, cast=bool)
 TELEGRAM_WEBHOOK_URL = config('TELEGRAM_WEBHOOK_URL', default='')
 TELEGRAM_WEBHOOK_PATH = config('TELEGRAM_WEBHOOK_PATH', default='/telegram/webhook')
+
+# Секрет для заголовка X-Telegram-Bot-Api-Secret-Token (передаётся в setWebhook)
+TELEGRAM_WEBHOOK_SECRET = config('TELEGRAM_WEBHOOK_SECRET', default='')
+
+# Сколько апдейтов webhook обрабатывается одновременно в одном процессе
+TELEGRAM_WEBHOOK_CONCURRENCY = config('TELEGRAM_WEBHOOK_CONCURRENCY', default=8, cast=int)
+
+# Пул потоков для запросов к БД из обработчиков бота
+TELEGRAM_DB_WORKERS = config('TELEGRAM_DB_WORKERS', default=4, cast=int)
+
+# Обработчики медленнее этого порога пишутся в лог (WARNING)
+TELEGRAM_SLOW_HANDLER_MS = config('TELEGRAM_SLOW_HANDLER_MS', default=1000, cast=int)
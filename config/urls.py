@@ -10,8 +10,10 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
     SpectacularRedocView
 )
-from hair_app import admin_views_export
+from hair_app import admin_views_export, admin_views_media, admin_views_stream
+from hair_app.metrics import metrics_view
 from hair_app.admin import custom_admin_site
+from telegram_bot.webhook import telegram_webhook
 
 urlpatterns = [
     # Admin Export URLs
@@ -19,6 +21,18 @@ urlpatterns = [
     path('admin/export/applications/excel/', admin_views_export.export_applications_excel, name='export-applications-excel'),
     path('admin/export/prices/excel/', admin_views_export.export_prices_excel, name='export-prices-excel'),
     
+    # Admin photo thumbnails
+    path('admin/thumbnails/<int:app_id>/<str:field>/<int:size>/', admin_views_media.photo_thumbnail, name='photo-thumbnail'),
+    
+    # Prometheus metrics (staff / METRICS_ALLOWED_IPS / METRICS_TOKEN)
+    path('metrics', metrics_view, name='metrics'),
+    
+    # Live dashboard updates (SSE)
+    path('admin/events/', admin_views_stream.dashboard_events, name='dashboard-events'),
+    
+    # Telegram webhook (TELEGRAM_USE_WEBHOOK)
+    path(settings.TELEGRAM_WEBHOOK_PATH.lstrip('/'), telegram_webhook, name='telegram-webhook'),
+    
     # Custom Admin with Dashboard
     path('admin/', custom_admin_site.urls),
     
@@ -44,7 +44,7 @@ sleep 2
 
 # Start gunicorn
 echo "Starting Gunicorn..."
-gunicorn --workers 3 --bind 0.0.0.0:8000 --timeout 120 config.wsgi:application &
+gunicorn -c gunicorn.conf.py &
 sleep 3
 
 # Restart nginx
@@ -0,0 +1,143 @@
+"""
+Настройки gunicorn (подхватываются из текущего каталога или: gunicorn -c gunicorn.conf.py)
+
+Всё задаётся переменными окружения:
+    GUNICORN_WORKER_CLASS   gthread (по умолчанию) | uvicorn | sync
+    GUNICORN_WORKERS        число воркеров; по умолчанию - от доступных CPU
+    GUNICORN_THREADS        потоков на воркер gthread (4)
+    GUNICORN_APP            WSGI/ASGI-приложение; по умолчанию - по классу воркера
+    GUNICORN_PRELOAD        загрузить Django в master до fork (True)
+    GUNICORN_MAX_REQUESTS   перезапуск воркера после N запросов (1000, 0 - выкл.)
+    GUNICORN_MAX_REQUESTS_JITTER  разброс, чтобы воркеры не перезапускались разом (100)
+    GUNICORN_TIMEOUT, GUNICORN_BIND, GUNICORN_LOG_LEVEL
+
+uvicorn - ASGI-режим (config.asgi, async-views). С preload код
+перечитывается только полным рестартом (HUP перезапускает воркеры из
+того же образа приложения).
+
+После fork каждый воркер сбрасывает унаследованное от master: соединения
+с БД, event loop уведомлений (hair_app.tasks) и пул БД бота. Снимок
+метрик завершившегося воркера master переносит в архив (hair_app.metrics).
+"""
+import os
+
+WORKER_CLASSES = {
+    'sync': 'sync',
+    'gthread': 'gthread',
+    'uvicorn': 'uvicorn_worker.UvicornWorker',
+}
+
+APPS = {
+    'uvicorn': 'config.asgi:application',
+}
+DEFAULT_APP = 'config.wsgi:application'
+
+
+def env(name, default):
+    """Пустая переменная (из шаблона .env) - как незаданная"""
+    return os.environ.get(name) or default
+
+
+def env_bool(name, default):
+    return str(env(name, default)).lower() in ('1', 'true', 'yes', 'on')
+
+
+def available_cpus():
+    """CPU, доступные процессу: affinity и квота cgroup v2 (docker --cpus)"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as file:
+            quota, period = file.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def default_workers(kind, cpus):
+    """sync ждёт I/O процессом, gthread - потоками, uvicorn - корутинами"""
+    if kind == 'sync':
+        return cpus * 2 + 1
+    if kind == 'gthread':
+        return cpus + 1
+    return cpus
+
+
+worker_kind = env('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_kind not in WORKER_CLASSES:
+    raise RuntimeError(f'GUNICORN_WORKER_CLASS must be one of: {", ".join(WORKER_CLASSES)}')
+
+wsgi_app = env('GUNICORN_APP', APPS.get(worker_kind, DEFAULT_APP))
+worker_class = WORKER_CLASSES[worker_kind]
+workers = int(env('GUNICORN_WORKERS', 0)) or default_workers(worker_kind, available_cpus())
+threads = int(env('GUNICORN_THREADS', 4)) if worker_kind == 'gthread' else 1
+
+bind = env('GUNICORN_BIND', '0.0.0.0:8000')
+preload_app = env_bool('GUNICORN_PRELOAD', True)
+
+# Утечки и фрагментация памяти ограничены перезапуском воркера
+max_requests = int(env('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(env('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(env('GUNICORN_TIMEOUT', 120))
+# Уведомления дожидаются в worker_exit (hair_app.tasks.SHUTDOWN_TIMEOUT)
+graceful_timeout = 30
+keepalive = 5
+
+loglevel = env('GUNICORN_LOG_LEVEL', 'info')
+errorlog = '-'
+
+
+# ====================
+# HOOKS
+# ====================
+
+def when_ready(server):
+    server.log.info(f'{workers} x {worker_class} workers (threads={threads}, preload={preload_app})')
+
+
+def pre_fork(server, worker):
+    # Соединения, открытые в master при preload, не должны достаться воркерам
+    if preload_app:
+        from django.db import connections
+        connections.close_all()
+
+
+def post_fork(server, worker):
+    if not preload_app:
+        return
+    from django.db import connections
+    from hair_app import tasks
+    from telegram_bot import db
+
+    # Унаследованный сокет не закрываем (это сессия master) - только забываем
+    for connection in connections.all(initialized_only=True):
+        connection.connection = None
+    tasks.reset_after_fork()
+    db.reset_after_fork()
+
+
+def worker_exit(server, worker):
+    from django.conf import settings
+    from hair_app import metrics, tasks
+    tasks.drain_pending()
+    # Запросы после последнего периодического сброса
+    if settings.METRICS_DIR:
+        try:
+            metrics.flush()
+        except OSError as e:
+            server.log.error(f'Metrics flush failed: {e}')
+
+
+def child_exit(server, worker):
+    # В master: снимок метрик завершившегося воркера - в archive.json
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    from hair_app import metrics
+    try:
+        metrics.archive_process(worker.pid)
+    except Exception as e:
+        server.log.error(f'Metrics archive failed for worker {worker.pid}: {e}')
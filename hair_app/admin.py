@@ -3,12 +3,25 @@ Django Admin configuration for hair purchase application
 with custom dashboard and beautiful UI
 """
 from django.contrib import admin
-from django.utils.html import format_html
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.core.paginator import Paginator
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.db import connection
+from django.utils.functional import cached_property
+from django.utils.html import format_html, format_html_join
 from django.shortcuts import render
 from django.db.models import Count, Q
 from datetime import timedelta
 from django.utils import timezone
-from .models import HairApplication, PriceList, TelegramAdmin
+from django.conf import settings
+from .admin_views import count_by_date
+from .models import HairApplication, PriceList, TelegramAdmin, ApplicationStatusChange, RequestProfile
+from .profiling import TOKEN_HEADER, make_token, render_stats
+from .search import search_queryset
+from .thumbnails import PHOTO_FIELDS, thumbnail_url
+from .transitions import transition_status
 import json
 
 
@@ -23,16 +36,16 @@ class CustomAdminSite(admin.AdminSite):
         # Get applications
         all_apps = HairApplication.objects.all()
         
-        # Statistics
-        stats = {
-            'total_applications': all_apps.count(),
-            'new_count': all_apps.filter(status='new').count(),
-            'viewed_count': all_apps.filter(status='viewed').count(),
-            'accepted_count': all_apps.filter(status='accepted').count(),
-            'rejected_count': all_apps.filter(status='rejected').count(),
-            'completed_count': all_apps.filter(status='completed').count(),
-            'pending_count': all_apps.filter(status__in=['new', 'viewed']).count(),
-        }
+        # Statistics - одним запросом
+        stats = all_apps.aggregate(
+            total_applications=Count('id'),
+            new_count=Count('id', filter=Q(status='new')),
+            viewed_count=Count('id', filter=Q(status='viewed')),
+            accepted_count=Count('id', filter=Q(status='accepted')),
+            rejected_count=Count('id', filter=Q(status='rejected')),
+            completed_count=Count('id', filter=Q(status='completed')),
+            pending_count=Count('id', filter=Q(status__in=['new', 'viewed'])),
+        )
         
         # Chart data for status distribution
         status_data = {
@@ -53,16 +66,12 @@ class CustomAdminSite(admin.AdminSite):
         length_labels = [item['length'] or 'Unknown' for item in length_dist]
         length_counts = [item['count'] for item in length_dist]
         
-        # Timeline data (last 7 days)
-        timeline_labels = []
-        timeline_counts = []
-        for i in range(6, -1, -1):
-            date = timezone.now().date() - timedelta(days=i)
-            count = all_apps.filter(
-                created_at__date=date
-            ).count()
-            timeline_labels.append(date.strftime('%d.%m'))
-            timeline_counts.append(count)
+        # Timeline data (last 7 days) - одна группировка по дате вместо запроса на день
+        today = timezone.localdate()
+        dates = [today - timedelta(days=i) for i in range(6, -1, -1)]
+        daily = count_by_date(all_apps, since=timezone.now() - timedelta(days=8))
+        timeline_labels = [date.strftime('%d.%m') for date in dates]
+        timeline_counts = [daily.get(date, 0) for date in dates]
         
         chart_data = {
             'new_count': status_data['new_count'],
@@ -100,11 +109,64 @@ except Exception as e:
     custom_admin_site = admin.site
 
 
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор без точного COUNT(*) на больших таблицах.
+    Для нефильтрованного списка в PostgreSQL берёт оценку из pg_class.reltuples.
+    """
+    ESTIMATE_THRESHOLD = 10000
+    
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                    [self.object_list.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= self.ESTIMATE_THRESHOLD:
+                return row[0]
+        return super().count
+
+
+class HairApplicationChangeList(ChangeList):
+    """Список заявок: выбираем только колонки, нужные для list_display"""
+    
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        return queryset.only(*self.model_admin.list_only_fields)
+
+
+# Бейджи статусов - строятся один раз, а не на каждую строку
+STATUS_BADGES = {
+    'new': ('Новая', '#f39c12'),
+    'viewed': ('Просмотрена', '#3498db'),
+    'accepted': ('Принята', '#27ae60'),
+    'rejected': ('Отклонена', '#e74c3c'),
+    'completed': ('Завершена', '#16a085'),
+}
+
+
+class StatusChangeInline(admin.TabularInline):
+    """История смены статусов в карточке заявки"""
+    model = ApplicationStatusChange
+    extra = 0
+    can_delete = False
+    fields = ['created_at', 'old_status', 'new_status', 'source', 'actor']
+    readonly_fields = fields
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 class HairApplicationAdmin(admin.ModelAdmin):
     """Admin for hair applications with beautiful styling."""
     
     list_display = [
         'application_badge',
+        'photo_preview',
         'customer_info',
         'status_badge',
         'hair_specs',
@@ -112,9 +174,19 @@ class HairApplicationAdmin(admin.ModelAdmin):
         'created_date',
     ]
     
-    list_filter = ['status', 'length', 'color', 'structure', 'condition', 'created_at']
+    # Колонки, которые читают методы list_display
+    list_only_fields = [
+        'id', 'photo1', 'name', 'phone', 'email', 'city', 'status',
+        'length', 'color', 'structure', 'age', 'condition',
+        'estimated_price', 'final_price', 'created_at',
+        'prior_applications', 'is_duplicate',
+    ]
+    
+    list_filter = ['status', 'is_duplicate', 'length', 'color', 'structure', 'condition', 'created_at']
     search_fields = ['name', 'phone', 'email', 'city', 'comment', 'id']
-    readonly_fields = ['estimated_price', 'created_at', 'updated_at', 'display_photos']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    readonly_fields = ['estimated_price', 'prior_applications', 'is_duplicate', 'created_at', 'updated_at', 'display_photos']
     
     fieldsets = (
         ('Основная информация', {
@@ -130,14 +202,18 @@ class HairApplicationAdmin(admin.ModelAdmin):
             'fields': ('estimated_price', 'final_price', 'status', 'admin_notes')
         }),
         ('Метаданные', {
-            'fields': ('created_at', 'updated_at'),
+            'fields': ('prior_applications', 'is_duplicate', 'created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
     
+    inlines = [StatusChangeInline]
     actions = ['mark_as_accepted', 'mark_as_rejected', 'mark_as_completed']
     ordering = ('-created_at',)
     
+    def get_changelist(self, request, **kwargs):
+        return HairApplicationChangeList
+    
     def application_badge(self, obj):
         return format_html(
             '<span style="background-color: #0f3460; color: white; padding: 6px 12px; border-radius: 12px; font-weight: bold; font-size: 12px;">ID #{}</span>',
@@ -149,21 +225,19 @@ class HairApplicationAdmin(admin.ModelAdmin):
         phone_link = f'<a href="tel:{obj.phone}">{obj.phone}</a>' if obj.phone else '---'
         email_link = f'<a href="mailto:{obj.email}">{obj.email}</a>' if obj.email else '---'
         city = f' ({obj.city})' if obj.city else ''
+        repeat = ''
+        if obj.is_duplicate:
+            repeat = format_html(' <span style="color: #e74c3c;" title="Ранее заявок: {}">⚠ дубль</span>', obj.prior_applications)
+        elif obj.prior_applications:
+            repeat = format_html(' <span style="color: #7f8c8d;">(повтор: {})</span>', obj.prior_applications)
         return format_html(
-            '<div style="line-height: 1.6; font-size: 12px;"><strong>{}</strong>{}<br/>Phone: {}<br/>Email: {}</div>',
-            obj.name or '---', city, phone_link, email_link
+            '<div style="line-height: 1.6; font-size: 12px;"><strong>{}</strong>{}{}<br/>Phone: {}<br/>Email: {}</div>',
+            obj.name or '---', city, repeat, phone_link, email_link
         )
     customer_info.short_description = 'Клиент'
     
     def status_badge(self, obj):
-        status_map = {
-            'new': ('Новая', '#f39c12'),
-            'viewed': ('Просмотрена', '#3498db'),
-            'accepted': ('Принята', '#27ae60'),
-            'rejected': ('Отклонена', '#e74c3c'),
-            'completed': ('Завершена', '#16a085'),
-        }
-        display, color = status_map.get(obj.status, ('---', '#95a5a6'))
+        display, color = STATUS_BADGES.get(obj.status, ('---', '#95a5a6'))
         return format_html(
             '<span style="background-color: {}; color: white; padding: 6px 12px; border-radius: 12px; font-weight: bold; font-size: 12px;">{}</span>',
             color, display
@@ -205,28 +279,64 @@ class HairApplicationAdmin(admin.ModelAdmin):
         )
     created_date.short_description = 'Дата'
     
+    def photo_preview(self, obj):
+        if not obj.photo1:
+            return '---'
+        return format_html(
+            '<a href="{}" target="_blank"><img src="{}" loading="lazy" width="80" height="80" style="object-fit: cover; border-radius: 6px;"></a>',
+            obj.photo1.url, thumbnail_url(obj.id, 'photo1', 80, obj.photo1.name)
+        )
+    photo_preview.short_description = 'Фото'
+    
     def display_photos(self, obj):
-        html = '<div style="display: flex; gap: 10px; flex-wrap: wrap;">'
-        for photo in [obj.photo1, obj.photo2, obj.photo3]:
+        # Миниатюры грузятся лениво, клик открывает оригинал
+        photos = []
+        for field in PHOTO_FIELDS:
+            photo = getattr(obj, field)
             if photo:
-                html += f'<img src="{photo.url}" style="max-width: 200px; max-height: 200px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">'
-        html += '</div>'
-        return format_html(html)
+                photos.append((photo.url, thumbnail_url(obj.id, field, 200, photo.name)))
+        return format_html(
+            '<div style="display: flex; gap: 10px; flex-wrap: wrap;">{}</div>',
+            format_html_join(
+                '',
+                '<a href="{}" target="_blank"><img src="{}" loading="lazy" style="max-width: 200px; max-height: 200px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);"></a>',
+                photos
+            )
+        )
     display_photos.short_description = 'Фотографии'
     
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Поиск через полнотекстовый индекс вместо OR-цепочки icontains.
+        Все совпадения (без лимита публичного поиска); без явной сортировки
+        по колонке - по релевантности.
+        """
+        found = search_queryset(queryset, search_term)
+        if found is None:
+            return super().get_search_results(request, queryset, search_term)
+        term = search_term.strip()
+        if term.isdigit():
+            # Номер заявки или часть телефона: совпадение по ID тоже, порядок списка обычный
+            return queryset.filter(Q(pk=int(term)) | Q(pk__in=found.values('pk'))), False
+        if ORDER_VAR not in request.GET:
+            found = found.order_by('search_rank', *queryset.query.order_by)
+        return found, False
+    
+    # Принять/отклонить из админки можно только новые заявки (как и до
+    # transitions.py); бот и API используют более широкие ALLOWED_TRANSITIONS
     def mark_as_accepted(self, request, queryset):
-        updated = queryset.filter(status='new').update(status='accepted')
-        self.message_user(request, f'{updated} заявок принято')
+        updated = transition_status(queryset.filter(status='new'), 'accepted', source='admin', actor=request.user.get_username())
+        self.message_user(request, f'{len(updated)} заявок принято')
     mark_as_accepted.short_description = 'Принять выбранные'
     
     def mark_as_rejected(self, request, queryset):
-        updated = queryset.filter(status='new').update(status='rejected')
-        self.message_user(request, f'{updated} заявок отклонено')
+        updated = transition_status(queryset.filter(status='new'), 'rejected', source='admin', actor=request.user.get_username())
+        self.message_user(request, f'{len(updated)} заявок отклонено')
     mark_as_rejected.short_description = 'Отклонить выбранные'
     
     def mark_as_completed(self, request, queryset):
-        updated = queryset.filter(status__in=['accepted']).update(status='completed')
-        self.message_user(request, f'{updated} заявок завершено')
+        updated = transition_status(queryset, 'completed', source='admin', actor=request.user.get_username())
+        self.message_user(request, f'{len(updated)} заявок завершено')
     mark_as_completed.short_description = 'Завершить выбранные'
 
 
@@ -353,13 +463,78 @@ class TelegramAdminAdmin(admin.ModelAdmin):
     permissions_display.short_description = 'Права'
 
 
+class RequestProfileAdmin(admin.ModelAdmin):
+    """Профили запросов (hair_app/profiling.py): только просмотр и удаление"""
+    
+    list_display = ['created_at', 'method', 'path', 'view', 'status_code', 'duration_ms', 'trigger', 'download_link']
+    list_filter = ['trigger', 'view', 'created_at']
+    search_fields = ['path', 'view']
+    fields = ['created_at', 'trigger', 'method', 'path', 'view', 'status_code', 'duration_ms', 'download_link', 'report']
+    readonly_fields = fields
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def get_urls(self):
+        return [
+            path(
+                '<int:pk>/download/',
+                self.admin_site.admin_view(self.download_view),
+                name='hair_app_requestprofile_download',
+            ),
+        ] + super().get_urls()
+    
+    def download_view(self, request, pk):
+        if not self.has_view_permission(request):
+            raise Http404
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        try:
+            file = profile.file.open('rb')
+        except FileNotFoundError:
+            raise Http404('Profile file not found')
+        return FileResponse(file, as_attachment=True, filename=f'profile-{profile.pk}.prof')
+    
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {
+            **(extra_context or {}),
+            'profile_token': make_token(request.user),
+            'profile_token_header': TOKEN_HEADER,
+            'profile_token_minutes': settings.PROFILE_TOKEN_MAX_AGE // 60,
+        }
+        return super().changelist_view(request, extra_context)
+    
+    def duration_ms(self, obj):
+        return f'{obj.duration * 1000:.0f} ms'
+    duration_ms.short_description = 'Время'
+    
+    def download_link(self, obj):
+        return format_html(
+            '<a href="{}">.prof</a>',
+            reverse(f'{self.admin_site.name}:hair_app_requestprofile_download', args=[obj.pk])
+        )
+    download_link.short_description = 'Файл'
+    
+    def report(self, obj):
+        try:
+            text = render_stats(obj)
+        except (FileNotFoundError, ValueError, EOFError) as e:
+            return f'Профиль не прочитан: {e}'
+        return format_html('<pre style="font-size: 11px; overflow-x: auto;">{}</pre>', text)
+    report.short_description = 'Отчёт (по cumulative)'
+
+
 # Register with custom admin site
 try:
     custom_admin_site.register(HairApplication, HairApplicationAdmin)
     custom_admin_site.register(PriceList, PriceListAdmin)
     custom_admin_site.register(TelegramAdmin, TelegramAdminAdmin)
+    custom_admin_site.register(RequestProfile, RequestProfileAdmin)
 except Exception as e:
     print(f'Warning: Failed to register with custom admin: {e}')
     admin.site.register(HairApplication, HairApplicationAdmin)
     admin.site.register(PriceList, PriceListAdmin)
     admin.site.register(TelegramAdmin, TelegramAdminAdmin)
+    admin.site.register(RequestProfile, RequestProfileAdmin)
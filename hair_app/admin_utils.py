@@ -7,6 +7,10 @@ from datetime import datetime
 from django.http import HttpResponse
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from .models import HairApplication
+
+# Подписи статусов - один словарь на модуль, а не на каждую строку
+STATUS_LABELS = dict(HairApplication.STATUS_CHOICES)
 
 
 def export_applications_to_csv(queryset):
@@ -51,7 +55,7 @@ def export_applications_to_csv(queryset):
             app.age,
             app.estimated_price or '-',
             app.final_price or '-',
-            dict(app.STATUS_CHOICES).get(app.status, app.status),
+            STATUS_LABELS.get(app.status, app.status),
             app.created_at.strftime('%d.%m.%Y %H:%M'),
         ])
     
@@ -117,7 +121,7 @@ def export_applications_to_excel(queryset):
             app.age,
             app.estimated_price or '-',
             app.final_price or '-',
-            dict(app.STATUS_CHOICES).get(app.status, app.status),
+            STATUS_LABELS.get(app.status, app.status),
             app.created_at.strftime('%d.%m.%Y %H:%M'),
         ]
         
@@ -2,58 +2,69 @@
 Вспомогательные views для админки
 """
 from django.db.models import Count, Sum, Q
+from django.db.models.functions import TruncDate
 from django.utils import timezone
-from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from datetime import timedelta
 from .models import HairApplication, PriceList
+from .renderers import ORJSONResponse
+
+
+def count_by_date(queryset, since):
+    """{дата (в текущей таймзоне): число заявок} с since - один GROUP BY"""
+    rows = (
+        queryset.filter(created_at__gte=since)
+        .order_by()
+        .annotate(day=TruncDate('created_at'))
+        .values('day')
+        .annotate(count=Count('id'))
+        .values_list('day', 'count')
+    )
+    return dict(rows)
 
 
 def get_dashboard_stats():
     """
-    Получить статистику для дашборда
+    Получить статистику для дашборда (один агрегирующий запрос)
     """
     now = timezone.now()
     last_30_days = now - timedelta(days=30)
+    today_start = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
     
-    # Общая статистика
-    total_apps = HairApplication.objects.count()
-    new_apps = HairApplication.objects.filter(status='new').count()
-    accepted_apps = HairApplication.objects.filter(status='accepted').count()
-    completed_apps = HairApplication.objects.filter(status='completed').count()
-    rejected_apps = HairApplication.objects.filter(status='rejected').count()
-    
-    # Финансовые метрики
-    total_estimated = HairApplication.objects.aggregate(
-        total=Sum('estimated_price')
-    )['total'] or 0
-    
-    total_final = HairApplication.objects.filter(
-        final_price__isnull=False
-    ).aggregate(total=Sum('final_price'))['total'] or 0
+    totals = HairApplication.objects.aggregate(
+        total=Count('id'),
+        new=Count('id', filter=Q(status='new')),
+        viewed=Count('id', filter=Q(status='viewed')),
+        accepted=Count('id', filter=Q(status='accepted')),
+        completed=Count('id', filter=Q(status='completed')),
+        rejected=Count('id', filter=Q(status='rejected')),
+        # Финансовые метрики (Sum пропускает NULL)
+        total_estimated=Sum('estimated_price'),
+        total_final=Sum('final_price'),
+        # Последние 30 дней
+        last_30_days=Count('id', filter=Q(created_at__gte=last_30_days)),
+        # Сегодня (таймзона проекта)
+        today=Count('id', filter=Q(created_at__gte=today_start)),
+        today_revenue=Sum('estimated_price', filter=Q(created_at__gte=today_start)),
+    )
     
-    avg_price = HairApplication.objects.filter(
-        estimated_price__isnull=False
-    ).aggregate(avg=Sum('estimated_price'))['avg'] or 0
-    
-    if total_apps > 0:
-        avg_price = avg_price / total_apps
-    
-    # Последние 30 дней
-    apps_last_30 = HairApplication.objects.filter(
-        created_at__gte=last_30_days
-    ).count()
+    total_apps = totals['total']
+    total_estimated = totals['total_estimated'] or 0
+    avg_price = total_estimated / total_apps if total_apps > 0 else 0
     
     return {
         'total': total_apps,
-        'new': new_apps,
-        'accepted': accepted_apps,
-        'completed': completed_apps,
-        'rejected': rejected_apps,
+        'new': totals['new'],
+        'viewed': totals['viewed'],
+        'accepted': totals['accepted'],
+        'completed': totals['completed'],
+        'rejected': totals['rejected'],
         'total_estimated': int(total_estimated),
-        'total_final': int(total_final),
+        'total_final': int(totals['total_final'] or 0),
         'avg_price': int(avg_price),
-        'last_30_days': apps_last_30,
+        'last_30_days': totals['last_30_days'],
+        'today': totals['today'],
+        'today_revenue': int(totals['today_revenue'] or 0),
     }
 
 
@@ -61,23 +72,14 @@ def get_chart_data():
     """
     Получить данные для графика (последние 30 дней)
     """
-    now = timezone.now()
-    data = []
-    labels = []
-    
-    for i in range(29, -1, -1):
-        date = now - timedelta(days=i)
-        date_str = date.strftime('%Y-%m-%d')
-        count = HairApplication.objects.filter(
-            created_at__date=date.date()
-        ).count()
-        
-        data.append(count)
-        labels.append(date.strftime('%d.%m'))
+    # Дни - в текущей таймзоне, как и группировка TruncDate
+    today = timezone.localdate()
+    dates = [today - timedelta(days=i) for i in range(29, -1, -1)]
+    daily = count_by_date(HairApplication.objects.all(), since=timezone.now() - timedelta(days=31))
     
     return {
-        'labels': labels,
-        'data': data,
+        'labels': [date.strftime('%d.%m') for date in dates],
+        'data': [daily.get(date, 0) for date in dates],
     }
 
 
@@ -112,7 +114,7 @@ def dashboard_view(request):
     Returns dashboard statistics
     """
     stats = get_dashboard_stats()
-    return JsonResponse(stats)
+    return ORJSONResponse(stats)
 
 
 @require_http_methods(["GET"])
@@ -122,26 +124,26 @@ def chart_data(request):
     Returns chart data for last 30 days
     """
     data = get_chart_data()
-    return JsonResponse(data)
+    return ORJSONResponse(data)
 
 
-@require_http_methods(["GET"])
-def recent_applications_api(request):
-    """
-    API endpoint: GET /api/admin/recent/
-    Returns recent applications
-    """
+def parse_recent_limit(request):
     limit = request.GET.get('limit', 10)
     try:
-        limit = int(limit)
+        return int(limit)
     except (ValueError, TypeError):
-        limit = 10
-    
+        return 10
+
+
+def get_recent_applications_payload(limit=10):
+    """
+    Последние заявки в виде JSON-совместимых словарей
+    """
     apps = get_recent_applications(limit=limit)
-    data = [
+    return [
         {
             'id': app.id,
-            'name': app.full_name,
+            'name': app.name,
             'phone': app.phone,
             'status': app.status,
             'created_at': app.created_at.isoformat() if app.created_at else None,
@@ -149,4 +151,13 @@ def recent_applications_api(request):
         }
         for app in apps
     ]
-    return JsonResponse({'applications': data})
+
+
+@require_http_methods(["GET"])
+def recent_applications_api(request):
+    """
+    API endpoint: GET /api/admin/recent/
+    Returns recent applications
+    """
+    data = get_recent_applications_payload(limit=parse_recent_limit(request))
+    return ORJSONResponse({'applications': data})
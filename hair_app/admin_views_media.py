@@ -0,0 +1,41 @@
+"""
+Views для медиа в админке
+"""
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_http_methods
+from .models import HairApplication
+from .thumbnails import PHOTO_FIELDS, THUMBNAIL_SIZES, get_thumbnail, thumbnail_version
+
+THUMBNAIL_MAX_AGE = 60 * 60 * 24 * 7
+
+
+@staff_member_required
+@require_http_methods(["GET"])
+def photo_thumbnail(request, app_id, field, size):
+    """
+    GET /admin/thumbnails/<app_id>/<field>/<size>/?v=<версия>
+    Миниатюра фото заявки (создаётся при первом запросе).
+    Кешируется браузером, только если версия совпадает с текущим фото.
+    """
+    if field not in PHOTO_FIELDS or size not in THUMBNAIL_SIZES:
+        raise Http404('Unknown thumbnail')
+
+    app = get_object_or_404(HairApplication.objects.only('id', field), pk=app_id)
+    photo = getattr(app, field)
+    if not photo:
+        raise Http404('No photo')
+
+    try:
+        path = get_thumbnail(photo, size)
+    except (FileNotFoundError, OSError):
+        raise Http404('Photo not found')
+
+    response = FileResponse(open(path, 'rb'), content_type='image/jpeg')
+    if request.GET.get('v') == thumbnail_version(photo.name):
+        patch_cache_control(response, private=True, max_age=THUMBNAIL_MAX_AGE)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,58 @@
+"""
+SSE-поток событий для дашборда админки
+"""
+import asyncio
+import orjson
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.views.decorators.http import require_http_methods
+from . import events
+
+# Комментарий-пинг держит соединение живым через прокси с idle-таймаутом
+HEARTBEAT_INTERVAL = 25
+
+# Через сколько мс браузер переподключается после обрыва
+RETRY_MS = 5000
+
+
+def format_event(event):
+    return b'data: ' + orjson.dumps(event) + b'\n\n'
+
+
+async def event_stream(heartbeat=HEARTBEAT_INTERVAL):
+    # Подписка - в цикле, который отдаёт поток, и только когда он начат
+    subscriber = events.subscribe()
+    try:
+        yield f'retry: {RETRY_MS}\n\n'.encode()
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield b': ping\n\n'
+                continue
+            yield format_event(event)
+    finally:
+        # Вкладка закрыта - сервер отменяет генератор
+        events.unsubscribe(subscriber)
+
+
+@require_http_methods(["GET"])
+async def dashboard_events(request):
+    """
+    GET /admin/events/
+    Поток изменений для открытого дашборда (text/event-stream).
+    Долгие соединения держит только ASGI; под WSGI каждое заняло бы
+    воркер, поэтому там 204 - EventSource не переподключается.
+    """
+    user = await request.auser()
+    if not (user.is_active and user.is_staff):
+        return HttpResponseForbidden()
+    if not settings.ASYNC_VIEWS:
+        return HttpResponse(status=204)
+
+    response = StreamingHttpResponse(
+        event_stream(), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
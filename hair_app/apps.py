@@ -1,7 +1,32 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_delete
 
 
 class HairAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hair_app'
     verbose_name = 'Скупка волос'
+    
+    def ready(self):
+        from .search import ensure_search_triggers
+        post_migrate.connect(ensure_search_triggers, sender=self)
+
+        from . import events
+        from .models import HairApplication
+        from .signals import applications_status_changed
+        post_save.connect(events.on_application_saved, sender=HairApplication)
+        applications_status_changed.connect(events.on_status_changed)
+
+        from . import storage
+        post_save.connect(storage.release_replaced_photos, sender=HairApplication)
+        pre_delete.connect(storage.remember_deleted_photos, sender=HairApplication)
+        post_delete.connect(storage.release_deleted_photos, sender=HairApplication)
+
+        from .models import RequestProfile
+        from .profiling import delete_profile_file
+        post_delete.connect(delete_profile_file, sender=RequestProfile)
+
+        from .middleware import install_query_hook, instrument_templates
+        connection_created.connect(install_query_hook)
+        instrument_templates()
@@ -0,0 +1,158 @@
+"""
+Async-версии API для ASGI-режима (uvicorn-воркеры)
+
+Подключаются в hair_app/urls.py вместо sync-views, когда включён
+settings.ASYNC_VIEWS (config/asgi.py включает его сам). Ответы те же,
+что у sync-версий.
+
+/api/applications/ остаётся sync DRF-view: валидация фото, запись в
+хранилище и сохранение заявки - блокирующие, под ASGI Django выполняет
+такой view в потоке сам. Async в нём только отправка уведомлений
+(общий цикл hair_app.tasks) - так же и в WSGI-режиме.
+"""
+import logging
+import orjson
+from asgiref.sync import sync_to_async
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from rest_framework import status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.exceptions import PermissionDenied, Throttled
+from rest_framework.settings import api_settings
+
+from .admin_views import (
+    get_dashboard_stats,
+    get_chart_data,
+    get_recent_applications_payload,
+    parse_recent_limit,
+)
+from .models import PriceList
+from .renderers import ORJSONResponse
+from .serializers import PriceCalculatorSerializer, PriceListFastSerializer
+from .views import price_quote
+
+logger = logging.getLogger(__name__)
+
+
+def _check_throttles(request):
+    """Те же DEFAULT_THROTTLE_CLASSES, что и у DRF-views. Возвращает wait или None"""
+    for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+        throttle = throttle_class()
+        if not throttle.allow_request(request, None):
+            return throttle.wait()
+    return None
+
+
+async def throttled_response(request):
+    """Ответ 429, если запрос превышает лимит, иначе None"""
+    request.user = await request.auser()
+    wait = await sync_to_async(_check_throttles)(request)
+    if wait is None:
+        return None
+    headers = {'Retry-After': str(int(wait))} if wait else {}
+    return ORJSONResponse(
+        {'detail': Throttled(wait).detail},
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers=headers
+    )
+
+
+def csrf_failure(request):
+    """
+    CSRF как у DRF-view (SessionAuthentication): проверяется только для
+    пользователя, вошедшего через сессию; анонимный POST - без токена.
+    Ответ 403, если проверка не прошла, иначе None.
+    """
+    if not request.user.is_authenticated:
+        return None
+    try:
+        SessionAuthentication().enforce_csrf(request)
+    except PermissionDenied as exc:
+        return ORJSONResponse({'detail': exc.detail}, status=status.HTTP_403_FORBIDDEN)
+    return None
+
+
+def _parse_body(request):
+    if request.content_type == 'application/json':
+        return orjson.loads(request.body or b'{}')
+    return request.POST
+
+
+@csrf_exempt
+@require_http_methods(['POST'])
+async def calculate_price(request):
+    """
+    POST /api/calculate-price/ - расчёт без обращений к БД, прямо в event loop
+    csrf_exempt снимает только проверку middleware - CSRF как у DRF (csrf_failure).
+    """
+    request.user = await request.auser()
+    response = csrf_failure(request) or await throttled_response(request)
+    if response is not None:
+        return response
+
+    try:
+        data = _parse_body(request)
+    except orjson.JSONDecodeError as e:
+        return ORJSONResponse({'detail': f'JSON parse error - {e}'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        serializer = PriceCalculatorSerializer(data=data)
+        if not serializer.is_valid():
+            logger.warning(f"Price calculation validation errors: {serializer.errors}")
+            return ORJSONResponse(
+                {'errors': serializer.errors, 'message': 'Некорректные данные в запросе'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return ORJSONResponse(price_quote(serializer.validated_data))
+    except Exception as e:
+        logger.error(f'Error calculating price: {e}', exc_info=True)
+        return ORJSONResponse(
+            {'error': f'Внутренняя ошибка сервера: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@require_http_methods(['GET'])
+async def price_list(request):
+    """
+    GET /api/price-list/ - async-итерация по values() прайс-листа
+    """
+    response = await throttled_response(request)
+    if response is not None:
+        return response
+
+    try:
+        fast = PriceListFastSerializer(context={'request': request})
+        queryset = fast.project(PriceList.objects.filter(is_active=True))
+        rows = [row async for row in queryset]
+        return ORJSONResponse(fast.convert(rows))
+    except Exception as e:
+        logger.error(f'Error getting price list: {e}', exc_info=True)
+        return ORJSONResponse(
+            {'error': 'Внутренняя ошибка сервера'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+# ═══════════════════════════════════════════════════════════════
+# DASHBOARD API
+# ═══════════════════════════════════════════════════════════════
+# Несколько запросов статистики - один переход в поток вместо перехода на каждый
+
+@require_http_methods(['GET'])
+async def dashboard_view(request):
+    """GET /api/admin/dashboard/"""
+    return ORJSONResponse(await sync_to_async(get_dashboard_stats)())
+
+
+@require_http_methods(['GET'])
+async def chart_data(request):
+    """GET /api/admin/chart/"""
+    return ORJSONResponse(await sync_to_async(get_chart_data)())
+
+
+@require_http_methods(['GET'])
+async def recent_applications_api(request):
+    """GET /api/admin/recent/"""
+    data = await sync_to_async(get_recent_applications_payload)(limit=parse_recent_limit(request))
+    return ORJSONResponse({'applications': data})
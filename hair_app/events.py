@@ -0,0 +1,176 @@
+"""
+Шина событий дашборда: заявка создана / сменила статус
+
+Открытые дашборды подписываются через SSE (admin_views_stream) и получают
+компактные дельты счётчиков только когда что-то изменилось - нагрузка
+зависит от числа изменений, а не от числа вкладок и времени.
+
+С REDIS_URL события идут через Redis pub/sub и доходят до вкладок на любом
+воркере; без Redis - в пределах процесса. Публикация - после коммита.
+"""
+import asyncio
+import logging
+from collections import Counter
+from threading import Lock
+import orjson
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'hair_app:dashboard'
+
+# Медленная вкладка не копит события бесконечно: при переполнении
+# очередь сбрасывается и вкладка получает resync (перечитать страницу)
+SUBSCRIBER_QUEUE_SIZE = 100
+
+RESYNC = {'event': 'resync'}
+
+_subscribers = set()
+_lock = Lock()
+_redis = None
+_listeners = {}
+
+
+class Subscriber:
+    """Очередь событий одного SSE-соединения в его event loop"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+def subscribe():
+    """Подписаться из async-кода; вернуть Subscriber (читать subscriber.queue)"""
+    loop = asyncio.get_running_loop()
+    subscriber = Subscriber(loop)
+    with _lock:
+        _subscribers.add(subscriber)
+    if settings.REDIS_URL:
+        _ensure_redis_listener(loop)
+    return subscriber
+
+
+def unsubscribe(subscriber):
+    with _lock:
+        _subscribers.discard(subscriber)
+
+
+def subscriber_count():
+    return len(_subscribers)
+
+
+def _fanout(event):
+    with _lock:
+        subscribers = list(_subscribers)
+    for subscriber in subscribers:
+        # Подписчики живут в цикле сервера, публикация - из потока запроса
+        try:
+            subscriber.loop.call_soon_threadsafe(subscriber.offer, event)
+        except RuntimeError:
+            # Цикл уже закрыт, а соединение не успело отписаться
+            unsubscribe(subscriber)
+
+
+def _get_redis():
+    global _redis
+    if _redis is None:
+        import redis
+        _redis = redis.Redis.from_url(settings.REDIS_URL)
+    return _redis
+
+
+def publish(event):
+    """Отправить событие всем подписанным дашбордам (из любого потока)"""
+    if settings.REDIS_URL:
+        try:
+            _get_redis().publish(CHANNEL, orjson.dumps(event))
+            return
+        except Exception as e:
+            logger.error(f'Dashboard event via Redis failed, delivering locally: {e}')
+    _fanout(event)
+
+
+async def _listen_redis():
+    """Одна подписка на Redis на процесс, события раздаются локальным вкладкам"""
+    import redis.asyncio as aioredis
+
+    while True:
+        try:
+            client = aioredis.Redis.from_url(settings.REDIS_URL)
+            async with client.pubsub() as pubsub:
+                await pubsub.subscribe(CHANNEL)
+                async for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        _fanout(orjson.loads(message['data']))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f'Dashboard Redis listener error: {e}')
+            await asyncio.sleep(1)
+
+
+def _ensure_redis_listener(loop):
+    task = _listeners.get(loop)
+    if task is None or task.done():
+        _listeners[loop] = loop.create_task(_listen_redis())
+
+
+# ====================
+# СОБЫТИЯ
+# ====================
+
+def application_created_event(app):
+    return {
+        'event': 'created',
+        'delta': {'total': 1, app.status: 1},
+        'app': {
+            'id': app.id,
+            'name': app.name,
+            'status': app.status,
+            'estimated_price': app.estimated_price,
+            'created_at': app.created_at.isoformat() if app.created_at else None,
+        },
+    }
+
+
+def status_changed_event(changes):
+    """changes: [{'id', 'old_status', 'new_status'}, ...]"""
+    delta = Counter()
+    for change in changes:
+        delta[change['old_status']] -= 1
+        delta[change['new_status']] += 1
+    return {
+        'event': 'status',
+        'delta': {status: count for status, count in delta.items() if count},
+        'changes': [{'id': c['id'], 'status': c['new_status']} for c in changes],
+    }
+
+
+def on_application_saved(sender, instance, created, raw=False, **kwargs):
+    """post_save: новая заявка или смена статуса через save() (форма админки)"""
+    if raw:
+        return
+    if created:
+        event = application_created_event(instance)
+    else:
+        old_status = getattr(instance, '_loaded_values', {}).get('status')
+        if old_status is None or old_status == instance.status:
+            return
+        event = status_changed_event([
+            {'id': instance.id, 'old_status': old_status, 'new_status': instance.status}
+        ])
+    transaction.on_commit(lambda: publish(event))
+
+
+def on_status_changed(sender, changes, **kwargs):
+    """applications_status_changed уже отправляется после коммита"""
+    publish(status_changed_event(changes))
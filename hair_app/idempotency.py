@@ -0,0 +1,164 @@
+"""
+Idempotency-Key для POST-запросов
+
+Клиент генерирует ключ на одну отправку формы и повторяет его при ретраях.
+Повтор с тем же ключом получает сохранённый ответ: загрузки не парсятся
+заново, заявка и уведомления не создаются второй раз.
+
+Ответ содержит данные заявки (имя, телефон), поэтому ключ кеша - не только
+Idempotency-Key: в него входит клиент (сессия, иначе CSRF-cookie). IP не
+годится - у мобильного клиента он меняется между повторами. Рядом с ответом
+хранится отпечаток запроса: тот же ключ с другими данными получает 422.
+
+Ответы хранятся в кеше Django. Без REDIS_URL это LocMemCache - память
+одного процесса: повтор, попавший в другой gunicorn-воркер, выполнится
+заново. Для нескольких воркеров нужен REDIS_URL.
+"""
+import hashlib
+import logging
+import re
+from functools import wraps
+import orjson
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+_KEY_RE = re.compile(r'^[A-Za-z0-9_\-:.]{8,128}$')
+
+# Пока первый запрос выполняется, ключ "занят" - не дольше этого времени
+IN_PROGRESS_TIMEOUT = 120
+
+_local_cache_warned = False
+
+
+def _warn_if_local_cache():
+    global _local_cache_warned
+    if not _local_cache_warned and isinstance(caches['default'], LocMemCache):
+        _local_cache_warned = True
+        logger.warning(
+            'Idempotency-Key responses are kept in LocMemCache: replays are only '
+            'recognized by the same process. Set REDIS_URL when running several workers.'
+        )
+
+
+def client_identity(request):
+    """Стабильный идентификатор клиента: ключ сессии, иначе CSRF-cookie, иначе ''"""
+    session = getattr(request, 'session', None)
+    if session is not None and session.session_key:
+        return f'session:{session.session_key}'
+    csrf_token = request.COOKIES.get(settings.CSRF_COOKIE_NAME)
+    return f'csrf:{csrf_token}' if csrf_token else ''
+
+
+def cache_key_for(scope, request, key):
+    # Без сессии и cookie ключ остаётся единственным секретом клиента
+    identity = hashlib.sha256(f'{client_identity(request)}|{key}'.encode()).hexdigest()
+    return f'idempotency:{scope}:{identity}'
+
+
+def request_fingerprint(request, volatile_fields=()):
+    """
+    Хеш содержимого запроса.
+    volatile_fields JSON-тела не учитываются: ID загрузок фото новые при
+    каждом повторе (загрузки расходуются заявкой). Граница multipart
+    генерируется заново при каждой отправке той же формы - из тела она
+    убирается. Тело больше DATA_UPLOAD_MAX_MEMORY_SIZE (форма без JS
+    с файлами) целиком не читается - вместо него учитывается длина.
+    """
+    # content_type DRF-запроса включает boundary - берём разобранный из HttpRequest
+    http_request = getattr(request, '_request', request)
+    digest = hashlib.sha256()
+    digest.update(http_request.content_type.encode())
+
+    length = int(request.META.get('CONTENT_LENGTH') or 0)
+    limit = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+    if limit is not None and length > limit:
+        digest.update(f'|length:{length}'.encode())
+        return digest.hexdigest()
+
+    body = request.body
+    if http_request.content_type == 'application/json':
+        try:
+            data = orjson.loads(body or b'{}')
+        except orjson.JSONDecodeError:
+            data = None
+        if isinstance(data, dict):
+            for field in volatile_fields:
+                data.pop(field, None)
+            body = orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    boundary = http_request.content_params.get('boundary')
+    if boundary:
+        body = body.replace(boundary.encode('latin-1'), b'')
+    digest.update(b'|')
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def idempotent(scope, volatile_fields=()):
+    """
+    Декоратор метода ViewSet/APIView.
+    Запросы без заголовка Idempotency-Key обрабатываются как обычно.
+    Успешные (2xx) ответы хранятся settings.IDEMPOTENCY_KEY_TTL секунд.
+    volatile_fields - поля JSON, которые при повторе могут отличаться.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            # request.headers не трогает тело - multipart ещё не разобран
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key:
+                return method(self, request, *args, **kwargs)
+
+            if not _KEY_RE.match(key):
+                return Response(
+                    {'status': 'error', 'message': f'Некорректный {IDEMPOTENCY_HEADER}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            _warn_if_local_cache()
+            cache_key = cache_key_for(scope, request, key)
+            fingerprint = request_fingerprint(request, volatile_fields)
+            if not cache.add(cache_key, {'fingerprint': fingerprint}, timeout=IN_PROGRESS_TIMEOUT):
+                stored = cache.get(cache_key)
+                if stored is not None and stored['fingerprint'] != fingerprint:
+                    return Response(
+                        {'status': 'error', 'message': f'{IDEMPOTENCY_HEADER} уже использован с другими данными'},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                    )
+                if stored is not None and 'status' in stored:
+                    logger.info(f'Idempotent replay for {scope} key {key}')
+                    return Response(
+                        stored['data'],
+                        status=stored['status'],
+                        headers={REPLAYED_HEADER: 'true'}
+                    )
+                return Response(
+                    {'status': 'error', 'message': 'Заявка уже отправляется, подождите'},
+                    status=status.HTTP_409_CONFLICT
+                )
+
+            try:
+                response = method(self, request, *args, **kwargs)
+            except Exception:
+                cache.delete(cache_key)
+                raise
+
+            if status.is_success(response.status_code):
+                cache.set(
+                    cache_key,
+                    {'fingerprint': fingerprint, 'status': response.status_code, 'data': response.data},
+                    timeout=settings.IDEMPOTENCY_KEY_TTL
+                )
+            else:
+                # Ошибку можно исправить и отправить заново с тем же ключом
+                cache.delete(cache_key)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,21 @@
+"""
+Удаление брошенных загрузок фото (/api/uploads/)
+
+    python manage.py cleanup_uploads              # старше UPLOAD_TTL_HOURS
+    python manage.py cleanup_uploads --hours 1
+
+Запускать по cron / systemd timer, например раз в час.
+"""
+from django.core.management.base import BaseCommand
+from hair_app.uploads import cleanup_expired_uploads
+
+
+class Command(BaseCommand):
+    help = 'Удалить незавершённые и неиспользованные загрузки фото'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=None, help='Возраст загрузки, часов')
+
+    def handle(self, *args, **options):
+        removed = cleanup_expired_uploads(options['hours'])
+        self.stdout.write(self.style.SUCCESS(f'Удалено загрузок: {removed}'))
@@ -0,0 +1,181 @@
+"""
+Синтетические заявки для нагрузочных тестов и подбора воркеров / БД
+
+    python manage.py generate_applications 100000
+    python manage.py generate_applications 10000 --days 90 --seed 1
+    python manage.py generate_applications 500000 --no-photos --batch-size 5000
+
+Распределения характеристик, статусов и цен близки к реальным; даты
+равномерно за последние --days дней, часть телефонов повторяется
+(постоянные продавцы). Фото - --photo-variants заглушек: в хранилище
+по хешу (hair_app/storage.py) каждая лежит один раз, ссылки учтены в StoredFile.
+
+Строки пишутся bulk_create пачками, без save() и сигналов: счётчики
+повторов (prior_applications) и события дашборда не заполняются.
+Не запускать на рабочей базе.
+"""
+import random
+from collections import Counter
+from datetime import timedelta
+from io import BytesIO
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from PIL import Image, ImageDraw
+from hair_app.models import (
+    AGE_MAP, LENGTH_CM_MAP, STRUCTURE_MAP, HairApplication, StoredFile, canonicalize_phone,
+)
+from hair_app.price_calculator import calculate_hair_price
+from hair_app.storage import get_photo_storage
+
+# (значение, вес)
+LENGTHS = [('40-50', 15), ('50-60', 30), ('60-80', 30), ('80-100', 17), ('100+', 8)]
+COLORS = [('блонд', 15), ('светло-русые', 25), ('русые', 30), ('темно-русые', 20), ('каштановые', 10)]
+STRUCTURES = [('славянка', 35), ('среднее', 45), ('густые', 20)]
+AGES = [('взрослые', 90), ('детские', 10)]
+CONDITIONS = [('натуральные', 60), ('окрашенные', 30), ('после химии', 10)]
+STATUSES = [('new', 10), ('viewed', 10), ('accepted', 15), ('rejected', 25), ('completed', 40)]
+
+NAMES = ['Анна', 'Мария', 'Елена', 'Ольга', 'Наталья', 'Ирина', 'Светлана', 'Татьяна', 'Юлия', 'Дарья']
+CITIES = [
+    ('Москва', 30), ('Санкт-Петербург', 15), ('Новосибирск', 5), ('Екатеринбург', 5),
+    ('Казань', 5), ('Краснодар', 5), ('', 35),
+]
+COMMENTS = [
+    'Волосы не крашены, стригу раз в год',
+    'Срез хвостом, могу прислать ещё фото',
+    'Окрашивала хной два года назад',
+    'Когда можно приехать?',
+]
+
+# Цвет заглушки по цвету волос
+PHOTO_COLORS = {
+    'блонд': (230, 205, 150), 'светло-русые': (190, 160, 110), 'русые': (150, 115, 75),
+    'темно-русые': (105, 80, 55), 'каштановые': (70, 45, 30),
+}
+
+
+def weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def make_placeholder(rng, color):
+    """JPEG-заглушка ~ размера фото с телефона после уменьшения в браузере"""
+    base = PHOTO_COLORS[color]
+    image = Image.new('RGB', (768, 1024), base)
+    draw = ImageDraw.Draw(image)
+    for y in range(0, 1024, 16):
+        shade = tuple(max(0, min(255, c + rng.randint(-25, 25))) for c in base)
+        draw.rectangle([0, y, 768, y + 15], fill=shade)
+    file = BytesIO()
+    image.save(file, 'JPEG', quality=80)
+    return file.getvalue()
+
+
+class Command(BaseCommand):
+    help = 'Сгенерировать N синтетических заявок (bulk_create пачками)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('count', type=int, help='Сколько заявок создать')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--days', type=int, default=365, help='Период дат создания, дней')
+        parser.add_argument('--repeat-rate', type=float, default=0.15, help='Доля заявок от повторных продавцов')
+        parser.add_argument('--photo-variants', type=int, default=20, help='Разных фото-заглушек')
+        parser.add_argument('--no-photos', action='store_true', help='Без фото')
+        parser.add_argument('--seed', type=int, default=None, help='Seed для воспроизводимости')
+
+    def handle(self, *args, **options):
+        count = options['count']
+        if count <= 0:
+            raise CommandError('count должен быть больше 0')
+
+        rng = random.Random(options['seed'])
+        photos = [] if options['no_photos'] else self.store_placeholders(rng, options['photo_variants'])
+        references = Counter()
+        phones = []
+        now = timezone.now()
+        period = timedelta(days=options['days']).total_seconds()
+
+        created = 0
+        while created < count:
+            size = min(options['batch_size'], count - created)
+            batch = [
+                self.make_application(rng, photos, references, phones, options['repeat_rate'])
+                for _ in range(size)
+            ]
+            dates = sorted(now - timedelta(seconds=rng.uniform(0, period)) for _ in batch)
+            with transaction.atomic():
+                HairApplication.objects.bulk_create(batch)
+                # auto_now_add перезаписывает дату при вставке - выставляем отдельно
+                for app, date in zip(batch, dates):
+                    app.created_at = app.updated_at = date
+                HairApplication.objects.bulk_update(batch, ['created_at', 'updated_at'])
+            created += size
+            self.stdout.write(f'{created}/{count}')
+
+        self.fix_references(photos, references)
+        self.stdout.write(self.style.SUCCESS(f'Создано заявок: {created}'))
+
+    def store_placeholders(self, rng, variants):
+        storage = get_photo_storage()
+        colors = [color for color, _ in COLORS]
+        photos = []
+        for i in range(variants):
+            color = colors[i % len(colors)]
+            name = storage.save('photos/placeholder.jpg', ContentFile(make_placeholder(rng, color)))
+            photos.append((color, name))
+        return photos
+
+    def fix_references(self, photos, references):
+        """save() заглушки дал одну ссылку; доводим до числа заявок с ней"""
+        for _, name in photos:
+            StoredFile.objects.filter(name=name).update(ref_count=F('ref_count') + references[name] - 1)
+
+    def make_application(self, rng, photos, references, phones, repeat_rate):
+        length = weighted(rng, LENGTHS)
+        color = weighted(rng, COLORS)
+        structure = weighted(rng, STRUCTURES)
+        age = weighted(rng, AGES)
+        condition = weighted(rng, CONDITIONS)
+        status = weighted(rng, STATUSES)
+
+        if phones and rng.random() < repeat_rate:
+            phone = rng.choice(phones)
+        else:
+            phone = canonicalize_phone(f'+79{rng.randint(0, 999999999):09d}')
+            phones.append(phone)
+
+        estimated_price = calculate_hair_price(
+            length=LENGTH_CM_MAP.get(length, 50),
+            color=color,
+            condition=condition,
+            structure=STRUCTURE_MAP[structure],
+            age=AGE_MAP[age],
+        )
+        final_price = None
+        if status == 'completed':
+            final_price = round(estimated_price * rng.uniform(0.85, 1.05) / 500) * 500
+
+        app = HairApplication(
+            length=length, color=color, structure=structure, age=age, condition=condition,
+            name=rng.choice(NAMES),
+            phone=phone.display,
+            phone_digits=phone.digits,
+            email=f'seller{phone.digits[-6:]}@example.com' if rng.random() < 0.4 else '',
+            city=weighted(rng, CITIES),
+            comment=rng.choice(COMMENTS) if rng.random() < 0.3 else '',
+            estimated_price=estimated_price,
+            final_price=final_price,
+            status=status,
+        )
+        if photos:
+            same_color = [name for photo_color, name in photos if photo_color == color] or [name for _, name in photos]
+            for field, probability in (('photo1', 1.0), ('photo2', 0.5), ('photo3', 0.25)):
+                if rng.random() < probability:
+                    name = rng.choice(same_color)
+                    setattr(app, field, name)
+                    references[name] += 1
+        return app
@@ -0,0 +1,54 @@
+"""
+Регистрация webhook Telegram-бота
+
+    python manage.py telegram_webhook            # setWebhook на TELEGRAM_WEBHOOK_URL
+    python manage.py telegram_webhook --delete   # вернуться к polling
+    python manage.py telegram_webhook --info     # getWebhookInfo
+"""
+import asyncio
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Зарегистрировать / удалить webhook Telegram-бота'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delete', action='store_true', help='Удалить webhook')
+        parser.add_argument('--info', action='store_true', help='Показать текущий webhook')
+        parser.add_argument('--drop-pending', action='store_true', help='Сбросить накопившиеся апдейты')
+
+    def handle(self, *args, **options):
+        asyncio.run(self.run(options))
+
+    async def run(self, options):
+        from telegram_bot.webhook import get_bot_and_dispatcher, get_webhook_url
+        bot, dp = get_bot_and_dispatcher()
+        try:
+            if options['info']:
+                info = await bot.get_webhook_info()
+                self.stdout.write(f'url: {info.url or "-"}')
+                self.stdout.write(f'pending updates: {info.pending_update_count}')
+                if info.last_error_message:
+                    self.stdout.write(f'last error: {info.last_error_message}')
+                return
+
+            if options['delete']:
+                await bot.delete_webhook(drop_pending_updates=options['drop_pending'])
+                self.stdout.write(self.style.SUCCESS('Webhook удалён'))
+                return
+
+            if not settings.TELEGRAM_WEBHOOK_URL or not settings.TELEGRAM_WEBHOOK_SECRET:
+                raise CommandError('Нужны TELEGRAM_WEBHOOK_URL и TELEGRAM_WEBHOOK_SECRET')
+
+            url = get_webhook_url()
+            await bot.set_webhook(
+                url,
+                secret_token=settings.TELEGRAM_WEBHOOK_SECRET,
+                allowed_updates=dp.resolve_used_update_types(),
+                max_connections=settings.TELEGRAM_WEBHOOK_CONCURRENCY,
+                drop_pending_updates=options['drop_pending'],
+            )
+            self.stdout.write(self.style.SUCCESS(f'Webhook установлен: {url}'))
+        finally:
+            await bot.session.close()
@@ -0,0 +1,281 @@
+"""
+Метрики запросов в формате Prometheus (GET /metrics)
+
+PerformanceMiddleware (hair_app/middleware.py) пишет сюда на каждый запрос:
+время, число и время SQL-запросов, время рендера шаблонов и размер ответа -
+гистограммами с меткой view (имя URL) и method.
+
+Счётчики живут в памяти воркера. При нескольких воркерах gunicorn задайте
+METRICS_DIR: каждый процесс раз в METRICS_FLUSH_INTERVAL сбрасывает свой
+снимок в <METRICS_DIR>/<pid>-<время старта>.json, /metrics складывает все
+файлы. Снимок завершившегося воркера (max_requests, рестарт) master
+переносит в archive.json (gunicorn.conf.py, child_exit): файлов не больше,
+чем живых воркеров, а счётчики не убывают, даже когда ОС повторно выдаёт PID.
+"""
+import glob
+import hmac
+import logging
+import os
+import time
+from threading import Lock
+import orjson
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024)
+
+HISTOGRAMS = {
+    'http_request_duration_seconds': ('Request wall time', DURATION_BUCKETS),
+    'http_request_db_queries': ('SQL queries per request', QUERY_BUCKETS),
+    'http_request_db_duration_seconds': ('Time in SQL per request', DURATION_BUCKETS),
+    'http_request_template_duration_seconds': ('Template render time per request', DURATION_BUCKETS),
+    'http_response_size_bytes': ('Response body size', SIZE_BUCKETS),
+}
+COUNTERS = {
+    'http_requests_total': 'Requests by view, method and status',
+}
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Registry:
+    """Гистограммы и счётчики процесса; ключ - (метрика, метки)"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # (name, labels) -> [counts по бакетам..., sum, count]
+            self.histograms = {}
+            self.counters = {}
+
+    def observe(self, name, labels, value):
+        buckets = HISTOGRAMS[name][1]
+        key = (name, labels)
+        with self._lock:
+            row = self.histograms.get(key)
+            if row is None:
+                row = self.histograms[key] = [0] * len(buckets) + [0.0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def inc(self, name, labels, amount=1):
+        key = (name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'histograms': [[name, list(labels), list(row)] for (name, labels), row in self.histograms.items()],
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+            }
+
+
+registry = Registry()
+
+_last_flush = 0.0
+# (pid, имя файла снимка): после fork у воркера свой файл
+_process_file = None
+
+ARCHIVE_FILE = 'archive.json'
+
+
+def label_pairs(**labels):
+    return tuple(sorted(labels.items()))
+
+
+def observe_request(view, method, status, duration, queries, db_time, template_time, size):
+    labels = label_pairs(view=view, method=method)
+    registry.inc('http_requests_total', label_pairs(view=view, method=method, status=str(status)))
+    registry.observe('http_request_duration_seconds', labels, duration)
+    registry.observe('http_request_db_queries', labels, queries)
+    registry.observe('http_request_db_duration_seconds', labels, db_time)
+    registry.observe('http_request_template_duration_seconds', labels, template_time)
+    if size is not None:
+        registry.observe('http_response_size_bytes', labels, size)
+    maybe_flush()
+
+
+# ====================
+# НЕСКОЛЬКО ПРОЦЕССОВ
+# ====================
+
+def process_file_name():
+    """<pid>-<время старта>.json: процесс с тем же PID не перезапишет чужой снимок"""
+    global _process_file
+    pid = os.getpid()
+    if _process_file is None or _process_file[0] != pid:
+        _process_file = (pid, f'{pid}-{time.time_ns()}.json')
+    return _process_file[1]
+
+
+def _write_atomic(path, snapshot):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as tmp:
+        tmp.write(orjson.dumps(snapshot))
+    os.replace(tmp_path, path)
+
+
+def _read(path):
+    with open(path, 'rb') as file:
+        return orjson.loads(file.read())
+
+
+def flush():
+    """Записать снимок процесса в METRICS_DIR (атомарно)"""
+    directory = settings.METRICS_DIR
+    os.makedirs(directory, exist_ok=True)
+    _write_atomic(os.path.join(directory, process_file_name()), registry.snapshot())
+
+
+def maybe_flush():
+    global _last_flush
+    if not settings.METRICS_DIR:
+        return
+    now = time.monotonic()
+    if now - _last_flush < settings.METRICS_FLUSH_INTERVAL:
+        return
+    _last_flush = now
+    try:
+        flush()
+    except OSError as e:
+        logger.error(f'Metrics flush failed: {e}')
+
+
+def merge(snapshots):
+    histograms = {}
+    counters = {}
+    for snapshot in snapshots:
+        for name, labels, row in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            total = histograms.setdefault(key, [0] * len(row))
+            for i, value in enumerate(row):
+                total[i] += value
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+    return histograms, counters
+
+
+def to_snapshot(histograms, counters):
+    """Обратно к формату снимка (результат merge)"""
+    return {
+        'histograms': [[name, list(labels), row] for (name, labels), row in histograms.items()],
+        'counters': [[name, list(labels), value] for (name, labels), value in counters.items()],
+    }
+
+
+def archive_process(pid, directory=None):
+    """
+    Вызывается в master после смерти воркера: его снимки добавляются
+    в archive.json, файлы удаляются. Пишет только master - без блокировок.
+    """
+    directory = directory or settings.METRICS_DIR
+    if not directory:
+        return
+    paths = glob.glob(os.path.join(directory, f'{pid}-*.json'))
+    if not paths:
+        return
+    archive_path = os.path.join(directory, ARCHIVE_FILE)
+    snapshots = [_read(archive_path)] if os.path.exists(archive_path) else []
+    for path in paths:
+        try:
+            snapshots.append(_read(path))
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.warning(f'Skipping metrics file {path}: {e}')
+    _write_atomic(archive_path, to_snapshot(*merge(snapshots)))
+    for path in paths:
+        os.unlink(path)
+
+
+def collect():
+    """Метрики всех процессов (с METRICS_DIR) или текущего"""
+    if not settings.METRICS_DIR:
+        return merge([registry.snapshot()])
+
+    flush()
+    snapshots = []
+    # Живые воркеры и archive.json (завершившиеся): счётчики не убывают
+    for path in glob.glob(os.path.join(settings.METRICS_DIR, '*.json')):
+        try:
+            snapshots.append(_read(path))
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.warning(f'Skipping metrics file {path}: {e}')
+    return merge(snapshots)
+
+
+# ====================
+# ФОРМАТ PROMETHEUS
+# ====================
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(pairs, extra=()):
+    pairs = list(pairs) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(histograms, counters):
+    lines = []
+    for name, help_text in COUNTERS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f'{name}{_labels(labels)} {_number(value)}')
+
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for (metric, labels), row in sorted(histograms.items()):
+            if metric != name:
+                continue
+            for bound, count in zip(buckets, row):
+                lines.append(f'{name}_bucket{_labels(labels, [("le", _number(bound))])} {count}')
+            lines.append(f'{name}_bucket{_labels(labels, [("le", "+Inf")])} {row[-1]}')
+            lines.append(f'{name}_sum{_labels(labels)} {_number(row[-2])}')
+            lines.append(f'{name}_count{_labels(labels)} {row[-1]}')
+    return '\n'.join(lines) + '\n'
+
+
+# ====================
+# ENDPOINT
+# ====================
+
+def is_metrics_allowed(request):
+    """Staff, Bearer METRICS_TOKEN или адрес из METRICS_ALLOWED_IPS (явно заданный)"""
+    token = settings.METRICS_TOKEN
+    auth = request.headers.get('Authorization', '')
+    if token and auth.startswith('Bearer ') and hmac.compare_digest(auth[7:].encode(), token.encode()):
+        return True
+    if request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS:
+        return True
+    user = getattr(request, 'user', None)
+    return bool(user and user.is_active and user.is_staff)
+
+
+def metrics_view(request):
+    """
+    GET /metrics - для Prometheus scrape
+    """
+    if not is_metrics_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(render_prometheus(*collect()), content_type=CONTENT_TYPE)
@@ -0,0 +1,257 @@
+"""
+Замер запросов: время, SQL, шаблоны, размер ответа
+
+PerformanceMiddleware отдаёт замер клиенту в заголовке Server-Timing
+(видно в DevTools → Network → Timing) и копит гистограммы для /metrics
+(hair_app/metrics.py). Работает и в WSGI, и в ASGI-режиме.
+
+SQL и шаблоны считаются через contextvar текущего запроса: execute_wrapper
+ставится на каждое новое соединение (connection_created), а рендер
+шаблонов оборачивается один раз при старте (apps.ready). Контекст
+переходит в sync_to_async, поэтому запросы async-views тоже учитываются.
+
+ProfilingMiddleware снимает cProfile отдельных запросов (hair_app/profiling.py),
+QueryInspectorMiddleware (только для разработки) ищет N+1 (hair_app/querybudget.py).
+"""
+import logging
+import time
+from contextvars import ContextVar
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from . import metrics, profiling
+from .querybudget import repeated_queries
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_perf', default=None)
+
+
+class RequestPerf:
+    __slots__ = ('started', 'queries', 'db_time', 'template_time', 'sql')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        # Тексты запросов - только если включил QueryInspectorMiddleware
+        self.sql = None
+
+
+def current_perf():
+    """Замер текущего запроса (или None вне запроса)"""
+    return _current.get()
+
+
+def record_query(execute, sql, params, many, context):
+    perf = _current.get()
+    if perf is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        perf.queries += 1
+        perf.db_time += time.perf_counter() - start
+        if perf.sql is not None:
+            perf.sql.append(sql)
+
+
+def install_query_hook(sender, connection, **kwargs):
+    """connection_created: считать запросы этого соединения"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def instrument_templates():
+    """Обернуть рендер шаблонов Django-бэкенда (render(), TemplateResponse, админка)"""
+    from django.template.backends.django import Template
+    if getattr(Template.render, 'perf_instrumented', False):
+        return
+    original = Template.render
+
+    @wraps(original)
+    def render(self, context=None, request=None):
+        perf = _current.get()
+        if perf is None:
+            return original(self, context, request)
+        start = time.perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            perf.template_time += time.perf_counter() - start
+
+    render.perf_instrumented = True
+    Template.render = render
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    # Неизвестные URL - одной меткой, чтобы сканеры не плодили серии
+    return match.view_name if match else 'unresolved'
+
+
+def response_size(response):
+    if response.streaming:
+        return None
+    return len(response.content)
+
+
+def server_timing(perf, total):
+    return (
+        f'total;dur={total * 1000:.1f}, '
+        f'db;dur={perf.db_time * 1000:.1f};desc="{perf.queries} queries", '
+        f'tpl;dur={perf.template_time * 1000:.1f}'
+    )
+
+
+class PerformanceMiddleware:
+    """Server-Timing + метрики по имени URL"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        perf = RequestPerf()
+        token = _current.set(perf)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, perf)
+
+    async def __acall__(self, request):
+        perf = RequestPerf()
+        token = _current.set(perf)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, perf)
+
+    def finish(self, request, response, perf):
+        total = time.perf_counter() - perf.started
+        metrics.observe_request(
+            view=view_label(request),
+            method=request.method,
+            status=response.status_code,
+            duration=total,
+            queries=perf.queries,
+            db_time=perf.db_time,
+            template_time=perf.template_time,
+            size=response_size(response),
+        )
+        if settings.PERF_SERVER_TIMING:
+            response['Server-Timing'] = server_timing(perf, total)
+        return response
+
+
+class ProfilingMiddleware:
+    """cProfile запроса по токену staff или выборочно (PROFILE_SAMPLE_RATE)"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        trigger = profiling.choose_trigger(request)
+        profiler = profiling.Profiler()
+        if not trigger or not profiler.start():
+            return self.get_response(request)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.stop()
+        return self.finish(request, response, trigger, profiler, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        trigger = await sync_to_async(profiling.choose_trigger)(request)
+        profiler = profiling.Profiler()
+        if not trigger or not profiler.start():
+            return await self.get_response(request)
+        # В ASGI профиль видит поток event loop: код sync_to_async в нём
+        # не виден, а соседние корутины - видны
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiler.stop()
+        duration = time.perf_counter() - started
+        return await sync_to_async(self.finish)(request, response, trigger, profiler, duration)
+
+    def finish(self, request, response, trigger, profiler, duration):
+        try:
+            profile = profiling.save_profile(
+                profiler.dump(),
+                trigger=trigger,
+                method=request.method,
+                path=request.path,
+                view=view_label(request),
+                status_code=response.status_code,
+                duration=duration,
+            )
+        except Exception as e:
+            logger.error(f'Failed to save request profile: {e}')
+            return response
+        if trigger == 'token':
+            response['X-Profile-Id'] = str(profile.pk)
+        return response
+
+
+class QueryInspectorMiddleware:
+    """
+    Разработка (QUERY_INSPECTOR): число запросов и N+1 в заголовках и логе
+    Ставится после PerformanceMiddleware - пользуется его замером.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        perf = self.start()
+        response = self.get_response(request)
+        return self.finish(request, response, perf)
+
+    async def __acall__(self, request):
+        perf = self.start()
+        response = await self.get_response(request)
+        return self.finish(request, response, perf)
+
+    def start(self):
+        perf = current_perf()
+        if perf is not None:
+            perf.sql = []
+        return perf
+
+    def finish(self, request, response, perf):
+        if perf is None:
+            return response
+        repeated = repeated_queries(perf.sql, settings.QUERY_REPEAT_THRESHOLD)
+        response['X-Query-Count'] = str(len(perf.sql))
+        if repeated:
+            response['X-N-Plus-One'] = str(len(repeated))
+            for shape, count in repeated:
+                logger.warning(f'N+1 in {view_label(request)}: {count}x {shape}')
+        return response
@@ -0,0 +1,181 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:21
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hair_app", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="hairapplication",
+            name="age",
+            field=models.CharField(
+                choices=[
+                    ("детские", "Детские (до 14 лет)"),
+                    ("взрослые", "Взрослые (14+ лет)"),
+                ],
+                max_length=20,
+                verbose_name="Возраст",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="hairapplication",
+            name="color",
+            field=models.CharField(
+                choices=[
+                    ("блонд", "Блонд (светлые)"),
+                    ("светло-русые", "Светло-русые"),
+                    ("русые", "Русые"),
+                    ("темно-русые", "Темно-русые"),
+                    ("каштановые", "Темные (каштановые)"),
+                ],
+                max_length=20,
+                verbose_name="Цвет волос",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="hairapplication",
+            name="condition",
+            field=models.CharField(
+                choices=[
+                    ("натуральные", "Натуральные (не окрашенные)"),
+                    ("окрашенные", "Окрашенные"),
+                    ("после химии", "После химической завивки"),
+                ],
+                max_length=20,
+                verbose_name="Состояние волос",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="hairapplication",
+            name="estimated_price",
+            field=models.IntegerField(
+                default=0,
+                help_text="Автоматически рассчитывается по калькулятору",
+                verbose_name="Ориентировочная стоимость",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="hairapplication",
+            name="final_price",
+            field=models.IntegerField(
+                blank=True,
+                help_text="Устанавливается администратором",
+                null=True,
+                verbose_name="Итоговая стоимость",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="hairapplication",
+            name="length",
+            field=models.CharField(
+                choices=[
+                    ("40-50", "40-50 см"),
+                    ("50-60", "50-60 см"),
+                    ("60-80", "60-80 см"),
+                    ("80-100", "80-100 см"),
+                    ("100+", "Более 100 см"),
+                ],
+                max_length=10,
+                verbose_name="Длина волос",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="hairapplication",
+            name="phone",
+            field=models.CharField(
+                help_text="Формат: +7 (999) 123-45-67 или +79991234567",
+                max_length=20,
+                validators=[
+                    django.core.validators.RegexValidator(
+                        code="invalid_phone_format",
+                        message="Введите корректный российский номер (например: +7 (911) 957-17-12 или +79119571712)",
+                        regex="^\\+?7[\\s\\-\\(\\)]*9[\\d\\s\\-\\(\\)]*[\\d\\s\\-\\(\\)]*$",
+                    )
+                ],
+                verbose_name="Телефон",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="hairapplication",
+            name="structure",
+            field=models.CharField(
+                choices=[
+                    ("славянка", "Славянка (тонкие)"),
+                    ("среднее", "Средние"),
+                    ("густые", "Густые"),
+                ],
+                max_length=20,
+                verbose_name="Структура волос",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="pricelist",
+            name="base_price",
+            field=models.IntegerField(
+                validators=[django.core.validators.MinValueValidator(0)],
+                verbose_name="Базовая цена",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="pricelist",
+            name="color",
+            field=models.CharField(
+                choices=[
+                    ("блонд", "Блонд (светлые)"),
+                    ("светло-русые", "Светло-русые"),
+                    ("русые", "Русые"),
+                    ("темно-русые", "Темно-русые"),
+                    ("каштановые", "Темные (каштановые)"),
+                ],
+                max_length=20,
+                verbose_name="Цвет",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="pricelist",
+            name="condition",
+            field=models.CharField(
+                choices=[
+                    ("натуральные", "Натуральные (не окрашенные)"),
+                    ("окрашенные", "Окрашенные"),
+                    ("после химии", "После химической завивки"),
+                ],
+                max_length=20,
+                verbose_name="Состояние",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="pricelist",
+            name="length",
+            field=models.CharField(
+                choices=[
+                    ("40-50", "40-50 см"),
+                    ("50-60", "50-60 см"),
+                    ("60-80", "60-80 см"),
+                    ("80-100", "80-100 см"),
+                    ("100+", "Более 100 см"),
+                ],
+                max_length=10,
+                verbose_name="Длина",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="pricelist",
+            name="structure",
+            field=models.CharField(
+                choices=[
+                    ("славянка", "Славянка (тонкие)"),
+                    ("среднее", "Средние"),
+                    ("густые", "Густые"),
+                ],
+                max_length=20,
+                verbose_name="Структура",
+            ),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:21
+
+from django.db import migrations, models
+
+
+def fill_phone_digits(apps, schema_editor):
+    HairApplication = apps.get_model("hair_app", "HairApplication")
+    batch = []
+    for app in HairApplication.objects.only("id", "phone").iterator():
+        app.phone_digits = "".join(c for c in app.phone or "" if c.isdigit())
+        batch.append(app)
+        if len(batch) >= 500:
+            HairApplication.objects.bulk_update(batch, ["phone_digits"])
+            batch = []
+    if batch:
+        HairApplication.objects.bulk_update(batch, ["phone_digits"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hair_app", "0002_sync_choices_and_price_fields"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="hairapplication",
+            name="hair_app_ha_status_938357_idx",
+        ),
+        migrations.AddField(
+            model_name="hairapplication",
+            name="phone_digits",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                max_length=20,
+                verbose_name="Телефон (цифры)",
+            ),
+        ),
+        migrations.RunPython(fill_phone_digits, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="hairapplication",
+            index=models.Index(
+                fields=["status", "-created_at"], name="hair_app_status_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="hairapplication",
+            index=models.Index(
+                condition=models.Q(("status__in", ["new", "viewed", "accepted"])),
+                fields=["-created_at"],
+                name="hair_app_open_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="hairapplication",
+            index=models.Index(fields=["color"], name="hair_app_color_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="hairapplication",
+            index=models.Index(fields=["length"], name="hair_app_length_idx"),
+        ),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hair_app", "0004_application_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ApplicationStatusChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "old_status",
+                    models.CharField(
+                        choices=[
+                            ("new", "Новая"),
+                            ("viewed", "Просмотрена"),
+                            ("accepted", "Принята"),
+                            ("rejected", "Отклонена"),
+                            ("completed", "Завершена"),
+                        ],
+                        max_length=20,
+                        verbose_name="Старый статус",
+                    ),
+                ),
+                (
+                    "new_status",
+                    models.CharField(
+                        choices=[
+                            ("new", "Новая"),
+                            ("viewed", "Просмотрена"),
+                            ("accepted", "Принята"),
+                            ("rejected", "Отклонена"),
+                            ("completed", "Завершена"),
+                        ],
+                        max_length=20,
+                        verbose_name="Новый статус",
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[
+                            ("admin", "Админка"),
+                            ("bot", "Telegram бот"),
+                            ("api", "API"),
+                        ],
+                        max_length=20,
+                        verbose_name="Источник",
+                    ),
+                ),
+                (
+                    "actor",
+                    models.CharField(
+                        blank=True, max_length=100, verbose_name="Кто изменил"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата изменения"
+                    ),
+                ),
+                (
+                    "application",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="status_changes",
+                        to="hair_app.hairapplication",
+                        verbose_name="Заявка",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Смена статуса",
+                "verbose_name_plural": "История статусов",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["application", "-created_at"],
+                        name="hair_app_status_change_idx",
+                    )
+                ],
+            },
+        ),
+    ]
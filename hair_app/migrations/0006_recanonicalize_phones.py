@@ -0,0 +1,53 @@
+import re
+
+from django.db import migrations
+
+NON_DIGITS_RE = re.compile(r"\D")
+FIRST_SIGNIFICANT_RE = re.compile(r"[\d+]")
+
+
+def canonicalize_phone(phone_value):
+    """
+    Копия hair_app.models.canonicalize_phone на момент миграции:
+    (формат для показа, цифры). Невалидный номер не меняется.
+    """
+    if not phone_value:
+        return phone_value, ""
+    text = str(phone_value)
+    raw_digits = digits = NON_DIGITS_RE.sub("", text)
+    first = FIRST_SIGNIFICANT_RE.search(text)
+    if first is None or first.group() != "+":
+        if digits.startswith("8"):
+            digits = "7" + digits[1:]
+        elif not digits.startswith("7"):
+            digits = "7" + digits
+    if len(digits) != 11 or digits[0] != "7":
+        return phone_value, raw_digits
+    return f"+7 ({digits[1:4]}) {digits[4:7]}-{digits[7:9]}-{digits[9:11]}", digits
+
+
+def recanonicalize_phones(apps, schema_editor):
+    # Номера вида 8XXXXXXXXXX раньше сохранялись как есть - приводим к +7
+    HairApplication = apps.get_model("hair_app", "HairApplication")
+    batch = []
+    for app in HairApplication.objects.only("id", "phone", "phone_digits").iterator():
+        phone, digits = canonicalize_phone(app.phone)
+        if phone != app.phone or digits != app.phone_digits:
+            app.phone, app.phone_digits = phone, digits
+            batch.append(app)
+        if len(batch) >= 500:
+            HairApplication.objects.bulk_update(batch, ["phone", "phone_digits"])
+            batch = []
+    if batch:
+        HairApplication.objects.bulk_update(batch, ["phone", "phone_digits"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hair_app", "0005_applicationstatuschange"),
+    ]
+
+    operations = [
+        migrations.RunPython(recanonicalize_phones, migrations.RunPython.noop),
+    ]
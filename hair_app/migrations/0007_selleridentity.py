@@ -0,0 +1,146 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:28
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_seller_identities(apps, schema_editor):
+    HairApplication = apps.get_model("hair_app", "HairApplication")
+    SellerIdentity = apps.get_model("hair_app", "SellerIdentity")
+    window = timedelta(hours=getattr(settings, "DUPLICATE_APPLICATION_WINDOW_HOURS", 24))
+
+    identities = {}
+    flagged = []
+    rows = HairApplication.objects.order_by("created_at", "id").values_list(
+        "id", "phone_digits", "email", "created_at"
+    )
+    for app_id, digits, email, created_at in rows.iterator():
+        keys = []
+        if digits:
+            keys.append(("phone", digits))
+        if email:
+            keys.append(("email", email.strip().lower()))
+
+        prior = 0
+        duplicate = False
+        for key in keys:
+            identity = identities.get(key)
+            if identity:
+                prior = max(prior, identity["count"])
+                duplicate = duplicate or created_at - identity["last_seen_at"] <= window
+            else:
+                identity = identities[key] = {"count": 0}
+            identity["count"] += 1
+            identity["last_seen_at"] = created_at
+            identity["last_application_id"] = app_id
+
+        if prior or duplicate:
+            flagged.append(
+                HairApplication(id=app_id, prior_applications=prior, is_duplicate=duplicate)
+            )
+
+    HairApplication.objects.bulk_update(
+        flagged, ["prior_applications", "is_duplicate"], batch_size=500
+    )
+    SellerIdentity.objects.bulk_create(
+        [
+            SellerIdentity(
+                kind=kind,
+                key=key,
+                application_count=identity["count"],
+                last_seen_at=identity["last_seen_at"],
+                last_application_id=identity["last_application_id"],
+            )
+            for (kind, key), identity in identities.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hair_app", "0006_recanonicalize_phones"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="hairapplication",
+            name="is_duplicate",
+            field=models.BooleanField(
+                default=False,
+                editable=False,
+                help_text="Заявка с тем же телефоном или email недавно уже была",
+                verbose_name="Дубль",
+            ),
+        ),
+        migrations.AddField(
+            model_name="hairapplication",
+            name="prior_applications",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Предыдущих заявок"
+            ),
+        ),
+        migrations.CreateModel(
+            name="SellerIdentity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("phone", "Телефон"), ("email", "Email")],
+                        max_length=10,
+                        verbose_name="Тип",
+                    ),
+                ),
+                (
+                    "key",
+                    models.CharField(
+                        help_text="Цифры телефона или email в нижнем регистре",
+                        max_length=254,
+                        verbose_name="Ключ",
+                    ),
+                ),
+                (
+                    "application_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Заявок"),
+                ),
+                (
+                    "last_seen_at",
+                    models.DateTimeField(verbose_name="Последняя заявка (дата)"),
+                ),
+                (
+                    "last_application",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="hair_app.hairapplication",
+                        verbose_name="Последняя заявка",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Продавец",
+                "verbose_name_plural": "Продавцы",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("kind", "key"), name="hair_app_seller_identity_uniq"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_seller_identities, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:51
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hair_app", "0007_selleridentity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PhotoUpload",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "filename",
+                    models.CharField(max_length=255, verbose_name="Имя файла"),
+                ),
+                ("size", models.PositiveIntegerField(verbose_name="Размер, байт")),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Начата"),
+                ),
+                (
+                    "completed_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Завершена"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Загрузка фото",
+                "verbose_name_plural": "Загрузки фото",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:55
+
+import hair_app.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hair_app", "0008_photoupload"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoredFile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=255, unique=True, verbose_name="Путь в хранилище"
+                    ),
+                ),
+                ("sha256", models.CharField(max_length=64, verbose_name="SHA-256")),
+                ("size", models.PositiveIntegerField(verbose_name="Размер, байт")),
+                (
+                    "ref_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Ссылок"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Записан"),
+                ),
+            ],
+            options={
+                "verbose_name": "Файл хранилища",
+                "verbose_name_plural": "Файлы хранилища",
+            },
+        ),
+        migrations.AlterField(
+            model_name="hairapplication",
+            name="photo1",
+            field=models.ImageField(
+                help_text="Обязательное",
+                storage=hair_app.storage.get_photo_storage,
+                upload_to="photos/",
+                verbose_name="Фото 1",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="hairapplication",
+            name="photo2",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=hair_app.storage.get_photo_storage,
+                upload_to="photos/",
+                verbose_name="Фото 2",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="hairapplication",
+            name="photo3",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=hair_app.storage.get_photo_storage,
+                upload_to="photos/",
+                verbose_name="Фото 3",
+            ),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hair_app", "0009_content_addressed_photos"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RequestProfile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, db_index=True, verbose_name="Снят"
+                    ),
+                ),
+                (
+                    "trigger",
+                    models.CharField(
+                        choices=[("token", "По токену"), ("sample", "Выборка")],
+                        max_length=10,
+                        verbose_name="Причина",
+                    ),
+                ),
+                ("method", models.CharField(max_length=10, verbose_name="Метод")),
+                ("path", models.CharField(max_length=500, verbose_name="Путь")),
+                ("view", models.CharField(max_length=200, verbose_name="View")),
+                (
+                    "status_code",
+                    models.PositiveSmallIntegerField(verbose_name="Код ответа"),
+                ),
+                ("duration", models.FloatField(verbose_name="Время, с")),
+                (
+                    "file",
+                    models.FileField(
+                        upload_to="profiles/%Y/%m/", verbose_name="Файл профиля"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Профиль запроса",
+                "verbose_name_plural": "Профили запросов",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
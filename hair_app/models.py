@@ -1,47 +1,107 @@
 """
 Models for hair purchase application
 """
-from django.db import models
+import re
+import uuid
+from types import MappingProxyType
+from typing import NamedTuple
+from django.db import models, transaction
+from django.db.models import DEFERRED, Q
 from django.core.validators import MinValueValidator, MaxValueValidator, RegexValidator
 from django.utils.translation import gettext_lazy as _
 from hair_app.price_calculator import calculate_hair_price
+from hair_app.storage import get_photo_storage
 
 
-def normalize_phone(phone_value):
+_NON_DIGITS_RE = re.compile(r'\D')
+_FIRST_SIGNIFICANT_RE = re.compile(r'[\d+]')
+
+
+class CanonicalPhone(NamedTuple):
+    display: str
+    digits: str
+    is_valid: bool
+
+
+def canonicalize_phone(phone_value):
     """
-    Нормализует телефон в формат +7 (999) 123-45-67
+    Один проход по строке: формат для показа + ключ из цифр.
     Принимает:
     - +79991234567
     - +7 999 123 4567
     - +7 (999) 123-45-67
     - 79991234567
     - 89991234567
+    - 9991234567
+    
+    Returns:
+        CanonicalPhone(display, digits, is_valid). Для невалидного номера
+        display - исходное значение, digits - все цифры из него.
     """
     if not phone_value:
-        return phone_value
-    
-    # Убираем все символы кроме цифр и +
-    cleaned = ''.join(c for c in str(phone_value) if c.isdigit() or c == '+')
-    
-    # Если нет +, добавляем
-    if not cleaned.startswith('+'):
-        # Если начинается с 8, заменяем на 7
-        if cleaned.startswith('8'):
-            cleaned = '7' + cleaned[1:]
-        # Если не начинается с 7, добавляем +7
-        elif not cleaned.startswith('7'):
-            cleaned = '7' + cleaned
-        # Иначе просто добавляем +
-        else:
-            cleaned = '+' + cleaned
+        return CanonicalPhone(phone_value, '', False)
+    
+    text = str(phone_value)
+    raw_digits = digits = _NON_DIGITS_RE.sub('', text)
+    first = _FIRST_SIGNIFICANT_RE.search(text)
+    has_plus = first is not None and first.group() == '+'
+    
+    if not has_plus:
+        # 8 999 ... → 7 999 ..., 999 ... → 7 999 ...
+        if digits.startswith('8'):
+            digits = '7' + digits[1:]
+        elif not digits.startswith('7'):
+            digits = '7' + digits
     
     # Проверяем, что это российский номер и имеет 11 цифр
-    digits = ''.join(c for c in cleaned if c.isdigit())
-    if not (cleaned.startswith('+7') and len(digits) == 11):
-        return phone_value  # Возвращаем оригинальное значение если не валидно
+    if len(digits) != 11 or digits[0] != '7':
+        return CanonicalPhone(phone_value, raw_digits, False)
     
-    # Форматируем в +7 (999) 123-45-67
-    return f"+{digits[0]} ({digits[1:4]}) {digits[4:7]}-{digits[7:9]}-{digits[9:11]}"
+    display = f"+7 ({digits[1:4]}) {digits[4:7]}-{digits[7:9]}-{digits[9:11]}"
+    return CanonicalPhone(display, digits, True)
+
+
+def normalize_phone(phone_value):
+    """
+    Нормализует телефон в формат +7 (999) 123-45-67
+    Невалидный номер возвращается как есть.
+    """
+    return canonicalize_phone(phone_value).display
+
+
+def phone_digits(phone_value):
+    """
+    Ключ телефона для индексированного поиска.
+    Например: 8 (999) 123-45-67 → 79991234567
+    """
+    return canonicalize_phone(phone_value).digits
+
+
+# Справочники для калькулятора - строятся один раз при импорте, а не на каждый save()
+LENGTH_CM_MAP = MappingProxyType({
+    '40-50': 45,
+    '50-60': 55,
+    '60-80': 65,
+    '80-100': 90,
+})
+
+STRUCTURE_MAP = MappingProxyType({
+    'славянка': 'славянка',
+    'среднее': 'среднее',
+    'густые': 'густые',
+})
+
+AGE_MAP = MappingProxyType({
+    'детские': 'детские',
+    'взрослые': 'взрослые',
+})
+
+# Незавершённые статусы (очередь бота, частичный индекс)
+OPEN_STATUSES = ('new', 'viewed', 'accepted')
+
+# Поля, изменения которых отслеживаются между загрузкой и save():
+# телефон - для нормализации, статус - для событий, фото - для ссылок на файлы
+TRACKED_FIELDS = ('phone', 'status', 'photo1', 'photo2', 'photo3')
 
 
 class HairApplication(models.Model):
@@ -92,6 +152,8 @@ class HairApplication(models.Model):
         ('completed', 'Завершена'),
     ]
     
+    OPEN_STATUSES = OPEN_STATUSES
+    
     # Валидатор телефона - ✅ ИСПРАВЛЕНО: теперь более гибкий
     # Принимает любые форматы российского номера (7-11 цифр)
     phone_validator = RegexValidator(
@@ -131,22 +193,25 @@ class HairApplication(models.Model):
         verbose_name='Состояние волос'
     )
     
-    # Фотографии
+    # Фотографии - в хранилище по хешу содержимого (hair_app/storage.py)
     photo1 = models.ImageField(
-        upload_to='hair_photos/%Y/%m/%d/',
+        upload_to='photos/',
+        storage=get_photo_storage,
         verbose_name='Фото 1',
         help_text='Обязательное'
     )
     
     photo2 = models.ImageField(
-        upload_to='hair_photos/%Y/%m/%d/',
+        upload_to='photos/',
+        storage=get_photo_storage,
         verbose_name='Фото 2',
         blank=True,
         null=True
     )
     
     photo3 = models.ImageField(
-        upload_to='hair_photos/%Y/%m/%d/',
+        upload_to='photos/',
+        storage=get_photo_storage,
         verbose_name='Фото 3',
         blank=True,
         null=True
@@ -165,6 +230,15 @@ class HairApplication(models.Model):
         help_text='Формат: +7 (999) 123-45-67 или +79991234567'
     )
     
+    # Только цифры телефона для поиска по индексу (заполняется в clean())
+    phone_digits = models.CharField(
+        max_length=20,
+        verbose_name='Телефон (цифры)',
+        blank=True,
+        editable=False,
+        db_index=True
+    )
+    
     email = models.EmailField(
         verbose_name='Email',
         blank=True
@@ -210,6 +284,20 @@ class HairApplication(models.Model):
         blank=True
     )
     
+    # Повторные продавцы (заполняется hair_app.sellers при создании)
+    prior_applications = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Предыдущих заявок'
+    )
+    
+    is_duplicate = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Дубль',
+        help_text='Заявка с тем же телефоном или email недавно уже была'
+    )
+    
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Дата создания'
@@ -226,7 +314,17 @@ class HairApplication(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['-created_at']),
-            models.Index(fields=['status']),
+            # Фильтр по статусу + сортировка по дате (админка, дашборд)
+            models.Index(fields=['status', '-created_at'], name='hair_app_status_created_idx'),
+            # Очередь бота: только незавершённые заявки
+            models.Index(
+                fields=['-created_at'],
+                name='hair_app_open_created_idx',
+                condition=Q(status__in=list(OPEN_STATUSES)),
+            ),
+            # GROUP BY на дашборде
+            models.Index(fields=['color'], name='hair_app_color_idx'),
+            models.Index(fields=['length'], name='hair_app_length_idx'),
         ]
     
     def __str__(self):
@@ -236,56 +334,69 @@ class HairApplication(models.Model):
         """
         Очищаем и нормализуем данные перед сохранением.
         """
-        # Нормализуем телефон
-        self.phone = normalize_phone(self.phone)
+        # Нормализуем телефон и ключ для поиска за один проход
+        self.phone, self.phone_digits, _ = canonicalize_phone(self.phone)
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_tracked_values()
+        return instance
+    
+    def _remember_tracked_values(self):
+        # Для фото - имя файла: FieldFile меняет name на месте при save()
+        self._loaded_values = {
+            field: getattr(self.__dict__[field], 'name', self.__dict__[field])
+            for field in TRACKED_FIELDS if field in self.__dict__
+        }
+    
+    def get_dirty_fields(self):
+        """
+        Какие из TRACKED_FIELDS изменились с момента загрузки.
+        Для новой заявки - все.
+        """
+        loaded = getattr(self, '_loaded_values', None)
+        if self._state.adding or loaded is None:
+            return set(TRACKED_FIELDS)
+        return {
+            field for field in TRACKED_FIELDS
+            if field in self.__dict__ and self.__dict__[field] != loaded.get(field, DEFERRED)
+        }
     
     def save(self, *args, **kwargs):
         """
         Оверрайд save для автоматического расчета цены.
-        Надо нормализовать данные из модели для калькулятора.
+        Нормализация телефона запускается только если телефон изменился,
+        update_fields учитывается.
         """
-        # Вызываем clean() для нормализации
-        self.clean()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
         
-        # Нормализация значений длины - ТЕПЕРЬ ИСПРАВЛЕНО
-        length_map = {
-            '40-50': 45,
-            '50-60': 55,
-            '60-80': 65,    # ИСПРАВЛЕНО! (было '60-70', '70-80', '80-90')
-            '80-100': 90,   # ИСПРАВЛЕНО! (было '90-100')
-        }
+        dirty = self.get_dirty_fields()
         
-        # Нормализация цветов
-        # Оставляем как есть
-        
-        # Нормализация структуры
-        structure_map = {
-            'славянка': 'славянка',
-            'среднее': 'среднее',
-            'густые': 'густые',
-        }
-        
-        # Нормализация возраста
-        age_map = {
-            'детские': 'детские',
-            'взрослые': 'взрослые',
-        }
+        # Вызываем clean() для нормализации
+        if 'phone' in dirty and (update_fields is None or 'phone' in update_fields):
+            self.clean()
+            if update_fields is not None:
+                update_fields.add('phone_digits')
         
         # Рассчитываем цену только если её нет
-        if not self.estimated_price:
-            normalized_length = length_map.get(self.length, 50)
-            normalized_structure = structure_map.get(self.structure, 'среднее')
-            normalized_age = age_map.get(self.age, 'взрослые')
-            
+        if not self.estimated_price and (update_fields is None or 'estimated_price' in update_fields):
             self.estimated_price = calculate_hair_price(
-                length=normalized_length,
+                length=LENGTH_CM_MAP.get(self.length, 50),
                 color=self.color,
                 condition=self.condition,
-                structure=normalized_structure,
-                age=normalized_age
+                structure=STRUCTURE_MAP.get(self.structure, 'среднее'),
+                age=AGE_MAP.get(self.age, 'взрослые')
             )
         
-        super().save(*args, **kwargs)
+        if update_fields is not None:
+            kwargs['update_fields'] = update_fields
+        # Ссылки на новые фото (StoredFile) пишутся в той же транзакции
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+        self._remember_tracked_values()
 
 
 class PriceList(models.Model):
@@ -399,3 +510,253 @@ class TelegramAdmin(models.Model):
     def __str__(self):
         name = self.username or f'{self.first_name} {self.last_name}'.strip() or str(self.telegram_id)
         return f'{name} ({self.telegram_id})'
+
+
+class ApplicationStatusChange(models.Model):
+    """
+    Журнал смены статусов заявок
+    """
+    SOURCE_CHOICES = [
+        ('admin', 'Админка'),
+        ('bot', 'Telegram бот'),
+        ('api', 'API'),
+    ]
+    
+    application = models.ForeignKey(
+        HairApplication,
+        on_delete=models.CASCADE,
+        related_name='status_changes',
+        verbose_name='Заявка'
+    )
+    
+    old_status = models.CharField(
+        max_length=20,
+        choices=HairApplication.STATUS_CHOICES,
+        verbose_name='Старый статус'
+    )
+    
+    new_status = models.CharField(
+        max_length=20,
+        choices=HairApplication.STATUS_CHOICES,
+        verbose_name='Новый статус'
+    )
+    
+    source = models.CharField(
+        max_length=20,
+        choices=SOURCE_CHOICES,
+        verbose_name='Источник'
+    )
+    
+    actor = models.CharField(
+        max_length=100,
+        verbose_name='Кто изменил',
+        blank=True
+    )
+    
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата изменения'
+    )
+    
+    class Meta:
+        verbose_name = 'Смена статуса'
+        verbose_name_plural = 'История статусов'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['application', '-created_at'], name='hair_app_status_change_idx'),
+        ]
+    
+    def __str__(self):
+        return f'#{self.application_id}: {self.old_status} → {self.new_status}'
+
+
+class SellerIdentity(models.Model):
+    """
+    Продавец по нормализованному телефону или email
+    """
+    KIND_CHOICES = [
+        ('phone', 'Телефон'),
+        ('email', 'Email'),
+    ]
+    
+    kind = models.CharField(
+        max_length=10,
+        choices=KIND_CHOICES,
+        verbose_name='Тип'
+    )
+    
+    key = models.CharField(
+        max_length=254,
+        verbose_name='Ключ',
+        help_text='Цифры телефона или email в нижнем регистре'
+    )
+    
+    application_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Заявок'
+    )
+    
+    last_application = models.ForeignKey(
+        HairApplication,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Последняя заявка'
+    )
+    
+    last_seen_at = models.DateTimeField(
+        verbose_name='Последняя заявка (дата)'
+    )
+    
+    class Meta:
+        verbose_name = 'Продавец'
+        verbose_name_plural = 'Продавцы'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'key'], name='hair_app_seller_identity_uniq'),
+        ]
+    
+    def __str__(self):
+        return f'{self.get_kind_display()}: {self.key} ({self.application_count})'
+
+
+class PhotoUpload(models.Model):
+    """
+    Фото, загружаемое частями до отправки заявки (hair_app/uploads.py)
+    Принятые байты лежат во временном файле, смещение - его размер.
+    """
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    
+    filename = models.CharField(
+        max_length=255,
+        verbose_name='Имя файла'
+    )
+    
+    size = models.PositiveIntegerField(
+        verbose_name='Размер, байт'
+    )
+    
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Начата'
+    )
+    
+    completed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Завершена'
+    )
+    
+    class Meta:
+        verbose_name = 'Загрузка фото'
+        verbose_name_plural = 'Загрузки фото'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f'{self.filename} ({self.id})'
+    
+    @property
+    def is_complete(self):
+        return self.completed_at is not None
+
+
+class StoredFile(models.Model):
+    """
+    Файл в хранилище по хешу содержимого и число ссылок на него
+    Одинаковые фото хранятся один раз; файл удаляется, когда ссылок не осталось.
+    """
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='Путь в хранилище'
+    )
+    
+    sha256 = models.CharField(
+        max_length=64,
+        verbose_name='SHA-256'
+    )
+    
+    size = models.PositiveIntegerField(
+        verbose_name='Размер, байт'
+    )
+    
+    ref_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Ссылок'
+    )
+    
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Записан'
+    )
+    
+    class Meta:
+        verbose_name = 'Файл хранилища'
+        verbose_name_plural = 'Файлы хранилища'
+    
+    def __str__(self):
+        return f'{self.name} ({self.ref_count})'
+
+
+class RequestProfile(models.Model):
+    """
+    Профиль одного запроса (cProfile), снятый по токену или выборочно
+    Файл .prof лежит в MEDIA_ROOT/profiles/ (nginx его не раздаёт),
+    открывается в админке или в snakeviz. Хранятся последние PROFILE_MAX_COUNT.
+    """
+    TRIGGER_CHOICES = [
+        ('token', 'По токену'),
+        ('sample', 'Выборка'),
+    ]
+    
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Снят'
+    )
+    
+    trigger = models.CharField(
+        max_length=10,
+        choices=TRIGGER_CHOICES,
+        verbose_name='Причина'
+    )
+    
+    method = models.CharField(
+        max_length=10,
+        verbose_name='Метод'
+    )
+    
+    path = models.CharField(
+        max_length=500,
+        verbose_name='Путь'
+    )
+    
+    view = models.CharField(
+        max_length=200,
+        verbose_name='View'
+    )
+    
+    status_code = models.PositiveSmallIntegerField(
+        verbose_name='Код ответа'
+    )
+    
+    duration = models.FloatField(
+        verbose_name='Время, с'
+    )
+    
+    file = models.FileField(
+        upload_to='profiles/%Y/%m/',
+        verbose_name='Файл профиля'
+    )
+    
+    class Meta:
+        verbose_name = 'Профиль запроса'
+        verbose_name_plural = 'Профили запросов'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f'{self.method} {self.path} ({self.duration * 1000:.0f} ms)'
@@ -0,0 +1,64 @@
+"""
+Проверка и уменьшение фото заявок при загрузке
+
+Форма на сайте сама уменьшает фото до PHOTO_MAX_DIMENSION и перекодирует
+в WebP/JPEG (static/js/photo-upload.js) - такие файлы сохраняются как есть,
+без повторного кодирования. Крупные фото от клиентов без canvas
+уменьшаются здесь, чтобы на диске не лежали 8 МБ оригиналы.
+"""
+import io
+import logging
+import os
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Форматы, которые браузеры умеют показать и которые отдаёт canvas
+ALLOWED_FORMATS = ('JPEG', 'PNG', 'WEBP')
+DOWNSCALE_QUALITY = 85
+
+
+def photo_info(uploaded):
+    """
+    (format, (width, height)) загруженного фото.
+    ImageField уже проверил файл через Pillow и оставил результат в .image -
+    повторно файл не читается.
+    """
+    image = getattr(uploaded, 'image', None)
+    if image is None:
+        uploaded.seek(0)
+        image = Image.open(uploaded)
+    return image.format, image.size
+
+
+def needs_downscale(uploaded, max_dimension=None):
+    max_dimension = max_dimension or settings.PHOTO_MAX_DIMENSION
+    _, (width, height) = photo_info(uploaded)
+    return max(width, height) > max_dimension
+
+
+def downscale_photo(uploaded, max_dimension=None):
+    """
+    Вернуть uploaded, если фото уже не больше max_dimension,
+    иначе - JPEG-копию, уменьшенную по длинной стороне.
+    """
+    max_dimension = max_dimension or settings.PHOTO_MAX_DIMENSION
+    if not needs_downscale(uploaded, max_dimension):
+        return uploaded
+
+    uploaded.seek(0)
+    image = Image.open(uploaded)
+    # Для JPEG декодирование сразу в уменьшенном масштабе
+    image.draft('RGB', (max_dimension, max_dimension))
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((max_dimension, max_dimension))
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=DOWNSCALE_QUALITY, optimize=True)
+    name = os.path.splitext(os.path.basename(uploaded.name))[0] + '.jpg'
+    logger.info(f'Photo downscaled on server: {uploaded.name} {uploaded.size} → {buffer.tell()} bytes')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
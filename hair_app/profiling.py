@@ -0,0 +1,138 @@
+"""
+Профилирование запросов в продакшене без передеплоя
+
+Два режима (ProfilingMiddleware, hair_app/middleware.py):
+- по токену: staff получает в админке (Профили запросов) подписанный токен
+  и передаёт его в заголовке X-Profile-Token (не в URL - query string
+  попадает в access-логи) - профилируется только этот запрос, ответ
+  получает X-Profile-Id;
+- выборка: PROFILE_SAMPLE_RATE (доля, по умолчанию 0) случайных запросов.
+
+Профиль снимается cProfile и сохраняется в MEDIA_ROOT/profiles/ как .prof
+(pstats) вместе с записью RequestProfile; хранятся последние PROFILE_MAX_COUNT.
+Одновременно профилируется один запрос на процесс: остальные в это время
+выполняются как обычно.
+"""
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+import random
+from threading import Lock
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.files.base import ContentFile
+
+logger = logging.getLogger(__name__)
+
+TOKEN_HEADER = 'X-Profile-Token'
+TOKEN_SALT = 'hair_app.profiling'
+
+_busy = Lock()
+
+
+# ====================
+# ТОКЕН
+# ====================
+
+def make_token(user):
+    """Подписанный токен профилирования для staff-пользователя"""
+    return signing.dumps({'user': user.pk}, salt=TOKEN_SALT, compress=True)
+
+
+def check_token(token):
+    """Токен подписан, не истёк и выдан действующему staff"""
+    try:
+        data = signing.loads(token, salt=TOKEN_SALT, max_age=settings.PROFILE_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return get_user_model().objects.filter(
+        pk=data.get('user'), is_active=True, is_staff=True
+    ).exists()
+
+
+def choose_trigger(request):
+    """'token', 'sample' или None - профилировать ли запрос"""
+    token = request.headers.get(TOKEN_HEADER)
+    if token:
+        if check_token(token):
+            return 'token'
+        logger.warning(f'Invalid profiling token for {request.path}')
+    rate = settings.PROFILE_SAMPLE_RATE
+    if rate > 0 and random.random() < rate:
+        return 'sample'
+    return None
+
+
+# ====================
+# ПРОФИЛЬ
+# ====================
+
+class Profiler:
+    """cProfile одного запроса; start() - False, если процесс уже профилирует"""
+
+    def __init__(self):
+        self.profile = None
+
+    def start(self):
+        if not _busy.acquire(blocking=False):
+            return False
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+        return True
+
+    def stop(self):
+        self.profile.disable()
+        _busy.release()
+
+    def dump(self):
+        self.profile.create_stats()
+        return marshal.dumps(self.profile.stats)
+
+
+def save_profile(data, trigger, method, path, view, status_code, duration):
+    """Записать профиль и удалить старые сверх PROFILE_MAX_COUNT"""
+    from .models import RequestProfile
+    profile = RequestProfile(
+        trigger=trigger,
+        method=method,
+        path=path[:500],
+        view=view[:200],
+        status_code=status_code,
+        duration=duration,
+    )
+    profile.file.save(f'{view.replace(":", "-")}.prof', ContentFile(data), save=False)
+    profile.save()
+    logger.info(f'Request profiled ({trigger}): {method} {path} - {profile.pk}')
+
+    stale = RequestProfile.objects.order_by('-created_at', '-pk')[settings.PROFILE_MAX_COUNT:]
+    for old in stale:
+        old.delete()
+    return profile
+
+
+def delete_profile_file(sender, instance, **kwargs):
+    """post_delete: удалить файл профиля вместе с записью"""
+    if instance.file:
+        instance.file.delete(save=False)
+
+
+def render_stats(profile, sort='cumulative', limit=60):
+    """Текстовый отчёт pstats для админки"""
+    stream = io.StringIO()
+    with profile.file.open('rb') as file:
+        stats = pstats.Stats(_StatsSource(marshal.loads(file.read())), stream=stream)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+class _StatsSource:
+    """pstats.Stats принимает объект с create_stats()/stats"""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
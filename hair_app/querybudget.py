@@ -0,0 +1,96 @@
+"""
+Бюджет SQL-запросов и поиск N+1
+
+    with QueryBudget(3, max_repeats=2):
+        client.get('/api/admin/chart/')
+
+    @QueryBudget(5)
+    def test_dashboard(...): ...
+
+QueryBudget считает запросы всех соединений текущего потока и бросает
+QueryBudgetExceeded (AssertionError - в pytest это обычный провал теста),
+если запросов больше max_queries или один и тот же SQL с разными
+параметрами повторился больше max_repeats раз (запросы в цикле, N+1).
+
+В разработке то же показывает QueryInspectorMiddleware (hair_app/middleware.py).
+"""
+import re
+from collections import Counter
+from contextlib import ExitStack
+from functools import wraps
+from django.db import connections
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_RE = re.compile(r'%s|\?')
+_IN_LIST_RE = re.compile(r'\bIN \(\?(?:, \?)*\)', re.IGNORECASE)
+
+
+def sql_shape(sql):
+    """SQL без значений: запросы, отличающиеся только параметрами, совпадают"""
+    sql = ' '.join(sql.split())
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _PLACEHOLDER_RE.sub('?', sql)
+    return _IN_LIST_RE.sub('IN (...)', sql)
+
+
+def repeated_queries(queries, threshold):
+    """[(форма SQL, сколько раз)] для форм, повторённых больше threshold раз"""
+    counts = Counter(sql_shape(sql) for sql in queries)
+    return [(shape, count) for shape, count in counts.most_common() if count > threshold]
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryBudget:
+    """Контекстный менеджер / декоратор: не больше max_queries запросов и max_repeats повторов"""
+
+    def __init__(self, max_queries=None, max_repeats=None):
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+        self.queries = []
+        self._stack = None
+
+    def __enter__(self):
+        self.queries = []
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self._record))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stack.close()
+        if exc_type is None:
+            self.check()
+        return False
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # Новый экземпляр на вызов: декоратор можно вызывать повторно и из потоков
+            with QueryBudget(self.max_queries, self.max_repeats):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def _record(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    @property
+    def repeated(self):
+        if self.max_repeats is None:
+            return []
+        return repeated_queries(self.queries, self.max_repeats)
+
+    def check(self):
+        problems = []
+        if self.max_queries is not None and len(self.queries) > self.max_queries:
+            problems.append(f'{len(self.queries)} queries, budget {self.max_queries}')
+        for shape, count in self.repeated:
+            problems.append(f'N+1: {count}x {shape}')
+        if problems:
+            listing = '\n'.join(f'  {i}. {sql}' for i, sql in enumerate(self.queries, 1))
+            raise QueryBudgetExceeded('\n'.join(problems) + f'\nQueries:\n{listing}')
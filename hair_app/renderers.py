@@ -0,0 +1,55 @@
+"""
+orjson-рендерер и парсер для DRF
+"""
+import orjson
+from django.http import HttpResponse
+from rest_framework.utils import encoders
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+
+# Типы, которые orjson не знает (Decimal, ленивые строки, QuerySet...),
+# кодируются так же, как в стандартном JSONRenderer
+_default = encoders.JSONEncoder().default
+
+# datetime/date/time - тоже через DRF: формат дат в API задаёт JSONEncoder
+# (в старых DRF - миллисекунды), а не собственные правила orjson
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(data):
+    return orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    JSON через orjson: в разы быстрее stdlib json на больших списках.
+    Вывод совместим с JSONRenderer (UTF-8, без экранирования кириллицы).
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return dumps(data)
+
+
+class ORJSONParser(BaseParser):
+    """Разбор JSON-тела запроса через orjson"""
+    media_type = 'application/json'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read() if stream is not None else b'')
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class ORJSONResponse(HttpResponse):
+    """Замена JsonResponse для обычных Django views"""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
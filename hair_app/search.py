@@ -0,0 +1,196 @@
+"""
+Полнотекстовый поиск по заявкам
+
+SQLite: FTS5-таблица с trigram-токенизатором, синхронизируется триггерами
+PostgreSQL: GIN-индекс pg_trgm по склеенным полям заявки
+Обе схемы создаются миграцией 0004_application_search_index (DDL - search_schema).
+"""
+import logging
+import re
+from django.db import connection, connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from .models import HairApplication, canonicalize_phone
+from .search_schema import (
+    APP_TABLE,
+    FTS_TABLE,
+    PG_SEARCH_EXPRESSION,
+    SQLITE_REBUILD,
+    SQLITE_TRIGGERS,
+)
+
+logger = logging.getLogger(__name__)
+
+SEARCH_FIELDS = ('name', 'phone_digits', 'email', 'city', 'comment')
+SEARCH_LIMIT = 100
+
+# trigram-токенизатор не находит термы короче 3 символов
+MIN_TERM_LENGTH = 3
+
+_PHONE_QUERY_RE = re.compile(r'^[\d\s+()\-]+$')
+
+# SQLite удаляет триггеры FTS, когда миграция пересоздаёт таблицу заявок
+# (ALTER через копирование), поэтому после каждой миграции
+# ensure_search_triggers() создаёт недостающие и перестраивает индекс.
+
+
+def ensure_search_triggers(using='default', **kwargs):
+    """Обработчик post_migrate: восстановить триггеры FTS в SQLite"""
+    conn = connections[using]
+    if conn.vendor != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name = %s OR type = 'trigger' AND tbl_name = %s",
+            [FTS_TABLE, APP_TABLE]
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if FTS_TABLE not in existing:
+            return
+        missing = [name for name in SQLITE_TRIGGERS if name not in existing]
+        if not missing:
+            return
+        for name in missing:
+            cursor.execute(SQLITE_TRIGGERS[name])
+        cursor.execute(SQLITE_REBUILD)
+    logger.info(f'Search triggers restored: {", ".join(missing)}')
+
+
+def search_terms(query):
+    """
+    Разбивает строку поиска на термы.
+    Телефон в любом формате превращается в один терм из цифр.
+    """
+    query = (query or '').strip()
+    if not query:
+        return []
+    if _PHONE_QUERY_RE.match(query):
+        phone = canonicalize_phone(query)
+        # Полный номер - в каноническом виде (8... → 7...), часть номера - как есть
+        digits = phone.digits if phone.is_valid else re.sub(r'\D', '', query)
+        return [digits] if digits else []
+    return query.split()
+
+
+def is_search_supported():
+    return connection.vendor in ('sqlite', 'postgresql')
+
+
+def _sqlite_search(terms, limit):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'ORDER BY bm25({FTS_TABLE}), rowid DESC LIMIT %s',
+            [_sqlite_match(terms), limit]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _postgres_search(terms, limit):
+    query = ' '.join(terms)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT id FROM {HairApplication._meta.db_table} '
+            f'WHERE %s <%% {PG_SEARCH_EXPRESSION} '
+            f'ORDER BY word_similarity(%s, {PG_SEARCH_EXPRESSION}) DESC, id DESC LIMIT %s',
+            [query, query, limit]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _sqlite_match(terms):
+    # Каждый терм - фраза в кавычках, пробел между ними - AND
+    return ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def search_application_ids(query, limit=SEARCH_LIMIT):
+    """
+    Возвращает ID заявок, отсортированные по релевантности.
+    None - если запрос нельзя выполнить по индексу (короткие термы,
+    неподдерживаемая БД); тогда вызывающий код делает обычный поиск.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return None
+
+    # Полный номер - равенство по индексу phone_digits
+    phone = canonicalize_phone(query)
+    if phone.is_valid and terms == [phone.digits]:
+        return list(
+            HairApplication.objects.filter(phone_digits=phone.digits)
+            .order_by('-created_at').values_list('id', flat=True)[:limit]
+        )
+
+    if not is_search_supported():
+        return None
+    if any(len(term) < MIN_TERM_LENGTH for term in terms):
+        return None
+
+    if connection.vendor == 'sqlite':
+        return _sqlite_search(terms, limit)
+    return _postgres_search(terms, limit)
+
+
+def search_queryset(queryset, query):
+    """
+    queryset, отфильтрованный по тому же индексу, но без лимита (список заявок
+    в админке), с аннотацией search_rank: меньше - релевантнее.
+    None - если запрос нельзя выполнить по индексу (как search_application_ids).
+    """
+    terms = search_terms(query)
+    if not terms:
+        return None
+
+    phone = canonicalize_phone(query)
+    if phone.is_valid and terms == [phone.digits]:
+        return queryset.filter(phone_digits=phone.digits).annotate(search_rank=Value(0.0))
+
+    if not is_search_supported():
+        return None
+    if any(len(term) < MIN_TERM_LENGTH for term in terms):
+        return None
+
+    table = HairApplication._meta.db_table
+    if connection.vendor == 'sqlite':
+        match = _sqlite_match(terms)
+        # rank из материализованного CTE: MATCH выполняется один раз на запрос.
+        # Подзапрос "MATCH AND rowid = id" повторял бы MATCH на каждую строку
+        rank = RawSQL(
+            f'WITH hits AS MATERIALIZED (SELECT rowid AS id, rank FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s) SELECT rank FROM hits WHERE hits.id = {table}.id',
+            [match], output_field=FloatField()
+        )
+        hits = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        return queryset.filter(pk__in=hits).annotate(search_rank=rank)
+    text = ' '.join(terms)
+    return queryset.filter(
+        RawSQL(f'%s <%% {PG_SEARCH_EXPRESSION}', [text], output_field=BooleanField())
+    ).annotate(
+        search_rank=RawSQL(f'-word_similarity(%s, {PG_SEARCH_EXPRESSION})', [text], output_field=FloatField())
+    )
+
+
+def fallback_search_filter(query):
+    """Обычный icontains-поиск по тем же полям (полный скан)"""
+    condition = Q()
+    for term in search_terms(query):
+        term_condition = Q()
+        for field in ('name', 'phone', 'phone_digits', 'email', 'city', 'comment'):
+            term_condition |= Q(**{f'{field}__icontains': term})
+        condition &= term_condition
+    return condition
+
+
+def search_applications(query, limit=SEARCH_LIMIT):
+    """
+    Поиск заявок с ранжированием.
+    Возвращает список HairApplication в порядке релевантности.
+    """
+    ids = search_application_ids(query, limit=limit)
+    if ids is None:
+        if not search_terms(query):
+            return []
+        return list(HairApplication.objects.filter(fallback_search_filter(query))[:limit])
+
+    apps = HairApplication.objects.in_bulk(ids)
+    return [apps[pk] for pk in ids if pk in apps]
@@ -0,0 +1,71 @@
+"""
+DDL полнотекстового индекса заявок
+
+Один источник для миграции 0004_application_search_index и для
+hair_app.search.ensure_search_triggers (восстановление триггеров SQLite).
+Модуль без импортов приложения: его загружает миграция. Изменение DDL -
+только вместе с новой миграцией, которая пересоздаёт индекс.
+"""
+
+FTS_TABLE = "hair_app_application_fts"
+APP_TABLE = "hair_app_hairapplication"
+FTS_COLUMNS = "name, phone_digits, email, city, comment"
+NEW_VALUES = "new.id, new.name, new.phone_digits, new.email, new.city, new.comment"
+OLD_VALUES = "old.id, old.name, old.phone_digits, old.email, old.city, old.comment"
+
+# Склеенные поля заявки - выражение GIN-индекса PostgreSQL и запросов поиска
+PG_SEARCH_EXPRESSION = (
+    "(name || ' ' || phone_digits || ' ' || email || ' ' || city || ' ' || comment)"
+)
+
+# Триггеры синхронизации FTS-таблицы
+SQLITE_TRIGGERS = {
+    f"{FTS_TABLE}_ai": f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {APP_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {FTS_COLUMNS}) VALUES ({NEW_VALUES});
+    END
+    """,
+    f"{FTS_TABLE}_ad": f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {APP_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {FTS_COLUMNS})
+        VALUES ('delete', {OLD_VALUES});
+    END
+    """,
+    f"{FTS_TABLE}_au": f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {FTS_COLUMNS} ON {APP_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {FTS_COLUMNS})
+        VALUES ('delete', {OLD_VALUES});
+        INSERT INTO {FTS_TABLE}(rowid, {FTS_COLUMNS}) VALUES ({NEW_VALUES});
+    END
+    """,
+}
+
+SQLITE_REBUILD = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+
+SQLITE_CREATE = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        {FTS_COLUMNS},
+        content='{APP_TABLE}', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    *SQLITE_TRIGGERS.values(),
+    SQLITE_REBUILD,
+]
+
+SQLITE_DROP = [
+    *(f"DROP TRIGGER IF EXISTS {name}" for name in SQLITE_TRIGGERS),
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+POSTGRES_CREATE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"""
+    CREATE INDEX IF NOT EXISTS hair_app_search_trgm_idx ON {APP_TABLE}
+    USING gin ({PG_SEARCH_EXPRESSION} gin_trgm_ops)
+    """,
+]
+
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS hair_app_search_trgm_idx",
+]
@@ -0,0 +1,73 @@
+"""
+Повторные продавцы и дубли заявок
+
+SellerIdentity хранит по одной строке на нормализованный телефон / email
+с уникальным индексом, поэтому проверка при создании заявки - поиск по
+B-tree, а не скан всех заявок.
+"""
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import HairApplication, SellerIdentity
+
+logger = logging.getLogger(__name__)
+
+
+def seller_keys(phone_digits, email):
+    """Ключи продавца: [(kind, key), ...]"""
+    keys = []
+    if phone_digits:
+        keys.append(('phone', phone_digits))
+    if email:
+        keys.append(('email', email.strip().lower()))
+    return keys
+
+
+def duplicate_window():
+    return timedelta(hours=settings.DUPLICATE_APPLICATION_WINDOW_HOURS)
+
+
+def register_application(app):
+    """
+    Учесть новую заявку в SellerIdentity и отметить повтор/дубль.
+
+    prior_applications - сколько заявок этот продавец подавал раньше
+    (максимум по телефону и email, чтобы не считать одну заявку дважды).
+    is_duplicate - предыдущая заявка была в пределах окна дублей.
+    """
+    keys = seller_keys(app.phone_digits, app.email)
+    if not keys:
+        return app
+
+    now = timezone.now()
+    window_start = now - duplicate_window()
+    prior = 0
+    duplicate = False
+
+    with transaction.atomic():
+        for kind, key in keys:
+            identity, created = SellerIdentity.objects.select_for_update().get_or_create(
+                kind=kind, key=key,
+                defaults={'last_seen_at': now, 'application_count': 0}
+            )
+            if not created:
+                prior = max(prior, identity.application_count)
+                duplicate = duplicate or identity.last_seen_at >= window_start
+
+            identity.application_count += 1
+            identity.last_application = app
+            identity.last_seen_at = now
+            identity.save(update_fields=['application_count', 'last_application', 'last_seen_at'])
+
+        app.prior_applications = prior
+        app.is_duplicate = duplicate
+        HairApplication.objects.filter(pk=app.pk).update(
+            prior_applications=prior,
+            is_duplicate=duplicate
+        )
+
+    if duplicate:
+        logger.warning(f'Application #{app.pk} looks like a duplicate (prior: {prior})')
+    return app
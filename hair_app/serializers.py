@@ -2,8 +2,14 @@
 DRF Serializers for hair purchase application
 """
 import logging
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
 from rest_framework import serializers
-from .models import HairApplication, PriceList, normalize_phone
+from .models import HairApplication, PriceList, PhotoUpload, canonicalize_phone
+from .photos import ALLOWED_FORMATS, downscale_photo, photo_info
+from .thumbnails import PHOTO_FIELDS
+from .uploads import UploadError, discard_uploads, get_offset, open_upload
 
 logger = logging.getLogger(__name__)
 
@@ -20,15 +26,28 @@ class HairApplicationSerializer(serializers.ModelSerializer):
     age = serializers.ChoiceField(choices=HairApplication.AGE_CHOICES, required=False, allow_blank=True)
     condition = serializers.ChoiceField(choices=HairApplication.CONDITION_CHOICES)
     
+    # Телефон проверяется в validate_phone() - без отдельного regex-валидатора модели
+    phone = serializers.CharField(max_length=20)
+    
+    # Фото 1 обязательно, но может прийти ссылкой на загрузку (photo1_upload) - проверяется в validate()
+    photo1 = serializers.ImageField(required=False)
+    
     # 🔧 CRITICAL FIX: photo2 and photo3 should allow empty (not provide them if empty)
     photo2 = serializers.ImageField(required=False, allow_null=True)
     photo3 = serializers.ImageField(required=False, allow_null=True)
     
+    # ID завершённых загрузок /api/uploads/ вместо файлов в multipart
+    UPLOAD_FIELDS = ('photo1_upload', 'photo2_upload', 'photo3_upload')
+    photo1_upload = serializers.UUIDField(write_only=True, required=False)
+    photo2_upload = serializers.UUIDField(write_only=True, required=False)
+    photo3_upload = serializers.UUIDField(write_only=True, required=False)
+    
     class Meta:
         model = HairApplication
         fields = [
             'id', 'length', 'color', 'structure', 'age', 'condition',
             'photo1', 'photo2', 'photo3',
+            'photo1_upload', 'photo2_upload', 'photo3_upload',
             'name', 'phone', 'email', 'city', 'comment',
             'estimated_price', 'final_price', 'status',
             'created_at', 'updated_at'
@@ -45,31 +64,27 @@ class HairApplicationSerializer(serializers.ModelSerializer):
         
         logger.info(f"🔧 validate_phone() called with value: '{value}' (type: {type(value).__name__})")
         
-        # ✅ НОРМАЛИЗИРУЕМ ТЕЛЕФОН ИСПОЛЬЗОВАНИЕМ ФУНКЦИИ ИЗ MODELS!
-        normalized = normalize_phone(value)
-        logger.info(f"🔧 normalize_phone('{value}') returned: '{normalized}'")
-        
-        # Проверяем что нормализация прошла успешно
-        digits = ''.join(c for c in str(normalized) if c.isdigit())
-        logger.info(f"🔧 extracted digits: '{digits}' (count: {len(digits)})")
+        # ✅ Один проход: формат для показа + цифры для проверки
+        phone = canonicalize_phone(value)
+        logger.info(f"🔧 canonicalize_phone('{value}') returned: {phone}")
         
-        if len(digits) != 11:
-            logger.error(f"🔧 ERROR: Phone has {len(digits)} digits, expected 11")
+        if len(phone.digits) != 11:
+            logger.error(f"🔧 ERROR: Phone has {len(phone.digits)} digits, expected 11")
             raise serializers.ValidationError(
                 'Телефон должен содержать 11 цифр. '
                 'Отправьте: +7 999 123 45 67'
             )
         
-        if not digits.startswith('7'):
-            logger.error(f"🔧 ERROR: Phone doesn't start with 7, digits: {digits}")
+        if not phone.is_valid:
+            logger.error(f"🔧 ERROR: Phone doesn't start with 7, digits: {phone.digits}")
             raise serializers.ValidationError(
                 'Телефон должен начинаться с +7. '
                 'Отправьте: +7 999 123 45 67'
             )
         
         # Возвращаем НОРМАЛИЗИРОВАННЫЙ телефон!
-        logger.info(f"🔧 validate_phone() returning normalized: '{normalized}'")
-        return normalized
+        logger.info(f"🔧 validate_phone() returning normalized: '{phone.display}'")
+        return phone.display
     
     def validate_name(self, value):
         """
@@ -80,6 +95,20 @@ class HairApplicationSerializer(serializers.ModelSerializer):
         
         return value.strip()
     
+    def _validate_photo(self, value):
+        """
+        Проверяем формат и размер фото, слишком крупное - уменьшаем.
+        """
+        if value.size > settings.PHOTO_MAX_UPLOAD_SIZE:
+            limit_mb = settings.PHOTO_MAX_UPLOAD_SIZE // (1024 * 1024)
+            raise serializers.ValidationError(f'Файл слишком большой (макс {limit_mb} МБ)')
+        
+        image_format, _ = photo_info(value)
+        if image_format not in ALLOWED_FORMATS:
+            raise serializers.ValidationError('Поддерживаются фото в форматах JPEG, PNG и WebP')
+        
+        return downscale_photo(value)
+    
     def validate_photo1(self, value):
         """
         Валидируем ОБЯЗАТЕЛЬНОЕ фото 1.
@@ -89,11 +118,13 @@ class HairApplicationSerializer(serializers.ModelSerializer):
                 'Обязательно загружайте минимум 1 фото ("Фото 1")'
             )
         
-        # Проверяем размер (не больше 10 МБ)
-        if value.size > 10 * 1024 * 1024:
-            raise serializers.ValidationError('Файл слишком большой (макс 10 МБ)')
-        
-        return value
+        return self._validate_photo(value)
+    
+    def validate_photo2(self, value):
+        return self._validate_photo(value) if value else value
+    
+    def validate_photo3(self, value):
+        return self._validate_photo(value) if value else value
     
     def validate(self, data):
         """
@@ -102,6 +133,12 @@ class HairApplicationSerializer(serializers.ModelSerializer):
         logger.info(f"🔧 validate() called with validated_data keys: {data.keys()}")
         logger.info(f"🔧 phone value in data: '{data.get('phone')}'")
         
+        self._attach_uploads(data)
+        if not data.get('photo1'):
+            raise serializers.ValidationError({
+                'photo1': 'Обязательно загружайте минимум 1 фото ("Фото 1")'
+            })
+        
         # Проверяем все обязательные селекты
         required_fields = ['length', 'color', 'structure', 'age', 'condition', 'name', 'phone', 'photo1']
         missing = [f for f in required_fields if not data.get(f)]
@@ -113,6 +150,41 @@ class HairApplicationSerializer(serializers.ModelSerializer):
             )
         
         return data
+    
+    def _attach_uploads(self, data):
+        """
+        photoN_upload -> photoN: файл завершённой загрузки (hair_app/uploads.py).
+        Загрузки удаляются только после сохранения заявки - при ошибке
+        в других полях клиент повторит отправку с теми же ID.
+        """
+        self._upload_ids = []
+        self._upload_files = []
+        for field in PHOTO_FIELDS:
+            upload_id = data.pop(f'{field}_upload', None)
+            if not upload_id or data.get(field):
+                continue
+            try:
+                photo = open_upload(upload_id)
+            except UploadError as e:
+                raise serializers.ValidationError({field: str(e)})
+            self._upload_files.append(photo)
+            try:
+                data[field] = self._validate_photo(photo)
+            except serializers.ValidationError as e:
+                raise serializers.ValidationError({field: e.detail})
+            self._upload_ids.append(upload_id)
+    
+    def create(self, validated_data):
+        try:
+            instance = super().create(validated_data)
+        finally:
+            for photo in getattr(self, '_upload_files', []):
+                photo.close()
+        
+        upload_ids = getattr(self, '_upload_ids', [])
+        if upload_ids:
+            transaction.on_commit(lambda: discard_uploads(upload_ids))
+        return instance
 
 
 class PriceCalculatorSerializer(serializers.Serializer):
@@ -153,3 +225,111 @@ class PriceListSerializer(serializers.ModelSerializer):
             'base_price', 'is_active',
             'created_at', 'updated_at'
         ]
+
+
+class PhotoUploadSerializer(serializers.ModelSerializer):
+    """
+    Serializer for chunked photo uploads.
+    Смещение считается по временному файлу, а не хранится в БД.
+    """
+    
+    offset = serializers.SerializerMethodField()
+    complete = serializers.BooleanField(source='is_complete', read_only=True)
+    chunk_size = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = PhotoUpload
+        fields = ['id', 'filename', 'size', 'offset', 'complete', 'chunk_size']
+        read_only_fields = ['id']
+    
+    def get_offset(self, obj):
+        return obj.size if obj.is_complete else get_offset(obj)
+    
+    def get_chunk_size(self, obj):
+        return settings.UPLOAD_CHUNK_SIZE
+
+
+# ═══════════════════════════════════════════════════════════════
+# БЫСТРАЯ СЕРИАЛИЗАЦИЯ ДЛЯ READ-ONLY СПИСКОВ
+# ═══════════════════════════════════════════════════════════════
+
+def _datetime_converter(model_field, context):
+    def convert(value):
+        # Как DRF DateTimeField: текущая таймзона, ISO 8601, UTC → 'Z'
+        value = timezone.localtime(value).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+
+def _file_url_converter(model_field, context):
+    # storage поля (для фото - хранилище по хешу), не default_storage
+    request = context.get('request')
+    url = model_field.storage.url
+    if request is not None:
+        build = request.build_absolute_uri
+        return lambda name: build(url(name))
+    return url
+
+
+# Тип поля модели → фабрика конвертера (поля без конвертера отдаются как есть)
+FAST_CONVERTERS = (
+    (models.DateTimeField, _datetime_converter),
+    (models.FileField, _file_url_converter),
+)
+
+
+class FastModelSerializer:
+    """
+    Сериализация через values() без Field-машинерии DRF.
+    Конвертеры строятся один раз на запрос, а не на каждую строку.
+    Вывод совпадает с ModelSerializer для тех же полей.
+    """
+    model = None
+    fields = ()
+    
+    def __init__(self, context=None):
+        self.context = context or {}
+        self.converters = self.build_converters()
+    
+    def build_converters(self):
+        converters = []
+        for name in self.fields:
+            model_field = self.model._meta.get_field(name)
+            for field_class, factory in FAST_CONVERTERS:
+                if isinstance(model_field, field_class):
+                    converters.append((name, factory(model_field, self.context)))
+                    break
+        return converters
+    
+    def project(self, queryset):
+        """queryset → values()-queryset только с нужными колонками"""
+        return queryset.values(*self.fields)
+    
+    def convert(self, rows):
+        """Применить конвертеры к строкам values() (на месте)"""
+        converters = self.converters
+        rows = rows if isinstance(rows, list) else list(rows)
+        for row in rows:
+            for name, convert in converters:
+                value = row[name]
+                row[name] = convert(value) if value else None
+        return rows
+    
+    def serialize(self, queryset):
+        return self.convert(self.project(queryset))
+
+
+class PriceListFastSerializer(FastModelSerializer):
+    model = PriceList
+    fields = PriceListSerializer.Meta.fields
+
+
+class HairApplicationFastSerializer(FastModelSerializer):
+    model = HairApplication
+    # Без write-only photoN_upload - их нет в модели
+    fields = [
+        name for name in HairApplicationSerializer.Meta.fields
+        if name not in HairApplicationSerializer.UPLOAD_FIELDS
+    ]
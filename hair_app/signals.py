@@ -0,0 +1,8 @@
+"""
+Сигналы приложения заявок
+"""
+from django.dispatch import Signal
+
+# Отправляется один раз на пачку смен статуса, после коммита транзакции.
+# kwargs: changes - список dict(id, old_status, new_status), source, actor
+applications_status_changed = Signal()
@@ -0,0 +1,175 @@
+"""
+Хранилище фото по хешу содержимого
+
+Файл сохраняется как <каталог>/ab/cd/<sha256><расширение>: одно и то же
+фото (повторная отправка, тот же продавец) лежит на диске один раз.
+Имя меняется вместе с содержимым, поэтому nginx отдаёт такие файлы
+с Cache-Control: immutable (nginx/conf.d/hair_site.conf).
+
+Ссылки на файл считаются в StoredFile: +1 при сохранении, -1 при
+delete() (заявка удалена или фото заменено), файл удаляется при нуле.
++1 делается до записи файла и в транзакции HairApplication.save():
+если сохранение заявки упало, счётчик откатывается вместе с ней (файл
+остаётся на диске без ссылки и подхватится при следующей такой же загрузке).
+Удаление файла перепроверяет счётчик под блокировкой строки StoredFile,
+которую держит и +1: параллельное сохранение того же фото либо дождётся
+удаления и запишет файл заново, либо удаление увидит его ссылку.
+Файлы со старыми путями (hair_photos/%Y/%m/%d/) не учитываются и не удаляются.
+"""
+import hashlib
+import logging
+import os
+import posixpath
+import tempfile
+from functools import lru_cache
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F, QuerySet
+from django.utils.deconstruct import deconstructible
+from .thumbnails import PHOTO_FIELDS
+
+logger = logging.getLogger(__name__)
+
+
+def file_digest(content):
+    """(sha256, размер) файла, читается частями"""
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in content.chunks():
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage с именами по SHA-256 и подсчётом ссылок"""
+
+    def hashed_name(self, name, digest):
+        directory, basename = posixpath.split(name)
+        extension = os.path.splitext(basename)[1].lower()
+        return posixpath.join(directory, digest[:2], digest[2:4], digest + extension)
+
+    def get_available_name(self, name, max_length=None):
+        # Итоговое имя задаёт _save по содержимому
+        return name
+
+    def _save(self, name, content):
+        digest, size = file_digest(content)
+        name = self.hashed_name(name, digest)
+        # Сначала ссылка (строка заблокирована до коммита), потом проверка файла
+        self.add_reference(name, digest, size)
+        path = self.path(name)
+        if os.path.exists(path):
+            logger.info(f'Photo deduplicated: {name}')
+        else:
+            self.write_file(path, content)
+        return name
+
+    def write_file(self, path, content):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Временный файл + link: параллельная запись того же фото не видит
+        # половину файла и не создаёт копию
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in content.chunks():
+                    tmp.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(tmp_path, self.file_permissions_mode)
+            try:
+                os.link(tmp_path, path)
+            except FileExistsError:
+                pass
+        finally:
+            os.unlink(tmp_path)
+
+    def delete(self, name):
+        """Снять ссылку; файл удаляется после коммита, если ссылок не осталось"""
+        if name and self.release_reference(name):
+            transaction.on_commit(lambda: self.delete_unreferenced(name))
+
+    def add_reference(self, name, digest, size):
+        from .models import StoredFile
+        updated = StoredFile.objects.filter(name=name).update(ref_count=F('ref_count') + 1)
+        if updated:
+            return
+        try:
+            with transaction.atomic():
+                StoredFile.objects.create(name=name, sha256=digest, size=size, ref_count=1)
+        except IntegrityError:
+            StoredFile.objects.filter(name=name).update(ref_count=F('ref_count') + 1)
+
+    def release_reference(self, name):
+        from .models import StoredFile
+        return StoredFile.objects.filter(name=name, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+
+    def delete_unreferenced(self, name):
+        from .models import StoredFile
+        with transaction.atomic():
+            stored = StoredFile.objects.select_for_update().filter(name=name).first()
+            if stored is None or stored.ref_count > 0:
+                return
+            stored.delete()
+            super().delete(name)
+        logger.info(f'Unreferenced photo deleted: {name}')
+
+
+@lru_cache
+def get_photo_storage():
+    """Хранилище полей photo1..photo3 (callable - в миграциях не фиксируется путь)"""
+    return ContentAddressedStorage()
+
+
+# ====================
+# СИГНАЛЫ (hair_app/apps.py)
+# ====================
+
+def _name(value):
+    return getattr(value, 'name', value) or ''
+
+
+def release_replaced_photos(sender, instance, created, raw=False, **kwargs):
+    """post_save: фото заменено или очищено - снять ссылку со старого файла"""
+    if created or raw:
+        return
+    loaded = getattr(instance, '_loaded_values', {})
+    for field in PHOTO_FIELDS:
+        if field not in loaded:
+            continue
+        old_name = _name(loaded[field])
+        if old_name and old_name != _name(getattr(instance, field)):
+            instance._meta.get_field(field).storage.delete(old_name)
+
+
+def _batch_photo_names(origin):
+    """
+    Имена фото всех заявок queryset.delete() - один запрос на пачку.
+    Строки ещё не удалены: pre_delete отправляется до DELETE.
+    """
+    names = getattr(origin, '_deleted_photo_names', None)
+    if names is None:
+        rows = origin.order_by().values_list('pk', *PHOTO_FIELDS)
+        names = origin._deleted_photo_names = {pk: photos for pk, *photos in rows}
+    return names
+
+
+def remember_deleted_photos(sender, instance, origin=None, **kwargs):
+    """pre_delete: запомнить имена фото, пока строка есть (поля могут быть отложены через only())"""
+    deferred = [field for field in PHOTO_FIELDS if field in instance.get_deferred_fields()]
+    if deferred and isinstance(origin, QuerySet) and origin.model is sender:
+        photos = _batch_photo_names(origin).get(instance.pk)
+        if photos is not None:
+            instance._deleted_photos = dict(zip(PHOTO_FIELDS, map(_name, photos)))
+            return
+    if deferred:
+        instance.refresh_from_db(fields=deferred)
+    instance._deleted_photos = {field: _name(getattr(instance, field)) for field in PHOTO_FIELDS}
+
+
+def release_deleted_photos(sender, instance, **kwargs):
+    """post_delete: заявка удалена - снять ссылки с её фото"""
+    for field, name in getattr(instance, '_deleted_photos', {}).items():
+        if name:
+            instance._meta.get_field(field).storage.delete(name)
@@ -1,66 +1,122 @@
 """
-Асинхронные задачи, запускаемые в отдельных потоках
+Фоновые уведомления в общем event loop процесса
+
+Один поток с asyncio-циклом на процесс (воркер gunicorn / uvicorn) вместо
+нового потока и нового event loop на каждое уведомление: aiohttp-сессия бота
+живёт в одном цикле и переиспользует соединения с Telegram.
+WSGI-views и async-views отправляют задачи одинаково - через dispatch().
 """
-import logging
-from threading import Thread
 import asyncio
-import time
-import sys
+import atexit
+import logging
+import os
+from concurrent.futures import wait
+from functools import partial
+from threading import Lock, Thread
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail import send_mail
 
 logger = logging.getLogger(__name__)
 
+TELEGRAM_MAX_RETRIES = 3
+TELEGRAM_RETRY_DELAY = 3
+
+# Сколько ждать незавершённые уведомления при остановке воркера
+SHUTDOWN_TIMEOUT = 10
+
+_loop = None
+_loop_pid = None
+_loop_lock = Lock()
+_pending = set()
+
+
+def get_notification_loop():
+    """
+    Общий event loop уведомлений, запускается при первом обращении.
+    После fork (gunicorn без --preload и с ним) в дочернем процессе
+    создаётся свой цикл - поток родителя туда не копируется.
+    """
+    global _loop, _loop_pid
+    with _loop_lock:
+        if _loop is None or _loop_pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            Thread(target=loop.run_forever, name='notification-loop', daemon=True).start()
+            _loop, _loop_pid = loop, os.getpid()
+        return _loop
+
+
+def dispatch(coro):
+    """Запланировать корутину в общем цикле, вернуть concurrent.futures.Future"""
+    future = asyncio.run_coroutine_threadsafe(coro, get_notification_loop())
+    _pending.add(future)
+    future.add_done_callback(_pending.discard)
+    return future
+
+
+@atexit.register
+def drain_pending():
+    # Поток цикла - daemon: дожидаемся уже отправленных уведомлений
+    if _pending:
+        wait(list(_pending), timeout=SHUTDOWN_TIMEOUT)
 
-def send_telegram_notification_async(app_id, retry_count=0, max_retries=3):
-    """Запустить async функцию Telegram уведомления с ретрайтом"""
+
+def reset_after_fork():
+    """
+    gunicorn post_fork (gunicorn.conf.py): забыть цикл и задачи master.
+    Поток цикла в fork не копируется, а замок мог быть захвачен в момент fork.
+    """
+    global _loop, _loop_pid, _loop_lock, _pending
+    _loop = _loop_pid = None
+    _loop_lock = Lock()
+    _pending = set()
+
+
+async def notify_new_application(app_id, max_retries=TELEGRAM_MAX_RETRIES):
+    """Telegram-уведомление о новой заявке с повторами"""
+    from telegram_bot.senders import send_new_application_notification
+    from telegram_bot.client import check_configured
     try:
-        # Пытаемся импортировать telegram_bot
-        try:
-            from telegram_bot.bot import send_new_application_notification
-        except ImportError as e:
-            logger.error(f'[TELEGRAM] Failed to import telegram bot: {e}')
-            logger.error('[TELEGRAM] Make sure telegram_bot/bot.py exists and is properly configured')
-            return
-        
-        # Новый event loop для этого потока
-        if sys.platform == 'win32':
-            # Windows требует ProactorEventLoop
-            asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
-        
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
+        check_configured()
+    except ImproperlyConfigured as e:
+        logger.error(f'[TELEGRAM] Bot is not configured: {e}')
+        return False
+
+    for attempt in range(max_retries + 1):
         try:
-            logger.info(f'[TELEGRAM] Sending notification for app #{app_id} (attempt {retry_count + 1}/{max_retries + 1})')
-            loop.run_until_complete(send_new_application_notification(app_id))
+            logger.info(f'[TELEGRAM] Sending notification for app #{app_id} (attempt {attempt + 1}/{max_retries + 1})')
+            await send_new_application_notification(app_id)
             logger.info(f'[TELEGRAM] ✅ Notification sent successfully for app #{app_id}')
-        finally:
-            loop.close()
-            
-    except Exception as e:
-        logger.error(f'[TELEGRAM] ❌ Notification failed for app #{app_id}: {e}', exc_info=True)
-        
-        # Пытаемся повторить
-        if retry_count < max_retries:
-            logger.warning(f'[TELEGRAM] Retrying in 3 seconds... (attempt {retry_count + 2}/{max_retries + 1})')
-            time.sleep(3)
-            send_telegram_notification_async(app_id, retry_count + 1, max_retries)
-        else:
-            logger.error(f'[TELEGRAM] ❌ Max retries exceeded for app #{app_id}')
+            return True
+        except Exception as e:
+            logger.error(f'[TELEGRAM] ❌ Notification failed for app #{app_id}: {e}', exc_info=True)
+            if attempt < max_retries:
+                logger.warning(f'[TELEGRAM] Retrying in {TELEGRAM_RETRY_DELAY} seconds...')
+                await asyncio.sleep(TELEGRAM_RETRY_DELAY)
+
+    logger.error(f'[TELEGRAM] ❌ Max retries exceeded for app #{app_id}')
+    return False
+
+
+async def _send_mail(**kwargs):
+    # SMTP блокирующий - в пул потоков цикла, чтобы не держать сам цикл
+    loop = asyncio.get_running_loop()
+    sent = await loop.run_in_executor(None, partial(send_mail, **kwargs))
+    logger.info(f'Email notification sent: {kwargs["subject"]}')
+    return sent
 
 
 def send_telegram_notification(app_id):
     """
-    Запустить Telegram уведомление в отдельном потоке (non-blocking)
-    Ото решает проблему доставки постанутгов погорению соединения
-    
+    Поставить Telegram-уведомление в общий цикл (non-blocking)
+
     Args:
         app_id: ID заявки для отправки уведомления
     """
-    thread = Thread(
-        target=send_telegram_notification_async,
-        args=(app_id,),
-        daemon=False,  # Не daemon - чтобы отдать сквазь
-        name=f'telegram-notifier-{app_id}'
-    )
-    thread.start()
-    logger.info(f'[TELEGRAM] Notification thread started for app #{app_id}')
+    future = dispatch(notify_new_application(app_id))
+    logger.info(f'[TELEGRAM] Notification queued for app #{app_id}')
+    return future
+
+
+def send_email_notification(**kwargs):
+    """Отправить письмо через send_mail(**kwargs) в фоне"""
+    return dispatch(_send_mail(**kwargs))
@@ -0,0 +1,276 @@
+import pytest
+from io import BytesIO
+from PIL import Image
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from hair_app.models import HairApplication, StoredFile
+from hair_app.querybudget import QueryBudget
+from hair_app.search import SEARCH_LIMIT
+from hair_app.storage import get_photo_storage
+from hair_app.tests.test_storage import make_photo
+from hair_app.thumbnails import thumbnail_cache_path, thumbnail_url
+
+CHANGELIST_URL = '/admin/hair_app/hairapplication/'
+
+
+def make_applications(count, start=0):
+    HairApplication.objects.bulk_create([
+        HairApplication(
+            length='50-60',
+            color='блонд',
+            structure='славянка',
+            age='взрослые',
+            condition='натуральные',
+            name=f'Test {i}',
+            phone=f'+7 (911) 000-00-{i % 100:02d}',
+            city='Москва',
+            comment='Длинный комментарий ' * 50,
+            status='new',
+            estimated_price=35000,
+        )
+        for i in range(start, start + count)
+    ])
+
+
+@pytest.fixture
+def admin_client(client):
+    admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+    client.force_login(admin)
+    return client
+
+
+def changelist_queries(client, params=None):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(CHANGELIST_URL, params or {})
+    assert response.status_code == 200
+    return ctx.captured_queries
+
+
+@pytest.mark.django_db
+class TestHairApplicationChangelist:
+    """Тесты количества запросов в списке заявок"""
+
+    def test_constant_query_count(self, admin_client):
+        """Тест: число запросов не зависит от числа строк"""
+        make_applications(3)
+        few = len(changelist_queries(admin_client))
+        make_applications(40, start=3)
+        many = len(changelist_queries(admin_client))
+        assert few == many
+
+    def test_filtered_list_skips_full_count(self, admin_client):
+        """Тест: при фильтре нет второго COUNT(*) по всей таблице"""
+        make_applications(5)
+        queries = changelist_queries(admin_client, {'status__exact': 'new'})
+        counts = [q['sql'] for q in queries if 'COUNT(' in q['sql']]
+        assert len(counts) == 1
+
+    def test_list_query_skips_heavy_columns(self, admin_client):
+        """Тест: список не выбирает comment и лишние фото"""
+        make_applications(2)
+        queries = changelist_queries(admin_client)
+        select = [
+            q['sql'] for q in queries
+            if 'FROM "hair_app_hairapplication"' in q['sql'] and 'COUNT(' not in q['sql']
+        ]
+        assert select
+        assert '"comment"' not in select[-1]
+        assert '"photo2"' not in select[-1]
+
+    def test_search_finds_application(self, admin_client):
+        """Тест: поиск в админке идёт через индекс и находит заявку"""
+        make_applications(3)
+        HairApplication.objects.filter(name='Test 1').update(name='Екатерина')
+        response = admin_client.get(CHANGELIST_URL, {'q': 'катерин'})
+        assert response.status_code == 200
+        content = response.content.decode()
+        assert 'Екатерина' in content
+        assert 'Test 2' not in content
+
+    def test_search_not_limited(self, admin_client):
+        """Тест: в списке все совпадения, а не первые SEARCH_LIMIT"""
+        make_applications(SEARCH_LIMIT + 20)
+        response = admin_client.get(CHANGELIST_URL, {'q': 'Москва'})
+        assert response.context['cl'].result_count == SEARCH_LIMIT + 20
+
+    def test_search_by_id_and_phone_part(self, admin_client):
+        """Тест: число в поиске - номер заявки или часть телефона"""
+        make_applications(2)
+        by_phone = HairApplication.objects.order_by('id').first()
+        HairApplication.objects.filter(pk=by_phone.pk).update(phone_digits='79990004242')
+        by_id = HairApplication.objects.create(
+            id=4242, length='50-60', color='блонд', structure='славянка', age='взрослые',
+            condition='натуральные', name='По номеру', phone='+7 (911) 111-11-11',
+        )
+
+        response = admin_client.get(CHANGELIST_URL, {'q': '4242'})
+        assert {app.pk for app in response.context['cl'].result_list} == {by_phone.pk, by_id.pk}
+
+    def test_search_ordered_by_relevance(self, admin_client):
+        """Тест: без сортировки по колонке - по релевантности, а не по дате"""
+        make_applications(2)
+        best, other = HairApplication.objects.order_by('id')
+        HairApplication.objects.filter(pk=best.pk).update(name='Тверская Тверь', city='Тверь', comment='')
+        HairApplication.objects.filter(pk=other.pk).update(city='Тверь')
+
+        response = admin_client.get(CHANGELIST_URL, {'q': 'тверь'})
+        assert [app.pk for app in response.context['cl'].result_list] == [best.pk, other.pk]
+
+
+@pytest.mark.django_db
+class TestPhotoThumbnails:
+    """Тесты миниатюр фото в админке"""
+
+    @pytest.fixture(autouse=True)
+    def media(self, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path / 'media'
+        settings.THUMBNAIL_CACHE_DIR = tmp_path / 'thumbnails'
+
+    def make_application_with_photo(self):
+        file = BytesIO()
+        Image.new('RGB', (1600, 1200), color='red').save(file, 'JPEG')
+        return HairApplication.objects.create(
+            length='50-60', color='блонд', structure='славянка',
+            age='взрослые', condition='натуральные',
+            name='Test', phone='+7 (911) 957-17-12',
+            photo1=SimpleUploadedFile('photo.jpg', file.getvalue(), content_type='image/jpeg'),
+        )
+
+    def test_thumbnail_generated_and_cached(self, admin_client):
+        """Тест: миниатюра создаётся один раз и берётся из кеша"""
+        app = self.make_application_with_photo()
+        url = thumbnail_url(app.id, 'photo1', 200, app.photo1.name)
+
+        response = admin_client.get(url)
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'image/jpeg'
+        assert 'max-age=604800' in response['Cache-Control']
+        image = Image.open(BytesIO(b''.join(response.streaming_content)))
+        assert max(image.size) == 200
+
+        cache_path = thumbnail_cache_path(app.photo1.name, 200)
+        mtime = cache_path.stat().st_mtime_ns
+        admin_client.get(url)
+        assert cache_path.stat().st_mtime_ns == mtime
+
+    def test_replaced_photo_gets_new_url(self, admin_client):
+        """Тест: URL миниатюры зависит от файла - заменённое фото не берётся из кеша браузера"""
+        app = self.make_application_with_photo()
+        old_url = thumbnail_url(app.id, 'photo1', 200, app.photo1.name)
+        file = BytesIO()
+        Image.new('RGB', (800, 600), color='blue').save(file, 'JPEG')
+        app.photo1 = SimpleUploadedFile('new.jpg', file.getvalue(), content_type='image/jpeg')
+        app.save()
+
+        assert thumbnail_url(app.id, 'photo1', 200, app.photo1.name) != old_url
+        stale = admin_client.get(old_url)
+        assert stale.status_code == 200
+        assert 'no-cache' in stale['Cache-Control']
+
+    def test_unknown_size_rejected(self, admin_client):
+        """Тест: произвольный размер не принимается"""
+        app = self.make_application_with_photo()
+        response = admin_client.get(f'/admin/thumbnails/{app.id}/photo1/1234/')
+        assert response.status_code == 404
+
+    def test_requires_staff(self, client):
+        """Тест: миниатюры только для персонала"""
+        app = self.make_application_with_photo()
+        response = client.get(thumbnail_url(app.id, 'photo1', 200, app.photo1.name))
+        assert response.status_code == 302
+
+    def test_change_form_uses_lazy_thumbnails(self, admin_client):
+        """Тест: карточка заявки показывает ленивые миниатюры со ссылкой на оригинал"""
+        app = self.make_application_with_photo()
+        response = admin_client.get(f'{CHANGELIST_URL}{app.id}/change/')
+        content = response.content.decode()
+        assert 'loading="lazy"' in content
+        assert thumbnail_url(app.id, 'photo1', 200, app.photo1.name) in content
+        assert app.photo1.url in content
+
+
+@pytest.mark.django_db(transaction=True)
+class TestStatusActions:
+    """Тесты массовых действий со статусом"""
+
+    def run_action(self, client, action, *apps):
+        response = client.post(CHANGELIST_URL, {
+            'action': action,
+            '_selected_action': [app.pk for app in apps],
+        })
+        assert response.status_code == 302
+        return {app.pk: HairApplication.objects.get(pk=app.pk).status for app in apps}
+
+    def make_with_statuses(self, *statuses):
+        make_applications(len(statuses))
+        apps = list(HairApplication.objects.order_by('pk'))
+        for app, status in zip(apps, statuses):
+            HairApplication.objects.filter(pk=app.pk).update(status=status)
+        return apps
+
+    def test_accept_only_new(self, admin_client):
+        """Тест: принять можно только новую заявку"""
+        new, viewed = self.make_with_statuses('new', 'viewed')
+        statuses = self.run_action(admin_client, 'mark_as_accepted', new, viewed)
+        assert statuses == {new.pk: 'accepted', viewed.pk: 'viewed'}
+
+    def test_reject_only_new(self, admin_client):
+        """Тест: отклонить можно только новую заявку"""
+        new, viewed, accepted = self.make_with_statuses('new', 'viewed', 'accepted')
+        statuses = self.run_action(admin_client, 'mark_as_rejected', new, viewed, accepted)
+        assert statuses == {new.pk: 'rejected', viewed.pk: 'viewed', accepted.pk: 'accepted'}
+
+    def test_complete_only_accepted(self, admin_client):
+        """Тест: завершить можно только принятую заявку"""
+        new, accepted = self.make_with_statuses('new', 'accepted')
+        statuses = self.run_action(admin_client, 'mark_as_completed', new, accepted)
+        assert statuses == {new.pk: 'new', accepted.pk: 'completed'}
+
+
+# Удаление из списка админки: сессия и пользователь, подтверждение, журнал,
+# сбор связанных строк, имена фото (один запрос на пачку), DELETE - 15 запросов
+# независимо от числа заявок; плюс 3 на каждую снятую ссылку на фото
+# (UPDATE и проверка под блокировкой после коммита) и 1 на удалённый файл
+DELETE_BASE_QUERIES = 15
+QUERIES_PER_RELEASE = 3
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBulkDelete:
+    """Тесты удаления заявок с общими фото из списка админки"""
+
+    @pytest.fixture(autouse=True)
+    def media_root(self, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+
+    def test_shared_photos_released(self, admin_client):
+        """Тест: общие фото теряют ссылки удалённых заявок, ничейные файлы удаляются"""
+        make_applications(7)
+        apps = list(HairApplication.objects.order_by('pk'))
+        for i, app in enumerate(apps[:3]):
+            app.photo1 = make_photo()
+            app.photo2 = make_photo(color=('blue', 'green', 'yellow')[i])
+            app.save()
+        shared = apps[0].photo1.name
+        own = [app.photo2.name for app in apps[:3]]
+        storage = get_photo_storage()
+
+        # Две заявки с фото и четыре без: отложенные поля списка не дочитываются по строке
+        selected = apps[:2] + apps[3:]
+        budget = DELETE_BASE_QUERIES + 4 * QUERIES_PER_RELEASE + 2
+        with QueryBudget(budget):
+            response = admin_client.post(CHANGELIST_URL, {
+                'action': 'delete_selected',
+                '_selected_action': [app.pk for app in selected],
+                'post': 'yes',
+            })
+
+        assert response.status_code == 302
+        assert list(HairApplication.objects.values_list('pk', flat=True)) == [apps[2].pk]
+        assert StoredFile.objects.get(name=shared).ref_count == 1
+        assert storage.exists(shared)
+        assert not StoredFile.objects.filter(name__in=own[:2]).exists()
+        assert not any(storage.exists(name) for name in own[:2])
+        assert storage.exists(own[2])
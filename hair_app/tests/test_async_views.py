@@ -0,0 +1,118 @@
+import json
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.test import RequestFactory
+from rest_framework.test import APIClient
+from hair_app import async_views
+from hair_app.models import HairApplication, PriceList
+
+CALCULATOR_DATA = {
+    'length': '50-60', 'color': 'блонд', 'structure': 'славянка',
+    'age': 'взрослые', 'condition': 'натуральные',
+}
+
+
+def call(view, request):
+    request.auser = _anonymous
+    return async_to_sync(view)(request)
+
+
+async def _anonymous():
+    return AnonymousUser()
+
+
+async def _user(user):
+    return user
+
+
+@pytest.fixture(autouse=True)
+def clear_throttles():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+class TestAsyncViews:
+    """Тесты async-версий API (ASGI-режим)"""
+
+    def test_calculate_price_matches_sync(self):
+        """Тест: async calculate_price отвечает так же, как DRF-версия"""
+        request = RequestFactory().post(
+            '/api/calculate-price/', data=json.dumps(CALCULATOR_DATA), content_type='application/json'
+        )
+        response = call(async_views.calculate_price, request)
+        expected = APIClient().post('/api/calculate-price/', CALCULATOR_DATA, format='json').json()
+
+        assert response.status_code == 200
+        assert json.loads(response.content) == expected
+
+    def test_calculate_price_invalid(self):
+        request = RequestFactory().post(
+            '/api/calculate-price/', data=json.dumps({'length': '50-60'}), content_type='application/json'
+        )
+        response = call(async_views.calculate_price, request)
+        assert response.status_code == 400
+        assert 'color' in json.loads(response.content)['errors']
+
+    def test_price_list_matches_sync(self):
+        PriceList.objects.create(
+            length='50-60', color='блонд', structure='славянка',
+            condition='натуральные', base_price=35000,
+        )
+        response = call(async_views.price_list, RequestFactory().get('/api/price-list/'))
+        expected = APIClient().get('/api/price-list/').json()
+
+        assert response.status_code == 200
+        assert json.loads(response.content) == expected
+
+    def test_dashboard(self):
+        HairApplication.objects.create(
+            length='50-60', color='блонд', structure='славянка',
+            age='взрослые', condition='натуральные',
+            name='Test', phone='+7 (911) 957-17-12', estimated_price=35000,
+        )
+        stats = json.loads(call(async_views.dashboard_view, RequestFactory().get('/')).content)
+        recent = json.loads(call(async_views.recent_applications_api, RequestFactory().get('/')).content)
+
+        assert stats['total'] == 1
+        assert recent['applications'][0]['name'] == 'Test'
+
+    def test_throttled(self):
+        """Тест: async-views соблюдают DRF-лимиты запросов"""
+        def request():
+            return call(async_views.price_list, RequestFactory().get('/api/price-list/'))
+
+        from rest_framework.throttling import AnonRateThrottle
+        original = AnonRateThrottle.THROTTLE_RATES
+        AnonRateThrottle.THROTTLE_RATES = {**original, 'anon': '1/min'}
+        try:
+            assert request().status_code == 200
+            response = request()
+        finally:
+            AnonRateThrottle.THROTTLE_RATES = original
+
+        assert response.status_code == 429
+        assert 'Retry-After' in response
+
+    def test_calculate_price_csrf_like_sync(self):
+        """Тест: CSRF для вошедшего через сессию пользователя - как у DRF-view"""
+        user = User.objects.create_user('staff', password='x', is_staff=True)
+        body = json.dumps(CALCULATOR_DATA)
+
+        def post_async(**extra):
+            request = RequestFactory().post(
+                '/api/calculate-price/', data=body, content_type='application/json', **extra
+            )
+            request.auser = lambda: _user(user)
+            return async_to_sync(async_views.calculate_price)(request)
+
+        sync_client = APIClient(enforce_csrf_checks=True)
+        sync_client.force_login(user)
+        sync = sync_client.post('/api/calculate-price/', body, content_type='application/json')
+
+        token = 'csrf' * 8  # 32 символа - формат секрета CSRF Django
+        assert post_async().status_code == sync.status_code == 403
+        assert post_async(HTTP_COOKIE=f'csrftoken={token}', HTTP_X_CSRFTOKEN=token).status_code == 200
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from hair_app.models import HairApplication
+from telegram_bot import db
+from telegram_bot.instrumentation import HandlerLatencyMiddleware, stats
+
+
+def make_application(**kwargs):
+    data = {
+        'length': '50-60',
+        'color': 'блонд',
+        'structure': 'славянка',
+        'age': 'взрослые',
+        'condition': 'натуральные',
+        'name': 'Test',
+        'phone': '+7 (911) 957-17-12',
+        'estimated_price': 35000,
+    }
+    data.update(kwargs)
+    return HairApplication.objects.create(**data)
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    stats.reset()
+    yield
+    stats.reset()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBotDataAccess:
+    """Тесты слоя доступа к БД для бота"""
+
+    def test_status_counts_single_query(self):
+        """Тест: /stats - один агрегирующий запрос вместо шести count()"""
+        make_application(status='new')
+        make_application(status='new')
+        make_application(status='completed')
+
+        with CaptureQueriesContext(connection) as ctx:
+            counts = db.get_status_counts()
+
+        assert len(ctx.captured_queries) == 1
+        assert counts['total'] == 3
+        assert counts['new'] == 2
+        assert counts['completed'] == 1
+        assert counts['rejected'] == 0
+
+    def test_change_status(self):
+        """Тест: смена статуса возвращает свежую заявку и старый статус"""
+        app = make_application(status='new')
+
+        changed, old_status = db.change_status(app.id, 'accepted', actor='1')
+        assert (changed.status, old_status) == ('accepted', 'new')
+
+        # Повторное нажатие: переход недопустим, заявка не меняется
+        changed, old_status = db.change_status(app.id, 'viewed', actor='1')
+        assert (changed.status, old_status) == ('accepted', None)
+
+        assert db.change_status(999999, 'accepted', actor='1') == (None, None)
+
+    def test_run_db_uses_pool_and_records_latency(self):
+        """Тест: запросы идут в пул bot-db, время пишется в статистику"""
+        app = make_application()
+
+        def where(app_id):
+            return threading.current_thread().name, db.get_application(app_id)
+
+        thread_name, fetched = asyncio.run(db.run_db(where, app.id))
+
+        assert thread_name.startswith('bot-db')
+        assert fetched.id == app.id
+        assert stats.snapshot()['db:where']['count'] == 1
+
+    def test_reset_after_fork(self):
+        """Тест: после fork пул БД создаётся заново"""
+        old = db.get_executor()
+        db.reset_after_fork()
+        assert db.get_executor() is not old
+        old.shutdown(wait=False)
+
+
+class TestHandlerLatency:
+    """Тесты замера задержек обработчиков"""
+
+    def test_middleware_records_handler(self):
+        async def cmd_test(event, data):
+            await asyncio.sleep(0.01)
+            return 'ok'
+
+        data = {'handler': SimpleNamespace(callback=cmd_test)}
+        result = asyncio.run(HandlerLatencyMiddleware()(cmd_test, object(), data))
+
+        assert result == 'ok'
+        row = stats.snapshot()['cmd_test']
+        assert row['count'] == 1
+        assert row['max_ms'] >= 10
@@ -0,0 +1,167 @@
+import asyncio
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser, User
+from django.test import Client, RequestFactory
+from hair_app import admin_views_stream, events
+from hair_app.models import HairApplication
+from hair_app.transitions import transition_application
+from hair_app.tests.test_transitions import make_application
+
+
+@pytest.fixture
+def published(monkeypatch, settings):
+    settings.REDIS_URL = ''
+    sent = []
+    monkeypatch.setattr(events, 'publish', sent.append)
+    return sent
+
+
+def get_events(user):
+    request = RequestFactory().get('/admin/events/')
+
+    async def auser():
+        return user
+
+    request.auser = auser
+    return async_to_sync(admin_views_stream.dashboard_events)(request)
+
+
+class TestEventBus:
+    """Тесты локальной раздачи событий подписчикам"""
+
+    def test_fanout_to_subscribers(self, settings):
+        settings.REDIS_URL = ''
+
+        async def scenario():
+            first, second = events.subscribe(), events.subscribe()
+            try:
+                events.publish({'event': 'created', 'delta': {'total': 1}})
+                return [await asyncio.wait_for(s.queue.get(), 1) for s in (first, second)]
+            finally:
+                events.unsubscribe(first)
+                events.unsubscribe(second)
+
+        received = asyncio.run(scenario())
+        assert received == [{'event': 'created', 'delta': {'total': 1}}] * 2
+        assert events.subscriber_count() == 0
+
+    def test_overflow_becomes_resync(self, settings):
+        """Тест: переполненная очередь медленной вкладки заменяется на resync"""
+        async def scenario():
+            subscriber = events.Subscriber(asyncio.get_running_loop())
+            for i in range(events.SUBSCRIBER_QUEUE_SIZE + 1):
+                subscriber.offer({'event': 'created', 'n': i})
+            return [subscriber.queue.get_nowait() for _ in range(subscriber.queue.qsize())]
+
+        assert asyncio.run(scenario()) == [events.RESYNC]
+
+    def test_status_delta(self):
+        event = events.status_changed_event([
+            {'id': 1, 'old_status': 'new', 'new_status': 'accepted'},
+            {'id': 2, 'old_status': 'viewed', 'new_status': 'accepted'},
+        ])
+        assert event['delta'] == {'new': -1, 'viewed': -1, 'accepted': 2}
+        assert event['changes'] == [{'id': 1, 'status': 'accepted'}, {'id': 2, 'status': 'accepted'}]
+
+
+@pytest.mark.django_db
+class TestDashboardEventsPublished:
+    """Тесты: изменения заявок попадают в шину после коммита"""
+
+    def test_created(self, published, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            app = make_application()
+
+        assert len(published) == 1
+        assert published[0]['event'] == 'created'
+        assert published[0]['delta'] == {'total': 1, 'new': 1}
+        assert published[0]['app']['id'] == app.id
+        # Дашборд прибавляет к выручке за сегодня
+        assert published[0]['app']['estimated_price'] == 35000
+
+    def test_status_change_via_save(self, published, django_capture_on_commit_callbacks):
+        app = make_application()
+        app = HairApplication.objects.get(pk=app.pk)
+        published.clear()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            app.status = 'viewed'
+            app.save()
+            app.name = 'Other'
+            app.save()
+
+        assert [e['delta'] for e in published] == [{'new': -1, 'viewed': 1}]
+
+    def test_status_change_via_transition(self, published, django_capture_on_commit_callbacks):
+        app = make_application()
+        published.clear()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            transition_application(app.id, 'accepted', 'admin')
+
+        assert published == [events.status_changed_event([
+            {'id': app.id, 'old_status': 'new', 'new_status': 'accepted'}
+        ])]
+
+
+@pytest.mark.django_db
+class TestDashboardEventsView:
+    """Тесты SSE endpoint дашборда"""
+
+    def test_staff_only(self, settings):
+        settings.ASYNC_VIEWS = True
+        assert get_events(AnonymousUser()).status_code == 403
+        assert get_events(User.objects.create_user('user', password='x')).status_code == 403
+
+    def test_wsgi_mode_stops_reconnects(self, settings):
+        settings.ASYNC_VIEWS = False
+        staff = User.objects.create_user('staff', password='x', is_staff=True)
+        assert get_events(staff).status_code == 204
+
+    def test_stream(self, settings):
+        settings.ASYNC_VIEWS = True
+        settings.REDIS_URL = ''
+        staff = User.objects.create_user('staff', password='x', is_staff=True)
+        response = get_events(staff)
+        assert response['Content-Type'] == 'text/event-stream'
+
+        async def read():
+            stream = response.streaming_content
+            chunks = [await anext(stream)]
+            events.publish({'event': 'resync'})
+            chunks.append(await anext(stream))
+            await stream.aclose()
+            return chunks
+
+        retry, data = async_to_sync(read)()
+        assert retry.startswith(b'retry: ')
+        assert data == b'data: {"event":"resync"}\n\n'
+        assert events.subscriber_count() == 0
+
+    def test_heartbeat(self):
+        async def read():
+            stream = admin_views_stream.event_stream(heartbeat=0.01)
+            chunks = [await anext(stream), await anext(stream)]
+            await stream.aclose()
+            return chunks
+
+        assert asyncio.run(read())[1] == b': ping\n\n'
+        assert events.subscriber_count() == 0
+
+
+@pytest.mark.django_db
+class TestDashboardPollingFallback:
+    """Тесты опроса, когда SSE недоступен (WSGI, нет EventSource, обрыв)"""
+
+    def test_stats_cover_dashboard_cards(self):
+        make_application()
+        make_application(status='viewed', estimated_price=10000)
+        client = Client()
+        client.force_login(User.objects.create_user('staff', password='x', is_staff=True))
+
+        stats = client.get('/api/admin/dashboard/').json()
+
+        assert (stats['new'], stats['viewed']) == (1, 1)
+        assert stats['today'] == 2
+        assert stats['today_revenue'] == 45000
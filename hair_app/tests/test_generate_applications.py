@@ -0,0 +1,40 @@
+from io import StringIO
+import pytest
+from django.core.management import call_command
+from django.db.models import Max, Min
+from hair_app.models import HairApplication, StoredFile
+from hair_app.thumbnails import PHOTO_FIELDS
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def generate(*args):
+    call_command('generate_applications', *args, stdout=StringIO())
+
+
+@pytest.mark.django_db
+class TestGenerateApplications:
+    """Тесты генератора синтетических заявок"""
+
+    def test_rows_and_dates(self):
+        generate('250', '--batch-size', '100', '--days', '30', '--seed', '1', '--no-photos')
+
+        assert HairApplication.objects.count() == 250
+        dates = HairApplication.objects.aggregate(first=Min('created_at'), last=Max('created_at'))
+        assert (dates['last'] - dates['first']).days >= 20
+        assert HairApplication.objects.filter(estimated_price__isnull=True).count() == 0
+        assert HairApplication.objects.values('status').distinct().count() == 5
+
+    def test_photo_references_counted(self, media_root):
+        generate('120', '--seed', '2', '--photo-variants', '4')
+
+        used = sum(
+            1 for app in HairApplication.objects.only(*PHOTO_FIELDS)
+            for field in PHOTO_FIELDS if getattr(app, field)
+        )
+        assert sum(StoredFile.objects.values_list('ref_count', flat=True)) == used
+        assert len(list(media_root.glob('photos/*/*/*.jpg'))) == StoredFile.objects.count() == 4
@@ -0,0 +1,68 @@
+import runpy
+from types import SimpleNamespace
+from pathlib import Path
+import pytest
+
+CONF_PATH = Path(__file__).resolve().parents[2] / 'gunicorn.conf.py'
+ENV_NAMES = (
+    'GUNICORN_WORKER_CLASS', 'GUNICORN_WORKERS', 'GUNICORN_THREADS', 'GUNICORN_MAX_REQUESTS',
+    'GUNICORN_MAX_REQUESTS_JITTER', 'GUNICORN_TIMEOUT', 'GUNICORN_APP', 'GUNICORN_PRELOAD',
+    'GUNICORN_BIND', 'GUNICORN_LOG_LEVEL',
+)
+
+
+def load_conf(monkeypatch, **env):
+    for name in ENV_NAMES:
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(str(CONF_PATH))
+
+
+class TestGunicornConf:
+    """Тесты gunicorn.conf.py"""
+
+    def test_defaults(self, monkeypatch):
+        conf = load_conf(monkeypatch)
+        assert conf['worker_class'] == 'gthread'
+        assert conf['wsgi_app'] == 'config.wsgi:application'
+        assert conf['workers'] == conf['available_cpus']() + 1
+        assert conf['threads'] == 4
+        assert conf['preload_app'] is True
+        assert conf['max_requests'] > 0 and conf['max_requests_jitter'] > 0
+
+    def test_uvicorn_serves_asgi(self, monkeypatch):
+        conf = load_conf(monkeypatch, GUNICORN_WORKER_CLASS='uvicorn')
+        assert conf['worker_class'] == 'uvicorn_worker.UvicornWorker'
+        assert conf['wsgi_app'] == 'config.asgi:application'
+        assert conf['threads'] == 1
+
+    def test_overrides(self, monkeypatch):
+        conf = load_conf(monkeypatch, GUNICORN_WORKER_CLASS='sync', GUNICORN_WORKERS='3', GUNICORN_PRELOAD='false')
+        assert (conf['worker_class'], conf['workers'], conf['preload_app']) == ('sync', 3, False)
+
+    def test_empty_variables_use_defaults(self, monkeypatch):
+        # Пустые значения из шаблона .env
+        conf = load_conf(monkeypatch, **dict.fromkeys(ENV_NAMES, ''))
+        defaults = load_conf(monkeypatch)
+        for name in ('worker_class', 'wsgi_app', 'workers', 'threads', 'preload_app', 'max_requests',
+                     'max_requests_jitter', 'timeout', 'bind', 'loglevel'):
+            assert conf[name] == defaults[name], name
+
+    def test_unknown_worker_class(self, monkeypatch):
+        with pytest.raises(RuntimeError, match='GUNICORN_WORKER_CLASS'):
+            load_conf(monkeypatch, GUNICORN_WORKER_CLASS='eventlet')
+
+    def test_default_workers_by_class(self, monkeypatch):
+        default_workers = load_conf(monkeypatch)['default_workers']
+        assert [default_workers(kind, 4) for kind in ('sync', 'gthread', 'uvicorn')] == [9, 5, 4]
+
+    def test_child_exit_archives_metrics(self, monkeypatch, settings, tmp_path):
+        """Тест: master переносит снимок метрик завершившегося воркера в архив"""
+        settings.METRICS_DIR = str(tmp_path)
+        (tmp_path / '4242-1.json').write_bytes(b'{"histograms": [], "counters": []}')
+        conf = load_conf(monkeypatch)
+
+        conf['child_exit'](server=None, worker=SimpleNamespace(pid=4242))
+
+        assert [path.name for path in tmp_path.iterdir()] == ['archive.json']
@@ -0,0 +1,133 @@
+import pytest
+from io import BytesIO
+from unittest.mock import patch
+from PIL import Image
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.parsers import MultiPartParser
+from django.test.client import encode_multipart
+from rest_framework.test import APIClient
+from hair_app.models import HairApplication
+from hair_app.tests.test_uploads import APPLICATION_DATA, photo_bytes, upload
+
+
+BOUNDARY = 'TestBoundary0001'
+
+
+def application_payload(**kwargs):
+    file = BytesIO()
+    Image.new('RGB', (50, 50), color='red').save(file, 'PNG')
+    data = {
+        'length': '50-60', 'color': 'блонд', 'structure': 'славянка',
+        'age': 'взрослые', 'condition': 'натуральные',
+        'name': 'Test', 'phone': '+7 (911) 957-17-12',
+        'photo1': SimpleUploadedFile('photo.png', file.getvalue(), content_type='image/png'),
+    }
+    data.update(kwargs)
+    return data
+
+
+@pytest.mark.django_db
+class TestIdempotencyKey:
+    """Тесты Idempotency-Key для POST /api/applications/"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        settings.UPLOAD_TEMP_DIR = str(tmp_path / 'uploads')
+        cache.clear()
+        with patch('hair_app.views.send_telegram_notification') as notify:
+            self.notify = notify
+            yield
+
+    def client(self, csrf_cookie='client-a-csrf-token', remote_addr='127.0.0.1'):
+        client = APIClient(REMOTE_ADDR=remote_addr)
+        client.cookies['csrftoken'] = csrf_cookie
+        return client
+
+    def post(self, key=None, boundary=BOUNDARY, client=None, **kwargs):
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        return (client or self.client()).post(
+            '/api/applications/', encode_multipart(boundary, application_payload(**kwargs)),
+            content_type=f'multipart/form-data; boundary={boundary}', **headers
+        )
+
+    def test_repeat_returns_original_response(self):
+        """Тест: повтор с тем же ключом возвращает исходный 201 без новой заявки"""
+        first = self.post('retry-key-0001')
+        with patch.object(MultiPartParser, 'parse', wraps=MultiPartParser().parse) as parse:
+            second = self.post('retry-key-0001')
+
+        assert first.status_code == second.status_code == 201
+        assert second.data == first.data
+        assert second['Idempotent-Replayed'] == 'true'
+        parse.assert_not_called()
+        assert HairApplication.objects.count() == 1
+        assert self.notify.call_count == 1
+
+    def test_new_boundary_still_replayed(self):
+        """Тест: повтор той же формы с другой границей multipart - тот же запрос"""
+        first = self.post('retry-key-0004')
+        second = self.post('retry-key-0004', boundary='AnotherBoundary42')
+        assert second['Idempotent-Replayed'] == 'true'
+        assert second.data == first.data
+
+    def test_key_scoped_to_client(self):
+        """Тест: тот же ключ от другого клиента не получает чужой ответ"""
+        self.post('retry-key-0005')
+        other = self.post('retry-key-0005', client=self.client(csrf_cookie='client-b-csrf-token'))
+        assert other.status_code == 201
+        assert 'Idempotent-Replayed' not in other
+        assert HairApplication.objects.count() == 2
+
+    def test_new_address_still_replayed(self):
+        """Тест: повтор с другого IP (мобильная сеть) - тот же клиент"""
+        first = self.post('retry-key-0007')
+        second = self.post('retry-key-0007', client=self.client(remote_addr='203.0.113.9'))
+        assert second['Idempotent-Replayed'] == 'true'
+        assert second.data == first.data
+        assert HairApplication.objects.count() == 1
+
+    def test_key_reused_with_other_data(self):
+        """Тест: тот же ключ с другими данными - 422, сохранённый ответ не отдаётся"""
+        self.post('retry-key-0006')
+        other = self.post('retry-key-0006', name='Другая')
+        assert other.status_code == 422
+        assert 'data' not in other.data
+        assert HairApplication.objects.count() == 1
+
+    def test_json_retry_with_new_uploads(self):
+        """Тест: после потерянного ответа фото загружаются заново с новыми ID - это повтор"""
+        client = self.client()
+
+        def submit():
+            return client.post('/api/applications/', {
+                **APPLICATION_DATA, 'photo1_upload': upload(client, photo_bytes()),
+            }, format='json', HTTP_IDEMPOTENCY_KEY='retry-key-0008')
+
+        first = submit()
+        second = submit()
+        assert first.status_code == 201, first.data
+        assert second['Idempotent-Replayed'] == 'true'
+        assert HairApplication.objects.count() == 1
+
+    def test_different_keys_create_two(self):
+        """Тест: разные ключи - разные заявки"""
+        self.post('retry-key-0001')
+        self.post('retry-key-0002')
+        assert HairApplication.objects.count() == 2
+
+    def test_without_key(self):
+        """Тест: без заголовка всё работает как раньше"""
+        assert self.post().status_code == 201
+        assert self.post().status_code == 201
+        assert HairApplication.objects.count() == 2
+
+    def test_failed_request_can_be_retried(self):
+        """Тест: ошибка валидации не запоминается"""
+        assert self.post('retry-key-0003', phone='123').status_code == 400
+        assert self.post('retry-key-0003').status_code == 201
+
+    def test_invalid_key_rejected(self):
+        """Тест: некорректный ключ отклоняется"""
+        assert self.post('bad key!').status_code == 400
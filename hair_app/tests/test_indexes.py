@@ -0,0 +1,76 @@
+import re
+import pytest
+from django.db.models import Count, Q
+from hair_app.models import HairApplication
+
+
+def make_application(**kwargs):
+    data = {
+        'length': '50-60',
+        'color': 'блонд',
+        'structure': 'славянка',
+        'age': 'взрослые',
+        'condition': 'натуральные',
+        'name': 'Test',
+        'phone': '+7 (911) 957-17-12',
+        'estimated_price': 35000,
+    }
+    data.update(kwargs)
+    return HairApplication.objects.create(**data)
+
+
+# db_index=True на phone_digits - имя генерирует Django
+PHONE_DIGITS_INDEX = 'hair_app_hairapplication_phone_digits_54a3313b'
+
+
+def assert_uses_index(queryset, index_name):
+    """Проверяет по EXPLAIN, что запрос идёт по указанному индексу, а не полным сканом"""
+    plan = queryset.explain()
+    assert re.search(rf'USING (COVERING )?INDEX {index_name}\b', plan), plan
+
+
+@pytest.mark.django_db
+class TestHotQueryIndexes:
+    """EXPLAIN-тесты горячих запросов к заявкам"""
+
+    @pytest.fixture(autouse=True)
+    def applications(self):
+        for status in ['new', 'viewed', 'accepted', 'rejected', 'completed']:
+            make_application(status=status)
+
+    def test_bot_queue_uses_index(self):
+        """Тест: очередь бота (/queue) идёт по составному индексу (статусы - параметры запроса)"""
+        queryset = HairApplication.objects.filter(
+            status__in=HairApplication.OPEN_STATUSES
+        ).order_by('-created_at')
+        assert_uses_index(queryset, 'hair_app_status_created_idx')
+
+    def test_open_index_matches_open_statuses(self):
+        """Тест: условие частичного индекса - те же OPEN_STATUSES"""
+        index = next(i for i in HairApplication._meta.indexes if i.name == 'hair_app_open_created_idx')
+        assert index.condition == Q(status__in=list(HairApplication.OPEN_STATUSES))
+
+    def test_status_filter_uses_composite_index(self):
+        """Тест: фильтр по статусу с сортировкой по дате"""
+        queryset = HairApplication.objects.filter(status='new').order_by('-created_at')
+        assert_uses_index(queryset, 'hair_app_status_created_idx')
+
+    def test_color_group_by_uses_index(self):
+        """Тест: распределение по цветам на дашборде"""
+        queryset = HairApplication.objects.values('color').annotate(count=Count('id')).order_by()
+        assert_uses_index(queryset, 'hair_app_color_idx')
+
+    def test_length_group_by_uses_index(self):
+        """Тест: распределение по длине на дашборде"""
+        queryset = HairApplication.objects.values('length').annotate(count=Count('id')).order_by()
+        assert_uses_index(queryset, 'hair_app_length_idx')
+
+    def test_phone_lookup_uses_index(self):
+        """Тест: поиск по телефону идёт по цифровому ключу"""
+        queryset = HairApplication.objects.filter(phone_digits='79119571712')
+        assert_uses_index(queryset, PHONE_DIGITS_INDEX)
+
+    def test_phone_digits_filled_on_save(self):
+        """Тест: phone_digits заполняется при сохранении"""
+        app = make_application(phone='89119571712')
+        assert app.phone_digits.endswith('9119571712')
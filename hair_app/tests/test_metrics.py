@@ -0,0 +1,163 @@
+import re
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.test import Client, RequestFactory
+from hair_app import async_views, metrics
+from hair_app.middleware import PerformanceMiddleware
+from hair_app.models import PriceList
+
+
+SCRAPE_TOKEN = 'scrape-secret'
+
+
+@pytest.fixture(autouse=True)
+def clean_registry(settings):
+    settings.METRICS_DIR = ''
+    settings.METRICS_TOKEN = SCRAPE_TOKEN
+    metrics.registry.reset()
+    cache.clear()
+    yield
+    metrics.registry.reset()
+    cache.clear()
+
+
+async def _anonymous():
+    return AnonymousUser()
+
+
+def scrape(**extra):
+    extra.setdefault('HTTP_AUTHORIZATION', f'Bearer {SCRAPE_TOKEN}')
+    return Client(**extra).get('/metrics')
+
+
+def sample(text, line_prefix):
+    for line in text.splitlines():
+        if line.startswith(line_prefix):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+@pytest.mark.django_db
+class TestPerformanceMiddleware:
+    """Тесты замера запросов"""
+
+    def test_server_timing_header(self):
+        PriceList.objects.create(
+            length='50-60', color='блонд', structure='славянка',
+            condition='натуральные', base_price=35000,
+        )
+        response = Client().get('/api/price-list/')
+
+        header = response['Server-Timing']
+        assert re.match(r'total;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+$', header)
+        assert int(re.search(r'"(\d+) queries"', header).group(1)) >= 1
+
+    def test_server_timing_disabled(self, settings):
+        settings.PERF_SERVER_TIMING = False
+        assert 'Server-Timing' not in Client().get('/api/price-list/')
+
+    def test_histograms_by_url_name(self):
+        Client().get('/api/price-list/')
+        Client().get('/api/price-list/')
+        Client().get('/no-such-page/')
+
+        text = scrape().content.decode()
+        labels = '{method="GET",view="hair_app:price-list"}'
+        assert sample(text, f'http_request_duration_seconds_count{labels}') == 2
+        assert sample(text, f'http_request_db_queries_count{labels}') == 2
+        assert sample(text, 'http_requests_total{method="GET",status="200",view="hair_app:price-list"}') == 2
+        assert sample(text, 'http_requests_total{method="GET",status="404",view="unresolved"}') == 1
+        assert '# TYPE http_response_size_bytes histogram' in text
+
+    def test_template_time_recorded(self):
+        Client().get('/')
+        text = scrape().content.decode()
+        assert sample(text, 'http_request_template_duration_seconds_sum{method="GET",view="hair_app:index"}') > 0
+
+    def test_async_view(self):
+        """Тест: SQL async-view (через sync_to_async) попадает в замер"""
+        PriceList.objects.create(
+            length='50-60', color='блонд', structure='славянка',
+            condition='натуральные', base_price=35000,
+        )
+        request = RequestFactory().get('/api/price-list/')
+        request.auser = _anonymous
+        middleware = PerformanceMiddleware(async_views.price_list)
+        response = async_to_sync(middleware)(request)
+
+        assert response.status_code == 200
+        assert int(re.search(r'"(\d+) queries"', response['Server-Timing']).group(1)) >= 1
+
+
+@pytest.mark.django_db
+class TestMetricsEndpoint:
+    """Тесты доступа к /metrics"""
+
+    def test_token(self):
+        response = scrape()
+        assert response.status_code == 200
+        assert response['Content-Type'] == metrics.CONTENT_TYPE
+        assert scrape(HTTP_AUTHORIZATION='Bearer wrong').status_code == 403
+
+    def test_external_forbidden(self):
+        assert scrape(REMOTE_ADDR='203.0.113.5', HTTP_AUTHORIZATION='').status_code == 403
+
+    def test_proxied_loopback_forbidden(self):
+        """Тест: запрос через nginx на том же хосте (REMOTE_ADDR=127.0.0.1) - не внутренний"""
+        proxied = {'REMOTE_ADDR': '127.0.0.1', 'HTTP_X_FORWARDED_FOR': '203.0.113.5', 'HTTP_AUTHORIZATION': ''}
+        assert scrape(**proxied).status_code == 403
+
+    def test_allowed_ips_explicit(self, settings):
+        settings.METRICS_ALLOWED_IPS = ['10.0.0.7']
+        assert scrape(REMOTE_ADDR='10.0.0.7', HTTP_AUTHORIZATION='').status_code == 200
+        assert scrape(REMOTE_ADDR='127.0.0.1', HTTP_AUTHORIZATION='').status_code == 403
+
+    def test_staff(self):
+        client = Client()
+        client.force_login(User.objects.create_user('staff', password='x', is_staff=True))
+        assert client.get('/metrics').status_code == 200
+
+    def test_multiprocess_merge(self, settings, tmp_path):
+        """Тест: снимки нескольких воркеров складываются"""
+        settings.METRICS_DIR = str(tmp_path)
+        labels = metrics.label_pairs(view='hair_app:index', method='GET')
+        metrics.registry.observe('http_request_duration_seconds', labels, 0.02)
+        (tmp_path / '99999-1.json').write_bytes(
+            metrics.orjson.dumps(metrics.registry.snapshot())
+        )
+
+        histograms, _ = metrics.collect()
+        row = histograms[('http_request_duration_seconds', labels)]
+        assert row[-1] == 2
+
+    def test_dead_worker_archived(self, settings, tmp_path, monkeypatch):
+        """Тест: снимок завершившегося воркера уходит в archive.json, счётчики не убывают"""
+        settings.METRICS_DIR = str(tmp_path)
+        labels = metrics.label_pairs(view='hair_app:index', method='GET', status='200')
+        monkeypatch.setattr(metrics, '_process_file', None)
+
+        def worker_lifetime(pid, requests):
+            monkeypatch.setattr(metrics.os, 'getpid', lambda: pid)
+            metrics.registry.reset()
+            metrics.registry.inc('http_requests_total', labels, requests)
+            metrics.flush()
+
+        def files():
+            return sorted(path.name.split('-')[0] for path in tmp_path.glob('*.json'))
+
+        worker_lifetime(4242, 5)
+        metrics.archive_process(4242)
+        # ОС выдала тот же PID новому воркеру - его снимок в отдельном файле
+        worker_lifetime(4242, 1)
+        assert files() == ['4242', 'archive.json']
+
+        # Сбор из другого процесса: новый воркер тоже завершился
+        metrics.archive_process(4242)
+        monkeypatch.setattr(metrics.os, 'getpid', lambda: 4343)
+        metrics.registry.reset()
+        _, counters = metrics.collect()
+
+        assert counters[('http_requests_total', labels)] == 6
+        assert files() == ['4343', 'archive.json']
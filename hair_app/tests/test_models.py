@@ -1,6 +1,7 @@
 import pytest
+from unittest.mock import patch
 from django.test import TestCase
-from hair_app.models import HairApplication, normalize_phone, PriceList
+from hair_app.models import HairApplication, normalize_phone, canonicalize_phone, PriceList
 
 
 class TestNormalizePhone:
@@ -98,3 +99,72 @@ class TestHairApplicationModel:
         
         # Первоначальная цена должна быть None или 0
         assert app.estimated_price is None or app.estimated_price == 0
+
+
+@pytest.mark.django_db
+class TestHairApplicationSaveFastPath:
+    """Тесты быстрого пути save()"""
+    
+    def make_application(self):
+        return HairApplication.objects.create(
+            length='100+', color='блонд', structure='славянка',
+            age='взрослые', condition='натуральные',
+            name='Test', phone='+79119571712', estimated_price=50000
+        )
+    
+    def test_status_save_skips_normalization(self):
+        """Тест: смена статуса не запускает нормализацию телефона"""
+        app = self.make_application()
+        app = HairApplication.objects.get(pk=app.pk)
+        assert app.get_dirty_fields() == set()
+        
+        app.status = 'viewed'
+        with patch.object(HairApplication, 'clean') as clean:
+            app.save()
+        clean.assert_not_called()
+    
+    def test_phone_change_normalized(self):
+        """Тест: изменённый телефон нормализуется"""
+        app = HairApplication.objects.get(pk=self.make_application().pk)
+        app.phone = '+7 922 222 22 22'
+        assert app.get_dirty_fields() == {'phone'}
+        app.save()
+        app.refresh_from_db()
+        assert app.phone == '+7 (922) 222-22-22'
+        assert app.phone_digits == '79222222222'
+    
+    def test_update_fields_honored(self):
+        """Тест: update_fields с телефоном дописывает phone_digits"""
+        app = HairApplication.objects.get(pk=self.make_application().pk)
+        app.phone = '+79333333333'
+        app.name = 'Changed'
+        app.save(update_fields=['phone'])
+        app.refresh_from_db()
+        assert app.phone_digits == '79333333333'
+        assert app.name == 'Test'
+
+
+class TestCanonicalizePhone:
+    """Тесты канонизации телефона"""
+    
+    def test_returns_display_and_digits(self):
+        """Тест: формат для показа и ключ из цифр за один вызов"""
+        phone = canonicalize_phone('8 (911) 957-17-12')
+        assert phone.display == '+7 (911) 957-17-12'
+        assert phone.digits == '79119571712'
+        assert phone.is_valid
+    
+    def test_ten_digits_without_prefix(self):
+        """Тест: 9119571712 → +7 (911) 957-17-12"""
+        assert canonicalize_phone('9119571712').digits == '79119571712'
+    
+    def test_invalid_phone_kept(self):
+        """Тест: невалидный номер не меняется"""
+        phone = canonicalize_phone('123456')
+        assert phone.display == '123456'
+        assert phone.digits == '123456'
+        assert not phone.is_valid
+    
+    def test_plus_eight_is_invalid(self):
+        """Тест: +8... - не российский формат"""
+        assert not canonicalize_phone('+89119571712').is_valid
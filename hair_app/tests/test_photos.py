@@ -0,0 +1,95 @@
+from io import BytesIO
+from unittest.mock import patch
+import pytest
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIClient
+from hair_app.models import HairApplication
+from hair_app.photos import downscale_photo
+from hair_app.serializers import HairApplicationSerializer
+
+APPLICATION_DATA = {
+    'length': '50-60', 'color': 'блонд', 'structure': 'славянка',
+    'age': 'взрослые', 'condition': 'натуральные',
+    'name': 'Test', 'phone': '+7 (911) 957-17-12',
+}
+
+
+def make_photo(size, image_format='JPEG', name='photo.jpg', content_type='image/jpeg'):
+    file = BytesIO()
+    Image.new('RGB', size, color='red').save(file, image_format)
+    return SimpleUploadedFile(name, file.getvalue(), content_type=content_type)
+
+
+def validated_photo(photo):
+    serializer = HairApplicationSerializer(data={**APPLICATION_DATA, 'photo1': photo})
+    assert serializer.is_valid(), serializer.errors
+    return serializer.validated_data['photo1']
+
+
+class TestPhotoValidation:
+    """Тесты проверки и уменьшения фото при загрузке"""
+
+    def test_reduced_photo_kept_as_is(self):
+        """Тест: фото, уменьшенное в браузере, сохраняется без перекодирования"""
+        photo = make_photo((1600, 1200), 'WEBP', 'photo.webp', 'image/webp')
+        assert validated_photo(photo) is photo
+
+    def test_large_photo_downscaled(self, settings):
+        settings.PHOTO_MAX_DIMENSION = 1000
+        result = validated_photo(make_photo((3000, 1500), name='IMG_0001.png'))
+
+        assert result.name == 'IMG_0001.jpg'
+        image = Image.open(result)
+        assert image.format == 'JPEG'
+        assert image.size == (1000, 500)
+
+    def test_too_big_file_rejected(self, settings):
+        settings.PHOTO_MAX_UPLOAD_SIZE = 1024
+        serializer = HairApplicationSerializer(
+            data={**APPLICATION_DATA, 'photo1': make_photo((800, 800), 'PNG', 'photo.png', 'image/png')}
+        )
+        assert not serializer.is_valid()
+        assert 'photo1' in serializer.errors
+
+    def test_unsupported_format_rejected(self):
+        photo = make_photo((100, 100), 'GIF', 'photo.gif', 'image/gif')
+        serializer = HairApplicationSerializer(data={**APPLICATION_DATA, 'photo1': photo, 'photo2': make_photo((100, 100))})
+        assert not serializer.is_valid()
+        assert list(serializer.errors) == ['photo1']
+
+    def test_optional_photos_checked(self):
+        photo = make_photo((100, 100), 'GIF', 'photo.gif', 'image/gif')
+        serializer = HairApplicationSerializer(
+            data={**APPLICATION_DATA, 'photo1': make_photo((100, 100)), 'photo3': photo}
+        )
+        assert not serializer.is_valid()
+        assert list(serializer.errors) == ['photo3']
+
+    def test_downscale_applies_exif_orientation(self):
+        file = BytesIO()
+        exif = Image.Exif()
+        exif[0x0112] = 6  # повернуть на 90°
+        Image.new('RGB', (400, 200), color='red').save(file, 'JPEG', exif=exif)
+        photo = SimpleUploadedFile('photo.jpg', file.getvalue(), content_type='image/jpeg')
+
+        result = downscale_photo(photo, max_dimension=100)
+        assert Image.open(result).size == (50, 100)
+
+
+@pytest.mark.django_db
+class TestPhotoUpload:
+    """Тесты: уменьшенное фото доходит до хранилища"""
+
+    @patch('hair_app.views.send_telegram_notification')
+    def test_stored_downscaled(self, notify, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        settings.PHOTO_MAX_DIMENSION = 500
+        response = APIClient().post('/api/applications/', {
+            **APPLICATION_DATA, 'photo1': make_photo((2000, 1000)),
+        }, format='multipart')
+
+        assert response.status_code == 201
+        app = HairApplication.objects.get(pk=response.data['data']['id'])
+        with app.photo1.open('rb') as stored:
+            assert Image.open(stored).size == (500, 250)
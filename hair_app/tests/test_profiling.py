@@ -0,0 +1,98 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core import signing
+from django.test import Client
+from hair_app.models import RequestProfile
+from hair_app.profiling import TOKEN_SALT, make_token
+
+CHANGELIST_URL = '/admin/hair_app/requestprofile/'
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.PROFILE_SAMPLE_RATE = 0.0
+    return tmp_path
+
+
+@pytest.fixture
+def staff():
+    return User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+
+@pytest.mark.django_db
+class TestProfilingMiddleware:
+    """Тесты профилирования запросов"""
+
+    def test_token_profiles_request(self, staff, media_root):
+        response = Client().get('/api/price-list/', HTTP_X_PROFILE_TOKEN=make_token(staff))
+
+        profile = RequestProfile.objects.get()
+        assert response['X-Profile-Id'] == str(profile.pk)
+        assert profile.trigger == 'token'
+        assert profile.view == 'hair_app:price-list'
+        assert profile.status_code == 200
+        assert profile.file.name.startswith('profiles/')
+        assert (media_root / profile.file.name).stat().st_size > 0
+
+    def test_token_in_query_string_ignored(self, staff):
+        # Query string попадает в access-логи - токен только в заголовке
+        Client().get('/api/price-list/', {'_profile': make_token(staff)})
+        assert not RequestProfile.objects.exists()
+
+    def test_without_token_not_profiled(self):
+        response = Client().get('/api/price-list/')
+        assert 'X-Profile-Id' not in response
+        assert not RequestProfile.objects.exists()
+
+    def test_forged_token_ignored(self, staff):
+        forged = signing.dumps({'user': staff.pk}, salt=TOKEN_SALT, key='not-the-secret-key')
+        Client().get('/api/price-list/', HTTP_X_PROFILE_TOKEN=forged)
+        assert not RequestProfile.objects.exists()
+
+    def test_non_staff_token_ignored(self):
+        user = User.objects.create_user('seller', password='x')
+        Client().get('/api/price-list/', HTTP_X_PROFILE_TOKEN=make_token(user))
+        assert not RequestProfile.objects.exists()
+
+    def test_sampling(self, settings):
+        settings.PROFILE_SAMPLE_RATE = 1.0
+        Client().get('/api/price-list/')
+        assert RequestProfile.objects.get().trigger == 'sample'
+
+    def test_retention(self, settings, media_root):
+        settings.PROFILE_SAMPLE_RATE = 1.0
+        settings.PROFILE_MAX_COUNT = 2
+        for _ in range(4):
+            Client().get('/api/price-list/')
+
+        assert RequestProfile.objects.count() == 2
+        assert len(list(media_root.glob('profiles/*/*/*.prof'))) == 2
+
+
+@pytest.mark.django_db
+class TestRequestProfileAdmin:
+    """Тесты просмотра профилей в админке"""
+
+    def test_changelist_shows_token(self, client, staff):
+        client.force_login(staff)
+        response = client.get(CHANGELIST_URL)
+        assert response.status_code == 200
+        assert 'X-Profile-Token: ' in response.content.decode()
+
+    def test_report_and_download(self, client, staff):
+        client.force_login(staff)
+        pk = client.get('/api/price-list/', HTTP_X_PROFILE_TOKEN=make_token(staff))['X-Profile-Id']
+
+        detail = client.get(f'{CHANGELIST_URL}{pk}/change/')
+        assert detail.status_code == 200
+        assert 'cumulative' in detail.content.decode()
+
+        download = client.get(f'{CHANGELIST_URL}{pk}/download/')
+        assert download.status_code == 200
+        assert download['Content-Disposition'].startswith('attachment')
+
+    def test_download_requires_staff(self, staff):
+        client = Client()
+        pk = client.get('/api/price-list/', HTTP_X_PROFILE_TOKEN=make_token(staff))['X-Profile-Id']
+        assert client.get(f'{CHANGELIST_URL}{pk}/download/').status_code == 302
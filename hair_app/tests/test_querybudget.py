@@ -0,0 +1,159 @@
+from datetime import timedelta
+import pytest
+from django.contrib.auth.models import User
+from django.test import Client
+from django.urls import path
+from django.utils import timezone
+from hair_app.admin_views import get_chart_data
+from hair_app.models import HairApplication, PriceList
+from hair_app.querybudget import QueryBudget, QueryBudgetExceeded, sql_shape
+from hair_app.renderers import ORJSONResponse
+from hair_app.tests.test_admin import make_applications
+from telegram_bot import db
+
+# Сессия и пользователь - 2 запроса на любой staff-странице
+STAFF_OVERHEAD = 2
+
+# (URL, бюджет, нужен staff) - бюджет не зависит от числа заявок
+VIEW_BUDGETS = [
+    ('/', 0, False),
+    ('/api/price-list/', 1, False),
+    ('/api/applications/', 2, False),
+    ('/api/admin/dashboard/', 1, False),
+    ('/api/admin/chart/', 1, False),
+    ('/api/admin/recent/', 1, False),
+    ('/admin/', STAFF_OVERHEAD + 5, True),
+    ('/admin/hair_app/hairapplication/', STAFF_OVERHEAD + 2, True),
+]
+
+BOT_BUDGETS = [
+    (db.get_open_applications, (), 1),
+    (db.get_recent_applications, (), 1),
+    (db.get_status_counts, (), 1),
+]
+
+
+def names_one_by_one(request):
+    """View с N+1 - для теста QueryInspectorMiddleware"""
+    ids = HairApplication.objects.values_list('id', flat=True)
+    return ORJSONResponse([HairApplication.objects.get(pk=pk).name for pk in ids])
+
+
+urlpatterns = [
+    path('n-plus-one/', names_one_by_one, name='n-plus-one'),
+]
+
+
+def spread_applications(count):
+    """Заявки по разным дням - иначе запрос на день не отличить от одного"""
+    make_applications(count)
+    now = timezone.now()
+    for i, app in enumerate(HairApplication.objects.order_by('id')):
+        app.created_at = now - timedelta(days=i % 30)
+    HairApplication.objects.bulk_update(HairApplication.objects.all(), ['created_at'])
+
+
+@pytest.fixture
+def staff_client():
+    client = Client()
+    client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+    return client
+
+
+class TestSqlShape:
+    """Тесты нормализации SQL"""
+
+    def test_params_and_literals_ignored(self):
+        assert sql_shape('SELECT * FROM t WHERE id = %s') == sql_shape("SELECT * FROM t  WHERE id = 15")
+        assert sql_shape("SELECT * FROM t WHERE name = 'a'") == sql_shape("SELECT * FROM t WHERE name = 'it''s'")
+
+    def test_in_lists_collapsed(self):
+        assert sql_shape('WHERE id IN (%s, %s, %s)') == sql_shape('WHERE id IN (%s)') == 'WHERE id IN (...)'
+
+    def test_identifiers_kept(self):
+        assert 'photo1' in sql_shape('SELECT "photo1" FROM t')
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+    """Тесты бюджета запросов"""
+
+    def test_within_budget(self):
+        with QueryBudget(2) as budget:
+            list(PriceList.objects.all())
+        assert len(budget.queries) == 1
+
+    def test_over_budget(self):
+        with pytest.raises(QueryBudgetExceeded, match='2 queries, budget 1'):
+            with QueryBudget(1):
+                list(PriceList.objects.all())
+                list(HairApplication.objects.all())
+
+    def test_n_plus_one(self):
+        make_applications(5)
+        with pytest.raises(QueryBudgetExceeded, match='N\\+1: 5x'):
+            with QueryBudget(max_repeats=2):
+                for app_id in HairApplication.objects.values_list('id', flat=True):
+                    HairApplication.objects.get(pk=app_id)
+
+    def test_decorator(self):
+        @QueryBudget(0)
+        def load():
+            return list(PriceList.objects.all())
+
+        with pytest.raises(QueryBudgetExceeded):
+            load()
+
+
+@pytest.mark.django_db
+class TestViewBudgets:
+    """Тесты: число запросов горячих views в пределах бюджета"""
+
+    @pytest.mark.parametrize('url, budget, staff', VIEW_BUDGETS)
+    def test_view_budget(self, url, budget, staff, staff_client):
+        spread_applications(40)
+        client = staff_client if staff else Client()
+        with QueryBudget(budget, max_repeats=1):
+            response = client.get(url)
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize('func, args, budget', BOT_BUDGETS)
+    def test_bot_budget(self, func, args, budget):
+        spread_applications(20)
+        with QueryBudget(budget):
+            list(func(*args))
+
+    def test_chart_counts_by_day(self):
+        spread_applications(40)
+        chart = get_chart_data()
+        assert len(chart['data']) == 30
+        assert sum(chart['data']) == 40
+
+
+@pytest.mark.django_db
+class TestQueryInspectorMiddleware:
+    """Тесты dev-middleware N+1"""
+
+    @pytest.fixture(autouse=True)
+    def enable(self, settings):
+        middleware = list(settings.MIDDLEWARE)
+        middleware.insert(
+            middleware.index('hair_app.middleware.PerformanceMiddleware') + 1,
+            'hair_app.middleware.QueryInspectorMiddleware',
+        )
+        settings.MIDDLEWARE = middleware
+        settings.QUERY_REPEAT_THRESHOLD = 2
+
+    def test_query_count_header(self):
+        response = Client().get('/api/admin/chart/')
+        assert response['X-Query-Count'] == '1'
+        assert 'X-N-Plus-One' not in response
+
+    def test_n_plus_one_flagged(self, settings, caplog):
+        settings.ROOT_URLCONF = __name__
+        make_applications(3)
+        response = Client().get('/n-plus-one/')
+
+        assert response['X-Query-Count'] == '4'
+        assert response['X-N-Plus-One'] == '1'
+        assert 'N+1 in n-plus-one: 3x SELECT' in caplog.text
@@ -0,0 +1,93 @@
+import json
+import pytest
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from hair_app.models import HairApplication, PriceList
+from hair_app.renderers import ORJSONRenderer, ORJSONParser
+from hair_app.serializers import HairApplicationSerializer
+
+
+class TestORJSON:
+    """Тесты orjson-рендерера и парсера"""
+
+    def test_render_matches_json_renderer(self):
+        """Тест: тот же JSON, что и у стандартного JSONRenderer"""
+        data = {'name': 'Тест', 'price': Decimal('1.5'), 'items': [1, None, True]}
+        assert json.loads(ORJSONRenderer().render(data)) == json.loads(JSONRenderer().render(data))
+        assert 'Тест'.encode() in ORJSONRenderer().render(data)
+
+    def test_datetime_wire_format(self):
+        """Тест: даты и время - как у JSONRenderer (DRF 3.16: микросекунды, UTC → Z)"""
+        data = {
+            'utc': datetime(2026, 10, 19, 12, 30, 45, 123456, tzinfo=dt_timezone.utc),
+            'moscow': datetime(2026, 10, 19, 15, 30, 45, 123456, tzinfo=dt_timezone(timedelta(hours=3))),
+            'whole': datetime(2026, 10, 19, 12, 30, 45, tzinfo=dt_timezone.utc),
+            'day': date(2026, 10, 19),
+            'time': time(12, 30, 45, 123456),
+        }
+        rendered = ORJSONRenderer().render(data)
+        assert json.loads(rendered) == {
+            'utc': '2026-10-19T12:30:45.123456Z',
+            'moscow': '2026-10-19T15:30:45.123456+03:00',
+            'whole': '2026-10-19T12:30:45Z',
+            'day': '2026-10-19',
+            'time': '12:30:45.123456',
+        }
+        assert json.loads(rendered) == json.loads(JSONRenderer().render(data))
+
+    def test_parse(self):
+        assert ORJSONParser().parse(BytesIO('{"name": "Тест"}'.encode())) == {'name': 'Тест'}
+
+    def test_parse_error(self):
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(BytesIO(b'{broken'))
+
+
+@pytest.mark.django_db
+class TestDefaultRenderers:
+    """Тесты настроек рендеринга API"""
+
+    def test_browser_gets_json_without_debug(self):
+        """Тест: без DEBUG браузер получает JSON, а не HTML Browsable API"""
+        PriceList.objects.create(
+            length='50-60', color='блонд', structure='славянка',
+            condition='натуральные', base_price=35000,
+        )
+        response = APIClient().get('/api/price-list/', HTTP_ACCEPT='text/html,*/*;q=0.8')
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/json'
+        assert response.json()[0]['color'] == 'блонд'
+
+    def test_json_body_parsed(self):
+        """Тест: JSON-тело разбирается orjson-парсером"""
+        response = APIClient().post(
+            '/api/calculate-price/',
+            data=json.dumps({
+                'length': '50-60', 'color': 'блонд', 'structure': 'славянка',
+                'age': 'взрослые', 'condition': 'натуральные',
+            }),
+            content_type='application/json'
+        )
+        assert response.status_code == 200, response.content
+        assert response.json()['estimated_price'] > 0
+
+    def test_application_timestamps_format(self):
+        """Тест: created_at/updated_at в API - как у DRF DateTimeField с JSONRenderer"""
+        app = HairApplication.objects.create(
+            length='50-60', color='блонд', structure='славянка', age='взрослые',
+            condition='натуральные', name='Test', phone='+7 (911) 957-17-12',
+        )
+        HairApplication.objects.filter(pk=app.pk).update(
+            created_at=datetime(2026, 10, 19, 12, 30, 45, 123456, tzinfo=dt_timezone.utc)
+        )
+        app.refresh_from_db()
+
+        item = APIClient().get('/api/applications/').json()['results'][0]
+        expected = json.loads(JSONRenderer().render(HairApplicationSerializer(app).data))
+
+        assert item['created_at'] == expected['created_at'] == '2026-10-19T15:30:45.123456+03:00'
+        assert item['updated_at'] == expected['updated_at']
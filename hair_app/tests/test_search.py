@@ -0,0 +1,117 @@
+import pytest
+from django.db import connection
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from hair_app.models import HairApplication
+from hair_app.search import (
+    FTS_TABLE, ensure_search_triggers, search_application_ids, search_applications, search_queryset,
+    search_terms,
+)
+
+
+def make_application(**kwargs):
+    data = {
+        'length': '50-60',
+        'color': 'блонд',
+        'structure': 'славянка',
+        'age': 'взрослые',
+        'condition': 'натуральные',
+        'name': 'Test',
+        'phone': '+7 (911) 957-17-12',
+        'estimated_price': 35000,
+    }
+    data.update(kwargs)
+    return HairApplication.objects.create(**data)
+
+
+class TestSearchTerms:
+    """Тесты разбора строки поиска"""
+
+    def test_phone_query_becomes_digits(self):
+        """Тест: телефон в любом формате → один терм из цифр"""
+        assert search_terms('+7 (911) 957-17-12') == ['79119571712']
+        assert search_terms('8 911 957 17 12') == ['79119571712']
+
+    def test_text_query_split(self):
+        """Тест: текст разбивается по пробелам"""
+        assert search_terms('  Анна  Москва ') == ['Анна', 'Москва']
+
+
+@pytest.mark.django_db
+class TestApplicationSearch:
+    """Тесты поиска по FTS-индексу"""
+
+    def test_search_by_name_case_insensitive(self):
+        """Тест: поиск по части имени без учёта регистра"""
+        app = make_application(name='Екатерина')
+        make_application(name='Мария', phone='+7 (922) 222-22-22')
+        assert search_application_ids('катер') == [app.pk]
+
+    def test_search_by_phone(self):
+        """Тест: поиск по телефону в другом формате"""
+        app = make_application(phone='+79119571712')
+        make_application(phone='+7 (922) 222-22-22')
+        assert search_application_ids('8 (911) 957-17-12') == [app.pk]
+
+    def test_search_multiple_terms(self):
+        """Тест: все термы должны совпасть"""
+        app = make_application(name='Анна', city='Москва')
+        make_application(name='Анна', city='Казань', phone='+7 (922) 222-22-22')
+        assert search_application_ids('анна москва') == [app.pk]
+
+    def test_index_follows_updates_and_deletes(self):
+        """Тест: индекс синхронизируется при изменении и удалении"""
+        app = make_application(city='Тверь')
+        HairApplication.objects.filter(pk=app.pk).update(city='Самара')
+        assert search_application_ids('тверь') == []
+        assert search_application_ids('самара') == [app.pk]
+        app.delete()
+        assert search_application_ids('самара') == []
+
+    def test_dropped_triggers_restored(self):
+        """Тест: post_migrate восстанавливает триггеры, удалённые пересозданием таблицы"""
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {FTS_TABLE}_ai')
+        ensure_search_triggers()
+        app = make_application(city='Кострома')
+        assert search_application_ids('кострома') == [app.pk]
+
+    def test_queryset_composable(self):
+        """Тест: результат поиска - обычный queryset: only(), фильтры и порядок сохраняются"""
+        best = make_application(name='Анна', city='Анна')
+        other = make_application(name='Анна', phone='+7 (922) 222-22-22')
+        make_application(name='Мария', phone='+7 (933) 333-33-33')
+
+        found = search_queryset(HairApplication.objects.only('id', 'name'), 'анна')
+        sql = str(found.order_by('search_rank').query)
+        assert 'comment' not in sql.split(' FROM ')[0]
+        assert [app.pk for app in found.order_by('search_rank')] == [best.pk, other.pk]
+        assert list(found.filter(pk=other.pk).values_list('pk', flat=True)) == [other.pk]
+        assert found.count() == 2
+
+    def test_short_terms_fall_back(self):
+        """Тест: короткие термы ищутся обычным icontains"""
+        app = make_application(city='Ош')
+        assert search_application_ids('Ош') is None
+        assert search_applications('Ош') == [app]
+
+
+@pytest.mark.django_db
+class TestSearchEndpoint:
+    """Тесты /api/applications/search/"""
+
+    def test_requires_staff(self):
+        """Тест: поиск доступен только персоналу"""
+        response = APIClient().get('/api/applications/search/', {'q': 'Test'})
+        assert response.status_code in (401, 403)
+
+    def test_returns_ranked_results(self):
+        """Тест: персонал получает результаты поиска"""
+        app = make_application(name='Екатерина')
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        client = APIClient()
+        client.force_authenticate(admin)
+        response = client.get('/api/applications/search/', {'q': 'екатерина'})
+        assert response.status_code == 200
+        assert response.data['count'] == 1
+        assert response.data['results'][0]['id'] == app.pk
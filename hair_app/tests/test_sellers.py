@@ -0,0 +1,99 @@
+import pytest
+from datetime import timedelta
+from io import BytesIO
+from unittest.mock import patch
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from hair_app.models import HairApplication, SellerIdentity
+from hair_app.sellers import register_application
+
+
+def make_application(**kwargs):
+    data = {
+        'length': '50-60',
+        'color': 'блонд',
+        'structure': 'славянка',
+        'age': 'взрослые',
+        'condition': 'натуральные',
+        'name': 'Test',
+        'phone': '+7 (911) 957-17-12',
+        'estimated_price': 35000,
+    }
+    data.update(kwargs)
+    app = HairApplication.objects.create(**data)
+    return register_application(app)
+
+
+@pytest.mark.django_db
+class TestSellerIdentity:
+    """Тесты учёта повторных продавцов"""
+
+    def test_first_application_not_flagged(self):
+        """Тест: первая заявка - не повтор"""
+        app = make_application()
+        assert app.prior_applications == 0
+        assert not app.is_duplicate
+        assert SellerIdentity.objects.get(kind='phone').application_count == 1
+
+    def test_same_phone_other_format_is_duplicate(self):
+        """Тест: тот же телефон в другом формате - дубль"""
+        make_application(phone='+79119571712')
+        app = make_application(phone='8 911 957 17 12')
+        app.refresh_from_db()
+        assert app.prior_applications == 1
+        assert app.is_duplicate
+
+    def test_same_email_is_repeat(self):
+        """Тест: совпадение по email без учёта регистра"""
+        make_application(phone='+79110000001', email='Seller@Example.com')
+        app = make_application(phone='+79110000002', email='seller@example.com')
+        assert app.prior_applications == 1
+
+    def test_old_application_is_repeat_not_duplicate(self):
+        """Тест: заявка вне окна - повтор, но не дубль"""
+        make_application()
+        SellerIdentity.objects.update(last_seen_at=SellerIdentity.objects.get().last_seen_at - timedelta(days=30))
+        app = make_application()
+        assert app.prior_applications == 1
+        assert not app.is_duplicate
+
+    def test_constant_queries(self):
+        """Тест: проверка не зависит от числа заявок в базе"""
+        for i in range(20):
+            make_application(phone=f'+791100000{i:02d}')
+        app = HairApplication.objects.create(
+            length='50-60', color='блонд', structure='славянка', age='взрослые',
+            condition='натуральные', name='Test', phone='+79110000005', estimated_price=1
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            register_application(app)
+        assert not any('FROM "hair_app_hairapplication"' in q['sql'] for q in ctx.captured_queries)
+
+
+@pytest.mark.django_db
+class TestCreateFlagsDuplicates:
+    """Тесты флага дубля при создании через API"""
+
+    def post_application(self):
+        file = BytesIO()
+        Image.new('RGB', (50, 50), color='red').save(file, 'PNG')
+        return APIClient().post('/api/applications/', {
+            'length': '50-60', 'color': 'блонд', 'structure': 'славянка',
+            'age': 'взрослые', 'condition': 'натуральные',
+            'name': 'Test', 'phone': '+7 (911) 957-17-12',
+            'photo1': SimpleUploadedFile('photo.png', file.getvalue(), content_type='image/png'),
+        }, format='multipart')
+
+    @patch('hair_app.views.send_telegram_notification')
+    def test_second_submission_flagged(self, notify, settings, tmp_path):
+        """Тест: повторная отправка помечается как дубль"""
+        settings.MEDIA_ROOT = tmp_path
+        assert self.post_application().status_code == 201
+        response = self.post_application()
+        assert response.status_code == 201
+        app = HairApplication.objects.get(pk=response.data['data']['id'])
+        assert app.is_duplicate
+        assert app.prior_applications == 1
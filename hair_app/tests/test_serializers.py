@@ -2,8 +2,15 @@ import pytest
 from io import BytesIO
 from PIL import Image
 from django.core.files.uploadedfile import SimpleUploadedFile
-from rest_framework.test import APITestCase
-from hair_app.serializers import HairApplicationSerializer
+from rest_framework.test import APITestCase, APIRequestFactory
+from hair_app.models import HairApplication, PriceList
+from hair_app.renderers import ORJSONRenderer
+from hair_app.serializers import (
+    HairApplicationSerializer,
+    HairApplicationFastSerializer,
+    PriceListSerializer,
+    PriceListFastSerializer,
+)
 
 
 def create_test_image():
@@ -119,3 +126,57 @@ class TestHairApplicationSerializer(APITestCase):
         }
         serializer = HairApplicationSerializer(data=data)
         assert serializer.is_valid(), serializer.errors
+    
+    def test_phone_with_8_normalized(self):
+        """Тест: телефон с 8 принимается и нормализуется"""
+        data = {
+            'length': '100+',
+            'color': 'блонд',
+            'structure': 'славянка',
+            'age': 'взрослые',
+            'condition': 'натуральные',
+            'name': 'Test',
+            'phone': '8 911 957 17 12',
+            'photo1': create_test_image(),
+        }
+        serializer = HairApplicationSerializer(data=data)
+        assert serializer.is_valid(), serializer.errors
+        assert serializer.validated_data['phone'] == '+7 (911) 957-17-12'
+
+
+@pytest.mark.django_db
+class TestFastSerializers:
+    """Тесты быстрой сериализации списков"""
+    
+    def test_application_matches_model_serializer(self):
+        """Тест: вывод совпадает с HairApplicationSerializer"""
+        HairApplication.objects.create(
+            length='50-60', color='блонд', structure='славянка',
+            age='взрослые', condition='натуральные',
+            photo1='applications/test.jpg',
+            name='Test', phone='+7 (911) 957-17-12', estimated_price=35000,
+        )
+        request = APIRequestFactory().get('/api/applications/')
+        context = {'request': request}
+        queryset = HairApplication.objects.all()
+        
+        expected = HairApplicationSerializer(queryset, many=True, context=context).data
+        fast = HairApplicationFastSerializer(context=context).serialize(queryset)
+        
+        assert fast == [dict(row) for row in expected]
+        assert fast[0]['photo1'].startswith('http://testserver/')
+        assert fast[0]['photo2'] is None
+    
+    def test_price_list_matches_model_serializer(self):
+        """Тест: прайс-лист совпадает с PriceListSerializer, orjson рендерит кириллицу"""
+        PriceList.objects.create(
+            length='50-60', color='блонд', structure='славянка',
+            condition='натуральные', base_price=35000,
+        )
+        queryset = PriceList.objects.all()
+        
+        expected = PriceListSerializer(queryset, many=True).data
+        fast = PriceListFastSerializer().serialize(queryset)
+        
+        assert fast == [dict(row) for row in expected]
+        assert 'блонд'.encode() in ORJSONRenderer().render(fast)
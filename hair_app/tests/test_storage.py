@@ -0,0 +1,138 @@
+from io import BytesIO
+import pytest
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from hair_app.models import HairApplication, StoredFile
+from hair_app.storage import get_photo_storage
+
+
+def make_photo(color='red', name='IMG_0001.JPG'):
+    file = BytesIO()
+    Image.new('RGB', (60, 40), color=color).save(file, 'JPEG')
+    return SimpleUploadedFile(name, file.getvalue(), content_type='image/jpeg')
+
+
+def make_application(**photos):
+    return HairApplication.objects.create(
+        length='50-60', color='блонд', structure='славянка', age='взрослые',
+        condition='натуральные', name='Test', phone='+7 (911) 957-17-12',
+        estimated_price=35000, **photos,
+    )
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+class TestContentAddressedStorage:
+    """Тесты хранилища фото по хешу содержимого"""
+
+    def test_same_photo_stored_once(self, media_root):
+        first = make_application(photo1=make_photo(name='a.jpg'))
+        second = make_application(photo1=make_photo(name='b.JPG'), photo2=make_photo(color='blue'))
+
+        assert first.photo1.name == second.photo1.name
+        assert first.photo1.name.startswith('photos/')
+        assert first.photo1.name.endswith('.jpg')
+        assert StoredFile.objects.get(name=first.photo1.name).ref_count == 2
+        assert len(list(media_root.glob('photos/*/*/*'))) == 2
+
+    def test_file_deleted_with_last_reference(self):
+        first = make_application(photo1=make_photo())
+        second = make_application(photo1=make_photo())
+        name = first.photo1.name
+        storage = get_photo_storage()
+
+        first.delete()
+        assert storage.exists(name)
+        assert StoredFile.objects.get(name=name).ref_count == 1
+
+        second.delete()
+        assert not storage.exists(name)
+        assert not StoredFile.objects.filter(name=name).exists()
+
+    def test_replaced_photo_released(self):
+        app = make_application(photo1=make_photo())
+        old_name = app.photo1.name
+
+        app = HairApplication.objects.get(pk=app.pk)
+        app.photo1 = make_photo(color='green')
+        app.save()
+
+        assert app.photo1.name != old_name
+        assert not get_photo_storage().exists(old_name)
+        assert StoredFile.objects.get(name=app.photo1.name).ref_count == 1
+
+    def test_rollback_keeps_file(self):
+        """Тест: файл не удаляется, если удаление заявки откатилось"""
+        app = make_application(photo1=make_photo())
+        name = app.photo1.name
+        with transaction.atomic():
+            app.delete()
+            transaction.set_rollback(True)
+
+        assert get_photo_storage().exists(name)
+        assert StoredFile.objects.get(name=name).ref_count == 1
+
+    def test_legacy_names_untouched(self, media_root):
+        legacy = media_root / 'hair_photos' / '2025' / 'photo.jpg'
+        legacy.parent.mkdir(parents=True)
+        legacy.write_bytes(b'legacy')
+        app = make_application(photo1='hair_photos/2025/photo.jpg')
+
+        app.delete()
+        assert legacy.exists()
+
+    def test_delete_with_deferred_photos(self):
+        """Тест: удаление через only() (список админки) снимает ссылки и с отложенных фото"""
+        app = make_application(photo1=make_photo(), photo3=make_photo(color='blue'))
+        names = [app.photo1.name, app.photo3.name]
+
+        HairApplication.objects.only('id').delete()
+
+        assert not StoredFile.objects.filter(name__in=names).exists()
+        assert not any(get_photo_storage().exists(name) for name in names)
+
+    def test_failed_save_does_not_count_reference(self):
+        """Тест: заявка не сохранилась - ссылка на файл не добавляется"""
+        app = make_application(photo1=make_photo())
+        with pytest.raises(IntegrityError):
+            HairApplication.objects.create(
+                length='50-60', color='блонд', structure='славянка', age='взрослые',
+                condition='натуральные', name=None, phone='+7 (911) 957-17-12',
+                estimated_price=35000, photo1=make_photo(),
+            )
+
+        assert StoredFile.objects.get(name=app.photo1.name).ref_count == 1
+        app.delete()
+        assert not get_photo_storage().exists(app.photo1.name)
+
+    def test_bulk_delete_loads_photo_names_once(self):
+        """Тест: queryset.delete() с отложенными фото читает имена одним запросом на пачку"""
+        for _ in range(5):
+            make_application(photo1=make_photo(), photo2=make_photo(color='blue'))
+        with CaptureQueriesContext(connection) as ctx:
+            HairApplication.objects.only('id').delete()
+
+        photo_selects = [q for q in ctx.captured_queries if '"photo2"' in q['sql'] and q['sql'].startswith('SELECT')]
+        assert len(photo_selects) == 1
+        assert not StoredFile.objects.exists()
+
+    def test_unlink_rechecks_references(self):
+        """Тест: удаление после коммита перепроверяет счётчик - новая ссылка сохраняет файл"""
+        app = make_application(photo1=make_photo())
+        name = app.photo1.name
+        storage = get_photo_storage()
+        storage.release_reference(name)
+        # Параллельное сохранение того же фото успело добавить ссылку
+        storage.add_reference(name, 'digest', 0)
+
+        storage.delete_unreferenced(name)
+
+        assert storage.exists(name)
+        assert StoredFile.objects.get(name=name).ref_count == 1
@@ -0,0 +1,48 @@
+import asyncio
+import threading
+from unittest.mock import patch, AsyncMock
+from hair_app import tasks
+
+
+class TestNotificationLoop:
+    """Тесты общего event loop уведомлений"""
+
+    def test_single_shared_loop(self):
+        """Тест: все уведомления выполняются в одном цикле и одном потоке"""
+        async def where():
+            return asyncio.get_running_loop(), threading.current_thread().name
+
+        first = tasks.dispatch(where()).result(timeout=5)
+        second = tasks.dispatch(where()).result(timeout=5)
+
+        assert first == second
+        assert first[1] == 'notification-loop'
+
+    def test_telegram_retries(self, settings):
+        """Тест: сбой отправки повторяется без блокировки потока запроса"""
+        settings.TELEGRAM_BOT_TOKEN = '123456:TEST-TOKEN'
+        settings.TELEGRAM_ADMIN_CHAT_ID = '777'
+        send = AsyncMock(side_effect=[RuntimeError('network'), None])
+        with patch('telegram_bot.senders.send_new_application_notification', send), \
+                patch.object(tasks, 'TELEGRAM_RETRY_DELAY', 0):
+            result = tasks.send_telegram_notification(42).result(timeout=5)
+
+        assert result is True
+        assert send.await_count == 2
+
+    def test_not_configured(self, settings):
+        """Тест: без токена уведомление пропускается, цикл продолжает работать"""
+        settings.TELEGRAM_BOT_TOKEN = ''
+        assert tasks.send_telegram_notification(42).result(timeout=5) is False
+        assert tasks.get_notification_loop().is_running()
+
+    def test_reset_after_fork(self):
+        """Тест: после fork воркер получает свой цикл, а не ссылку на цикл master"""
+        old_loop = tasks.get_notification_loop()
+        tasks.reset_after_fork()
+        try:
+            new_loop = tasks.get_notification_loop()
+            assert new_loop is not old_loop
+            assert tasks.dispatch(asyncio.sleep(0, result='ok')).result(timeout=5) == 'ok'
+        finally:
+            old_loop.call_soon_threadsafe(old_loop.stop)
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+import pytest
+from aiohttp import web
+from aiogram.client.telegram import TelegramAPIServer
+from django.test import Client
+from hair_app.tasks import dispatch
+from telegram_bot import webhook
+from telegram_bot.client import get_bot
+
+SECRET = 'test-webhook-secret'
+
+START_UPDATE = {
+    'update_id': 1001,
+    'message': {
+        'message_id': 1,
+        'date': 0,
+        'chat': {'id': 777, 'type': 'private'},
+        'from': {'id': 777, 'is_bot': False, 'first_name': 'Admin'},
+        'text': '/start',
+        'entities': [{'type': 'bot_command', 'offset': 0, 'length': 6}],
+    },
+}
+
+
+class FakeTelegram:
+    """Локальный Bot API: принимает запросы бота и запоминает их"""
+
+    def __init__(self):
+        self.calls = []
+        self.received = threading.Event()
+        self.runner = None
+        self.url = None
+
+    async def handle(self, request):
+        data = dict(await request.post())
+        self.calls.append((request.match_info['method'], data))
+        self.received.set()
+        return web.json_response({'ok': True, 'result': {
+            'message_id': len(self.calls),
+            'date': 0,
+            'chat': {'id': int(data.get('chat_id', 0)), 'type': 'private'},
+        }})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post('/bot{token}/{method}', self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f'http://127.0.0.1:{port}'
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+@pytest.fixture
+def telegram(settings):
+    settings.TELEGRAM_BOT_TOKEN = '123456:TEST-TOKEN'
+    settings.TELEGRAM_ADMIN_CHAT_ID = '777'
+    settings.TELEGRAM_USE_WEBHOOK = True
+    settings.TELEGRAM_WEBHOOK_SECRET = SECRET
+
+    fake = FakeTelegram()
+    dispatch(fake.start()).result(timeout=5)
+
+    bot = get_bot()
+    bot.session.api = TelegramAPIServer.from_base(fake.url)
+    yield fake
+
+    dispatch(bot.session.close()).result(timeout=5)
+    dispatch(fake.stop()).result(timeout=5)
+
+
+def post_update(update, secret=SECRET):
+    return Client().post(
+        '/telegram/webhook', data=update, content_type='application/json',
+        HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN=secret
+    )
+
+
+class TestTelegramWebhook:
+    """Тесты webhook-режима бота"""
+
+    def test_update_reaches_dispatcher(self, telegram):
+        """Тест: /start через webhook - бот отвечает в фейковый Telegram"""
+        response = post_update(START_UPDATE)
+        assert response.status_code == 200
+
+        assert telegram.received.wait(timeout=5)
+        method, data = telegram.calls[0]
+        assert method == 'sendMessage'
+        assert data['chat_id'] == '777'
+
+    def test_wrong_secret_rejected(self, telegram):
+        assert post_update(START_UPDATE, secret='wrong').status_code == 403
+        assert post_update(START_UPDATE, secret='').status_code == 403
+        assert not telegram.received.wait(timeout=0.3)
+
+    def test_disabled_without_setting(self, settings):
+        settings.TELEGRAM_USE_WEBHOOK = False
+        assert post_update(START_UPDATE).status_code == 404
+
+    def test_concurrency_bounded(self, telegram, settings, monkeypatch):
+        """Тест: одновременно обрабатывается не больше TELEGRAM_WEBHOOK_CONCURRENCY апдейтов"""
+        settings.TELEGRAM_WEBHOOK_CONCURRENCY = 2
+        monkeypatch.setattr(webhook, '_semaphore', (None, None))
+        active = 0
+        peak = 0
+
+        async def slow_feed_update(bot, update):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.05)
+            active -= 1
+
+        _, dp = webhook.get_bot_and_dispatcher()
+        monkeypatch.setattr(dp, 'feed_update', slow_feed_update)
+
+        started = [Future() for _ in range(6)]
+        for i, future in enumerate(started):
+            dispatch(webhook.process_update({**START_UPDATE, 'update_id': i}, future))
+
+        for future in started:
+            future.result(timeout=5)
+        assert peak == 2
@@ -0,0 +1,92 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from hair_app.models import HairApplication, ApplicationStatusChange
+from hair_app.signals import applications_status_changed
+from hair_app.transitions import transition_status, transition_application
+
+
+def make_application(**kwargs):
+    data = {
+        'length': '50-60',
+        'color': 'блонд',
+        'structure': 'славянка',
+        'age': 'взрослые',
+        'condition': 'натуральные',
+        'name': 'Test',
+        'phone': '+7 (911) 957-17-12',
+        'estimated_price': 35000,
+    }
+    data.update(kwargs)
+    return HairApplication.objects.create(**data)
+
+
+@pytest.fixture
+def received_events():
+    events = []
+
+    def handler(sender, **kwargs):
+        events.append(kwargs)
+
+    applications_status_changed.connect(handler)
+    yield events
+    applications_status_changed.disconnect(handler)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestStatusTransitions:
+    """Тесты сервиса смены статусов"""
+
+    def test_bulk_transition_skips_disallowed(self, received_events):
+        """Тест: недопустимые переходы пропускаются, остальные меняются одним UPDATE"""
+        new = make_application(status='new')
+        viewed = make_application(status='viewed')
+        completed = make_application(status='completed')
+
+        with CaptureQueriesContext(connection) as ctx:
+            changes = transition_status(
+                HairApplication.objects.all(), 'accepted', source='admin', actor='admin'
+            )
+
+        assert {c['id'] for c in changes} == {new.id, viewed.id}
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        assert len(updates) == 1
+
+        completed.refresh_from_db()
+        assert completed.status == 'completed'
+        assert HairApplication.objects.filter(status='accepted').count() == 2
+
+    def test_audit_records(self):
+        """Тест: каждая смена статуса пишется в журнал"""
+        app = make_application(status='new')
+        transition_application(app.id, 'viewed', source='bot', actor='12345')
+        transition_application(app.id, 'accepted', source='bot', actor='12345')
+
+        history = list(app.status_changes.order_by('id').values_list('old_status', 'new_status', 'source'))
+        assert history == [('new', 'viewed', 'bot'), ('viewed', 'accepted', 'bot')]
+
+    def test_single_batched_event(self, received_events):
+        """Тест: одно событие на всю пачку"""
+        make_application(status='new')
+        make_application(status='new')
+        transition_status(HairApplication.objects.all(), 'rejected', source='admin')
+
+        assert len(received_events) == 1
+        assert len(received_events[0]['changes']) == 2
+        assert received_events[0]['source'] == 'admin'
+
+    def test_disallowed_transition_returns_none(self, received_events):
+        """Тест: повторный переход не меняет заявку и не шлёт событие"""
+        app = make_application(status='completed')
+        assert transition_application(app.id, 'accepted', source='bot') is None
+        assert received_events == []
+        assert ApplicationStatusChange.objects.count() == 0
+
+    def test_phone_not_renormalized(self):
+        """Тест: смена статуса не трогает остальные поля"""
+        app = make_application(status='new')
+        HairApplication.objects.filter(pk=app.pk).update(phone='raw phone', estimated_price=1)
+        transition_application(app.id, 'viewed', source='bot')
+        app.refresh_from_db()
+        assert app.phone == 'raw phone'
+        assert app.estimated_price == 1
@@ -0,0 +1,173 @@
+import os
+from io import BytesIO, StringIO
+from unittest.mock import patch
+import pytest
+from PIL import Image
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from hair_app.models import HairApplication, PhotoUpload
+from hair_app.uploads import upload_path
+
+APPLICATION_DATA = {
+    'length': '50-60', 'color': 'блонд', 'structure': 'славянка',
+    'age': 'взрослые', 'condition': 'натуральные',
+    'name': 'Test', 'phone': '+7 (911) 957-17-12',
+}
+
+
+def photo_bytes(size=(400, 300), image_format='JPEG'):
+    file = BytesIO()
+    Image.new('RGB', size, color='red').save(file, image_format)
+    return file.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def upload_settings(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / 'media'
+    settings.UPLOAD_TEMP_DIR = str(tmp_path / 'uploads')
+    settings.UPLOAD_CHUNK_SIZE = 1024
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def start(client, data):
+    response = client.post('/api/uploads/', {'filename': 'photo.jpg', 'size': len(data)}, format='json')
+    assert response.status_code == 201, response.data
+    return response.data
+
+
+def send_chunk(client, upload_id, offset, chunk):
+    return client.generic(
+        'PATCH', f'/api/uploads/{upload_id}/', chunk,
+        content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset)
+    )
+
+
+def upload(client, data):
+    state = start(client, data)
+    while not state['complete']:
+        offset = state['offset']
+        state = send_chunk(client, state['id'], offset, data[offset:offset + state['chunk_size']]).data
+    return state['id']
+
+
+@pytest.mark.django_db
+class TestChunkedUploads:
+    """Тесты загрузки фото частями"""
+
+    def test_upload_in_chunks(self):
+        client = APIClient()
+        data = photo_bytes()
+        state = start(client, data)
+        assert state['offset'] == 0
+        assert state['chunk_size'] == 1024
+
+        upload_id = upload(client, data)
+        assert PhotoUpload.objects.get(pk=upload_id).is_complete
+        assert upload_path(upload_id).read_bytes() == data
+
+    def test_resume_after_lost_response(self):
+        """Тест: повтор уже принятой части - 409 с текущим смещением, файл не портится"""
+        client = APIClient()
+        data = photo_bytes()
+        state = start(client, data)
+        send_chunk(client, state['id'], 0, data[:1024])
+
+        response = send_chunk(client, state['id'], 0, data[:1024])
+        assert response.status_code == 409
+        assert response.data['offset'] == 1024
+
+        assert client.get(f"/api/uploads/{state['id']}/").data['offset'] == 1024
+        assert upload_path(state['id']).stat().st_size == 1024
+
+    def test_oversized_chunk_rejected(self):
+        client = APIClient()
+        data = photo_bytes()
+        state = start(client, data)
+
+        response = send_chunk(client, state['id'], 0, data[:2048])
+        assert response.status_code == 400
+        assert upload_path(state['id']).stat().st_size == 0
+
+    def test_file_size_limit(self, settings):
+        settings.PHOTO_MAX_UPLOAD_SIZE = 100
+        response = APIClient().post('/api/uploads/', {'filename': 'photo.jpg', 'size': 1000}, format='json')
+        assert response.status_code == 400
+
+    def test_not_an_image_discarded(self):
+        client = APIClient()
+        data = b'x' * 1500
+        state = start(client, data)
+        send_chunk(client, state['id'], 0, data[:1024])
+
+        response = send_chunk(client, state['id'], 1024, data[1024:])
+        assert response.status_code == 400
+        assert not PhotoUpload.objects.filter(pk=state['id']).exists()
+        assert not upload_path(state['id']).exists()
+
+    def test_cleanup_expired(self):
+        client = APIClient()
+        state = start(client, photo_bytes())
+        PhotoUpload.objects.filter(pk=state['id']).update(created_at='2000-01-01T00:00:00Z')
+        orphan = upload_path('orphan')
+        orphan.write_bytes(b'x')
+        os.utime(orphan, (0, 0))
+
+        call_command('cleanup_uploads', stdout=StringIO())
+        assert not PhotoUpload.objects.exists()
+        assert not upload_path(state['id']).exists()
+        assert not orphan.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestApplicationWithUploads:
+    """Тесты: заявка ссылается на загрузки вместо файлов"""
+
+    @patch('hair_app.views.send_telegram_notification')
+    def test_create_from_uploads(self, notify):
+        client = APIClient()
+        first, second = upload(client, photo_bytes()), upload(client, photo_bytes(image_format='PNG'))
+
+        response = client.post('/api/applications/', {
+            **APPLICATION_DATA, 'photo1_upload': first, 'photo3_upload': second,
+        }, format='json')
+
+        assert response.status_code == 201, response.data
+        app = HairApplication.objects.get(pk=response.data['data']['id'])
+        assert app.photo1 and app.photo3 and not app.photo2
+        with app.photo1.open('rb') as stored:
+            assert Image.open(stored).size == (400, 300)
+
+        # Загрузки израсходованы
+        assert not PhotoUpload.objects.exists()
+        assert not upload_path(first).exists()
+
+    @patch('hair_app.views.send_telegram_notification')
+    def test_uploads_kept_on_validation_error(self, notify):
+        client = APIClient()
+        upload_id = upload(client, photo_bytes())
+
+        response = client.post('/api/applications/', {
+            **APPLICATION_DATA, 'phone': '123', 'photo1_upload': upload_id,
+        }, format='json')
+        assert response.status_code == 400
+        assert PhotoUpload.objects.filter(pk=upload_id).exists()
+
+    def test_unfinished_upload_rejected(self):
+        client = APIClient()
+        data = photo_bytes()
+        state = start(client, data)
+        send_chunk(client, state['id'], 0, data[:1024])
+
+        response = client.post('/api/applications/', {
+            **APPLICATION_DATA, 'photo1_upload': state['id'],
+        }, format='json')
+        assert response.status_code == 400
+        assert 'photo1' in response.data['errors']
+
+    def test_photo1_required(self):
+        response = APIClient().post('/api/applications/', APPLICATION_DATA, format='json')
+        assert response.status_code == 400
+        assert 'photo1' in response.data['errors']
@@ -0,0 +1,85 @@
+"""
+Миниатюры фотографий заявок для админки
+
+Миниатюра создаётся один раз по запросу и кешируется на диске.
+Ключ кеша - путь к фото и размер; устаревает, если оригинал новее.
+Фото читается через storage своего поля (photo.storage), а не default_storage.
+URL содержит версию - хеш имени файла: заменённое фото получает новый URL,
+и браузер не показывает старую миниатюру из своего кеша.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from django.conf import settings
+from django.urls import reverse
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Разрешённые размеры - чтобы нельзя было забить кеш произвольными
+THUMBNAIL_SIZES = (80, 200)
+PHOTO_FIELDS = ('photo1', 'photo2', 'photo3')
+THUMBNAIL_QUALITY = 80
+
+
+def thumbnail_cache_path(photo_name, size):
+    key = hashlib.sha1(f'{photo_name}:{size}'.encode('utf-8')).hexdigest()
+    return Path(settings.THUMBNAIL_CACHE_DIR) / key[:2] / f'{key}.jpg'
+
+
+def thumbnail_version(photo_name):
+    return hashlib.sha1(photo_name.encode('utf-8')).hexdigest()[:12]
+
+
+def thumbnail_url(app_id, field, size, photo_name):
+    url = reverse('photo-thumbnail', args=[app_id, field, size])
+    return f'{url}?v={thumbnail_version(photo_name)}'
+
+
+def _is_fresh(cache_path, photo):
+    if not cache_path.exists():
+        return False
+    try:
+        source_mtime = photo.storage.get_modified_time(photo.name).timestamp()
+    except (NotImplementedError, OSError):
+        return True
+    return cache_path.stat().st_mtime >= source_mtime
+
+
+def get_thumbnail(photo, size):
+    """
+    Вернуть путь к миниатюре, создав её при необходимости.
+    Для JPEG draft() декодирует сразу в уменьшенном масштабе,
+    поэтому 10 МБ оригинал не разворачивается в память целиком.
+    """
+    if size not in THUMBNAIL_SIZES:
+        raise ValueError(f'Unsupported thumbnail size: {size}')
+
+    cache_path = thumbnail_cache_path(photo.name, size)
+    if _is_fresh(cache_path, photo):
+        return cache_path
+
+    with photo.storage.open(photo.name, 'rb') as source:
+        image = Image.open(source)
+        image.draft('RGB', (size, size))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((size, size))
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Пишем во временный файл и атомарно подменяем - параллельные запросы не увидят половину файла
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                image.save(tmp, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True)
+            os.replace(tmp_path, cache_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    logger.info(f'Thumbnail created: {photo.name} ({size}px)')
+    return cache_path
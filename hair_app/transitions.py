@@ -0,0 +1,89 @@
+"""
+Смена статусов заявок
+
+Один условный UPDATE ... WHERE status IN (допустимые) вместо get() + save(),
+запись в журнал ApplicationStatusChange и одно событие на всю пачку.
+"""
+import logging
+from django.db import transaction
+from django.utils import timezone
+from .models import HairApplication, ApplicationStatusChange
+from .signals import applications_status_changed
+
+logger = logging.getLogger(__name__)
+
+# Новый статус → из каких статусов в него можно перейти
+ALLOWED_TRANSITIONS = {
+    'viewed': ('new',),
+    'accepted': ('new', 'viewed'),
+    'rejected': ('new', 'viewed', 'accepted'),
+    'completed': ('accepted',),
+}
+
+
+def allowed_sources(new_status):
+    if new_status not in ALLOWED_TRANSITIONS:
+        raise ValueError(f'Unknown target status: {new_status}')
+    return ALLOWED_TRANSITIONS[new_status]
+
+
+def transition_status(queryset, new_status, source, actor=''):
+    """
+    Перевести заявки из queryset в new_status.
+    Заявки в недопустимом статусе пропускаются.
+
+    Returns:
+        list[dict]: изменённые заявки - {'id', 'old_status', 'new_status'}
+    """
+    allowed = allowed_sources(new_status)
+
+    with transaction.atomic():
+        candidates = queryset.filter(status__in=allowed).order_by()
+        if transaction.get_connection().features.has_select_for_update:
+            candidates = candidates.select_for_update()
+        rows = list(candidates.values_list('id', 'status'))
+        if not rows:
+            return []
+
+        ids = [pk for pk, _ in rows]
+        HairApplication.objects.filter(id__in=ids, status__in=allowed).update(
+            status=new_status,
+            updated_at=timezone.now()
+        )
+
+        ApplicationStatusChange.objects.bulk_create([
+            ApplicationStatusChange(
+                application_id=pk,
+                old_status=old_status,
+                new_status=new_status,
+                source=source,
+                actor=actor[:100]
+            )
+            for pk, old_status in rows
+        ])
+
+        changes = [
+            {'id': pk, 'old_status': old_status, 'new_status': new_status}
+            for pk, old_status in rows
+        ]
+        transaction.on_commit(
+            lambda: applications_status_changed.send(
+                sender=HairApplication, changes=changes, source=source, actor=actor
+            )
+        )
+
+    logger.info(f'Status → {new_status} ({source}): {len(changes)} applications')
+    return changes
+
+
+def transition_application(app_id, new_status, source, actor=''):
+    """
+    Перевести одну заявку в new_status.
+
+    Returns:
+        str | None: старый статус, или None если переход недопустим
+    """
+    changes = transition_status(
+        HairApplication.objects.filter(pk=app_id), new_status, source, actor
+    )
+    return changes[0]['old_status'] if changes else None
@@ -0,0 +1,165 @@
+"""
+Загрузка фото частями до отправки заявки
+
+1. POST /api/uploads/ {filename, size}        -> id, offset 0
+2. PATCH /api/uploads/<id>/ + Upload-Offset   -> тело - следующая часть файла
+3. GET /api/uploads/<id>/                     -> сколько уже принято (после обрыва)
+4. POST /api/applications/ {..., photo1_upload: id} - короткий JSON-запрос
+
+Каждый запрос короткий (одна часть <= UPLOAD_CHUNK_SIZE): оборванная связь
+стоит одной части, а не всего файла, и воркер не занят всё время загрузки.
+Фото заявки загружаются параллельно, части одного фото - по порядку.
+Смещение - размер временного файла, БД на каждую часть не пишется.
+"""
+import fcntl
+import logging
+import os
+from datetime import timedelta
+from pathlib import Path
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+from PIL import Image
+from .models import PhotoUpload
+from .photos import ALLOWED_FORMATS
+
+logger = logging.getLogger(__name__)
+
+COPY_BUFFER_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """Загрузка не принята; message - для ответа клиенту"""
+
+
+class OffsetMismatch(UploadError):
+    """Часть пришла не с того смещения (повтор или пропуск)"""
+
+    def __init__(self, offset):
+        super().__init__(f'Ожидается часть со смещения {offset}')
+        self.offset = offset
+
+
+def upload_path(upload_id):
+    return Path(settings.UPLOAD_TEMP_DIR) / f'{upload_id}.part'
+
+
+def get_offset(upload):
+    try:
+        return upload_path(upload.id).stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def start_upload(filename, size):
+    if size <= 0:
+        raise UploadError('Пустой файл')
+    if size > settings.PHOTO_MAX_UPLOAD_SIZE:
+        limit_mb = settings.PHOTO_MAX_UPLOAD_SIZE // (1024 * 1024)
+        raise UploadError(f'Файл слишком большой (макс {limit_mb} МБ)')
+
+    upload = PhotoUpload.objects.create(filename=os.path.basename(filename)[:255] or 'photo', size=size)
+    path = upload_path(upload.id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return upload
+
+
+def append_chunk(upload, offset, stream):
+    """
+    Дописать часть из stream, если она начинается с текущего смещения.
+    Параллельные запросы с той же частью (повтор после таймаута)
+    сериализуются блокировкой файла - второй получит OffsetMismatch.
+
+    Returns:
+        int: новое смещение
+    """
+    if upload.is_complete:
+        raise OffsetMismatch(upload.size)
+
+    path = upload_path(upload.id)
+    if not path.exists():
+        raise UploadError('Загрузка устарела, начните заново')
+
+    with open(path, 'ab') as target:
+        fcntl.flock(target, fcntl.LOCK_EX)
+        current = os.fstat(target.fileno()).st_size
+        if offset != current:
+            raise OffsetMismatch(current)
+
+        limit = min(settings.UPLOAD_CHUNK_SIZE, upload.size - current)
+        received = 0
+        while received <= limit:
+            data = stream.read(min(COPY_BUFFER_SIZE, limit + 1 - received))
+            if not data:
+                break
+            received += len(data)
+            if received > limit:
+                # Недописанную часть откатываем - смещение остаётся прежним
+                target.truncate(current)
+                raise UploadError('Часть больше допустимого размера')
+            target.write(data)
+        target.flush()
+        new_offset = current + received
+
+    if new_offset == upload.size:
+        complete_upload(upload)
+    return new_offset
+
+
+def complete_upload(upload):
+    """Все байты получены: проверить, что это фото допустимого формата"""
+    path = upload_path(upload.id)
+    try:
+        with Image.open(path) as image:
+            image_format = image.format
+            image.verify()
+    except Exception:
+        discard_uploads([upload.id])
+        raise UploadError('Загруженный файл не является изображением')
+
+    if image_format not in ALLOWED_FORMATS:
+        discard_uploads([upload.id])
+        raise UploadError('Поддерживаются фото в форматах JPEG, PNG и WebP')
+
+    upload.completed_at = timezone.now()
+    upload.save(update_fields=['completed_at'])
+    logger.info(f'Photo upload completed: {upload.id} ({upload.size} bytes)')
+
+
+def open_upload(upload_id):
+    """
+    Завершённая загрузка как File для ImageField заявки.
+    Закрыть файл должен вызывающий.
+    """
+    upload = PhotoUpload.objects.filter(pk=upload_id, completed_at__isnull=False).first()
+    if upload is None:
+        raise UploadError('Загрузка не найдена или не завершена')
+    try:
+        return File(open(upload_path(upload.id), 'rb'), name=upload.filename)
+    except FileNotFoundError:
+        raise UploadError('Загрузка устарела, начните заново')
+
+
+def discard_uploads(upload_ids):
+    """Удалить загрузки и их временные файлы"""
+    for upload_id in upload_ids:
+        upload_path(upload_id).unlink(missing_ok=True)
+    PhotoUpload.objects.filter(pk__in=upload_ids).delete()
+
+
+def cleanup_expired_uploads(ttl_hours=None):
+    """Удалить брошенные загрузки старше UPLOAD_TTL_HOURS; вернуть их число"""
+    ttl_hours = settings.UPLOAD_TTL_HOURS if ttl_hours is None else ttl_hours
+    cutoff = timezone.now() - timedelta(hours=ttl_hours)
+    expired = list(PhotoUpload.objects.filter(created_at__lt=cutoff).values_list('id', flat=True))
+    discard_uploads(expired)
+
+    # Файлы без записи (запись удалили, файл остался)
+    temp_dir = Path(settings.UPLOAD_TEMP_DIR)
+    if temp_dir.exists():
+        known = {str(pk) for pk in PhotoUpload.objects.values_list('id', flat=True)}
+        for path in temp_dir.glob('*.part'):
+            if path.stem not in known and path.stat().st_mtime < cutoff.timestamp():
+                path.unlink(missing_ok=True)
+    return len(expired)
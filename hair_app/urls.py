@@ -1,30 +1,40 @@
 """
 URL Configuration for hair_app
 """
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
-from .admin_views import dashboard_view, chart_data, recent_applications_api
+from . import admin_views
 
 # API Router
 router = DefaultRouter()
 router.register(r'applications', views.HairApplicationViewSet, basename='application')
+router.register(r'uploads', views.PhotoUploadViewSet, basename='upload')
 
 app_name = 'hair_app'
 
+# ASGI-режим: async-версии I/O-bound endpoints (см. hair_app/async_views.py)
+if settings.ASYNC_VIEWS:
+    from . import async_views
+    api_views = dashboard_views = async_views
+else:
+    api_views = views
+    dashboard_views = admin_views
+
 urlpatterns = [
     # Main page
     path('', views.index, name='index'),
 
     # Admin Dashboard API
-    path('api/admin/dashboard/', dashboard_view, name='admin_dashboard_api'),
-    path('api/admin/chart/', chart_data, name='admin_chart_api'),
-    path('api/admin/recent/', recent_applications_api, name='admin_recent_api'),
+    path('api/admin/dashboard/', dashboard_views.dashboard_view, name='admin_dashboard_api'),
+    path('api/admin/chart/', dashboard_views.chart_data, name='admin_chart_api'),
+    path('api/admin/recent/', dashboard_views.recent_applications_api, name='admin_recent_api'),
     
     # API endpoints
     path('api/', include([
         path('', include(router.urls)),
-        path('calculate-price/', views.calculate_price, name='calculator'),
-        path('price-list/', views.price_list, name='price-list'),
+        path('calculate-price/', api_views.calculate_price, name='calculator'),
+        path('price-list/', api_views.price_list, name='price-list'),
     ])),
 ]
@@ -1,26 +1,34 @@
 """
 Views for hair purchase application
 """
+import io
 import logging
 from django.shortcuts import render
-from django.core.mail import send_mail
 from django.conf import settings
 from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, action
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.exceptions import ValidationError
+from rest_framework.throttling import ScopedRateThrottle
 from drf_spectacular.utils import extend_schema, extend_schema_view
 
-from .models import HairApplication, PriceList, normalize_phone
+from .models import HairApplication, PriceList, PhotoUpload, normalize_phone
 from .serializers import (
     HairApplicationSerializer,
+    PhotoUploadSerializer,
     PriceCalculatorSerializer,
-    PriceListSerializer
+    PriceListSerializer,
+    HairApplicationFastSerializer,
+    PriceListFastSerializer
 )
 from .utils import calculate_hair_price
 from .price_calculator import calculate_hair_price as calc_hair_price, PRICE_TABLE
-from .tasks import send_telegram_notification
+from .search import search_applications, SEARCH_LIMIT
+from .sellers import register_application
+from .idempotency import idempotent
+from .uploads import UploadError, OffsetMismatch, append_chunk, start_upload
+from .tasks import send_telegram_notification, send_email_notification
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +37,9 @@ def index(request):
     """
     Main page view.
     """
-    return render(request, 'index.html')
+    return render(request, 'index.html', {
+        'photo_max_dimension': settings.PHOTO_MAX_DIMENSION,
+    })
 
 
 def normalize_length_for_calculator(length_input):
@@ -144,6 +154,19 @@ class HairApplicationViewSet(viewsets.ModelViewSet):
     serializer_class = HairApplicationSerializer
     permission_classes = [AllowAny]
     
+    def list(self, request, *args, **kwargs):
+        """
+        Read-only список: values() + быстрые конвертеры вместо ModelSerializer.
+        """
+        fast = HairApplicationFastSerializer(context=self.get_serializer_context())
+        queryset = fast.project(self.filter_queryset(self.get_queryset()))
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(fast.convert(page))
+        return Response(fast.convert(queryset))
+    
+    @idempotent('applications', volatile_fields=HairApplicationSerializer.UPLOAD_FIELDS)
     def create(self, request, *args, **kwargs):
         """
         ✅ ПЕРЕОПРЕДЕЛЁННЫЙ create() для ПРАВИЛЬНОЙ обработки ошибок валидации.
@@ -221,9 +244,15 @@ class HairApplicationViewSet(viewsets.ModelViewSet):
             
             logger.info(f"Application created successfully with ID: {application.id}")
             
-            # Send email notification to admin
+            # Повторный продавец / дубль - поиск по индексу SellerIdentity
             try:
-                send_mail(
+                register_application(application)
+            except Exception as e:
+                logger.error(f'Error registering seller for application #{application.id}: {e}', exc_info=True)
+            
+            # Send email notification to admin (в фоне - SMTP не держит запрос)
+            try:
+                send_email_notification(
                     subject=f'Новая заявка #{application.id}',
                     message=f'Получена новая заявка на продажу волос.\n\n'
                             f'Имя: {application.name}\n'
@@ -235,12 +264,12 @@ class HairApplicationViewSet(viewsets.ModelViewSet):
                     recipient_list=[settings.ADMIN_EMAIL],
                     fail_silently=True,
                 )
-                logger.info(f"Email notification sent for application #{application.id}")
+                logger.info(f"Email notification queued for application #{application.id}")
             except Exception as e:
                 # Log error but don't fail the request
-                logger.error(f'Error sending email for application #{application.id}: {e}')
+                logger.error(f'Error queuing email for application #{application.id}: {e}')
             
-            # ✅ Send Telegram notification using threading (NOT asyncio.run())
+            # ✅ Telegram notification - в общем event loop процесса (hair_app.tasks)
             try:
                 send_telegram_notification(application.id)
                 logger.info(f"Telegram notification queued for application #{application.id}")
@@ -253,6 +282,165 @@ class HairApplicationViewSet(viewsets.ModelViewSet):
         except Exception as e:
             logger.error(f'Error in perform_create: {e}', exc_info=True)
             raise
+    
+    @extend_schema(description='Поиск заявок по имени, телефону, email, городу и комментарию')
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def search(self, request):
+        """
+        GET /api/applications/search/?q=...&limit=...
+        Результаты отсортированы по релевантности.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {'error': 'Параметр q обязателен'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', SEARCH_LIMIT)), SEARCH_LIMIT))
+        except (ValueError, TypeError):
+            limit = SEARCH_LIMIT
+        
+        apps = search_applications(query, limit=limit)
+        serializer = self.get_serializer(apps, many=True)
+        return Response({
+            'count': len(apps),
+            'results': serializer.data,
+        })
+
+
+UPLOAD_OFFSET_HEADER = 'Upload-Offset'
+
+
+@extend_schema_view(
+    create=extend_schema(description='Начать загрузку фото частями'),
+    retrieve=extend_schema(description='Сколько байт загрузки уже принято'),
+    partial_update=extend_schema(description='Дописать часть файла (заголовок Upload-Offset)'),
+)
+class PhotoUploadViewSet(viewsets.GenericViewSet):
+    """
+    Загрузка фото частями до отправки заявки (см. hair_app/uploads.py).
+    """
+    queryset = PhotoUpload.objects.all()
+    serializer_class = PhotoUploadSerializer
+    permission_classes = [AllowAny]
+    # Одно фото - несколько запросов: отдельный лимит вместо anon
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'uploads'
+    
+    def create(self, request, *args, **kwargs):
+        """
+        POST /api/uploads/ {filename, size}
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            upload = start_upload(**serializer.validated_data)
+        except UploadError as e:
+            return upload_error_response(e)
+        return Response(self.get_serializer(upload).data, status=status.HTTP_201_CREATED)
+    
+    def retrieve(self, request, *args, **kwargs):
+        """
+        GET /api/uploads/<id>/ - смещение для продолжения после обрыва
+        """
+        return Response(self.get_serializer(self.get_object()).data)
+    
+    def partial_update(self, request, *args, **kwargs):
+        """
+        PATCH /api/uploads/<id>/
+        Upload-Offset: <смещение>, тело - байты части (не multipart).
+        """
+        upload = self.get_object()
+        try:
+            offset = int(request.headers.get(UPLOAD_OFFSET_HEADER, ''))
+        except ValueError:
+            return upload_error_response(UploadError(f'Нужен заголовок {UPLOAD_OFFSET_HEADER}'))
+        
+        # Тело читается потоком, без парсеров DRF
+        stream = request.stream or io.BytesIO()
+        try:
+            append_chunk(upload, offset, stream)
+        except UploadError as e:
+            return upload_error_response(e)
+        return Response(self.get_serializer(upload).data)
+
+
+def upload_error_response(error):
+    data = {'status': 'error', 'message': str(error)}
+    if isinstance(error, OffsetMismatch):
+        # Клиент продолжает с offset
+        data['offset'] = error.offset
+        return Response(data, status=status.HTTP_409_CONFLICT)
+    return Response(data, status=status.HTTP_400_BAD_REQUEST)
+
+
+def price_quote(validated_data):
+    """
+    Точная цена и диапазон min/max по структуре для данных PriceCalculatorSerializer.
+    Общая часть sync (DRF) и async (ASGI) версий calculate_price.
+    """
+    length = validated_data['length']
+    color = validated_data['color']
+    structure = validated_data['structure']
+    age = validated_data.get('age', 'взрослые')
+    condition = validated_data['condition']
+
+    # КРИТИЧНО: Нормализуем длину перед передачей в калькулятор!
+    normalized_length = normalize_length_for_calculator(length)
+    logger.info(f"Normalized length: {length} → {normalized_length}")
+
+    # Get exact price for selected structure
+    estimated_price = calc_hair_price(
+        length=normalized_length,  # Теперь это строка типа '100+' или '50-60'
+        color=color,
+        structure=structure,
+        age=age,
+        condition=condition
+    )
+
+    # length_range уже нормализирована
+    length_range = normalized_length
+
+    # Normalize color for table lookup
+    color_map = {
+        'блонд': 'блонд',
+        'светло-русые': 'светло-русые',
+        'светлорусые': 'светло-русые',
+        'русые': 'русые',
+        'темно-русые': 'темно-русые',
+        'темнорусые': 'темно-русые',
+        'каштановые': 'каштановые',
+        'каштан': 'каштановые',
+    }
+    normalized_color = color_map.get(str(color).strip().lower(), 'блонд')
+
+    # Get min and max prices for this length and color
+    price_min = None
+    price_max = None
+
+    try:
+        if length_range in PRICE_TABLE and normalized_color in PRICE_TABLE[length_range]:
+            prices = list(PRICE_TABLE[length_range][normalized_color].values())
+            if prices:
+                price_min = min(prices)
+                price_max = max(prices)
+    except (KeyError, ValueError, TypeError) as e:
+        logger.warning(f"Error getting price range from table: {e}")
+
+    # Fallback if unable to get range from table
+    if price_min is None or price_max is None:
+        price_min = estimated_price
+        price_max = estimated_price
+
+    logger.info(f"Calculated prices - Min: {price_min}, Max: {price_max}, Exact: {estimated_price} for range {length_range}")
+
+    return {
+        'estimated_price': float(estimated_price),
+        'price_min': float(price_min),
+        'price_max': float(price_max),
+    }
 
 
 @extend_schema(
@@ -276,66 +464,7 @@ def calculate_price(request):
         
         if serializer.is_valid():
             try:
-                length = serializer.validated_data['length']
-                color = serializer.validated_data['color']
-                structure = serializer.validated_data['structure']
-                age = serializer.validated_data.get('age', 'взрослые')
-                condition = serializer.validated_data['condition']
-                
-                # КРИТИЧНО: Нормализуем длину перед передачей в калькулятор!
-                normalized_length = normalize_length_for_calculator(length)
-                logger.info(f"Normalized length: {length} → {normalized_length}")
-                
-                # Get exact price for selected structure
-                estimated_price = calc_hair_price(
-                    length=normalized_length,  # Теперь это строка типа '100+' или '50-60'
-                    color=color,
-                    structure=structure,
-                    age=age,
-                    condition=condition
-                )
-                
-                # length_range уже нормализирована
-                length_range = normalized_length
-                
-                # Normalize color for table lookup
-                color_map = {
-                    'блонд': 'блонд',
-                    'светло-русые': 'светло-русые',
-                    'светлорусые': 'светло-русые',
-                    'русые': 'русые',
-                    'темно-русые': 'темно-русые',
-                    'темнорусые': 'темно-русые',
-                    'каштановые': 'каштановые',
-                    'каштан': 'каштановые',
-                }
-                normalized_color = color_map.get(str(color).strip().lower(), 'блонд')
-                
-                # Get min and max prices for this length and color
-                price_min = None
-                price_max = None
-                
-                try:
-                    if length_range in PRICE_TABLE and normalized_color in PRICE_TABLE[length_range]:
-                        prices = list(PRICE_TABLE[length_range][normalized_color].values())
-                        if prices:
-                            price_min = min(prices)
-                            price_max = max(prices)
-                except (KeyError, ValueError, TypeError) as e:
-                    logger.warning(f"Error getting price range from table: {e}")
-                
-                # Fallback if unable to get range from table
-                if price_min is None or price_max is None:
-                    price_min = estimated_price
-                    price_max = estimated_price
-                
-                logger.info(f"Calculated prices - Min: {price_min}, Max: {price_max}, Exact: {estimated_price} for range {length_range}")
-                
-                return Response({
-                    'estimated_price': float(estimated_price),
-                    'price_min': float(price_min),
-                    'price_max': float(price_max),
-                })
+                return Response(price_quote(serializer.validated_data))
             except Exception as e:
                 logger.error(f'Error in price calculation logic: {e}', exc_info=True)
                 return Response(
@@ -368,8 +497,8 @@ def price_list(request):
     """
     try:
         prices = PriceList.objects.filter(is_active=True)
-        serializer = PriceListSerializer(prices, many=True)
-        return Response(serializer.data)
+        fast = PriceListFastSerializer(context={'request': request})
+        return Response(fast.serialize(prices))
     except Exception as e:
         logger.error(f'Error getting price list: {e}', exc_info=True)
         return Response(
@@ -233,8 +233,29 @@ photoInputs.forEach((input) => {
     });
 });
 
+// ===== IDEMPOTENCY-KEY =====
+// Один ключ на отправку: повтор после обрыва связи не создаст вторую заявку
+let applicationIdempotencyKey = null;
+
+function generateIdempotencyKey() {
+    if (window.crypto && typeof window.crypto.randomUUID === 'function') {
+        return window.crypto.randomUUID();
+    }
+    const bytes = new Uint8Array(16);
+    window.crypto.getRandomValues(bytes);
+    return 'k' + Array.from(bytes, b => b.toString(16).padStart(2, '0')).join('');
+}
+
+function resetIdempotencyKey() {
+    applicationIdempotencyKey = null;
+}
+
 // ===== ОТПРАВКА ФОРМЫ ЗАЯВКИ =====
 if (applicationForm) {
+    // Данные изменились - это уже другая заявка
+    applicationForm.addEventListener('input', resetIdempotencyKey);
+    applicationForm.addEventListener('change', resetIdempotencyKey);
+    
     applicationForm.addEventListener('submit', async function(e) {
         e.preventDefault();
         
@@ -263,6 +284,7 @@ if (applicationForm) {
         const submitButton = this.querySelector('button[type="submit"]');
         const btnText = submitButton.querySelector('.btn-text');
         const btnLoader = submitButton.querySelector('.btn-loader');
+        const btnLabel = btnText.textContent;
         
         btnText.classList.add('hidden');
         btnLoader.classList.remove('hidden');
@@ -272,19 +294,39 @@ if (applicationForm) {
             formMessage.classList.add('hidden');
         }
         
+        if (!applicationIdempotencyKey) {
+            applicationIdempotencyKey = generateIdempotencyKey();
+        }
+        
         try {
-            const response = await fetch('/api/applications/', {
-                method: 'POST',
-                headers: {
-                    'X-CSRFToken': csrftoken,
-                },
-                credentials: 'same-origin',
-                body: filteredFormData
-            });
+            const headers = {
+                'X-CSRFToken': csrftoken,
+                'Idempotency-Key': applicationIdempotencyKey,
+            };
+            let response;
+            if (window.PhotoUpload) {
+                // Фото уменьшаются и загружаются частями, прогресс - на кнопке
+                response = await PhotoUpload.submitApplication('/api/applications/', filteredFormData, {
+                    headers,
+                    maxDimension: parseInt(this.dataset.photoMaxDimension, 10) || undefined,
+                    onProgress: (loaded, total) => {
+                        btnText.textContent = `Отправка ${total ? Math.round(loaded / total * 100) : 100}%`;
+                        btnText.classList.remove('hidden');
+                    }
+                });
+            } else {
+                response = await fetch('/api/applications/', {
+                    method: 'POST',
+                    headers,
+                    credentials: 'same-origin',
+                    body: filteredFormData
+                });
+            }
             
             if (response.ok) {
                 const result = await response.json();
                 console.log('✅ Form submitted successfully:', result);
+                resetIdempotencyKey();
                 
                 // Показываем сообщение об успехе
                 applicationForm.classList.add('hidden');
@@ -336,6 +378,7 @@ if (applicationForm) {
                 formMessage.classList.remove('hidden');
             }
         } finally {
+            btnText.textContent = btnLabel;
             btnText.classList.remove('hidden');
             btnLoader.classList.add('hidden');
             submitButton.disabled = false;
@@ -348,6 +391,7 @@ window.resetApplicationForm = function() {
     if (applicationForm) {
         applicationForm.reset();
         applicationForm.classList.remove('hidden');
+        resetIdempotencyKey();
         
         // Очистка всех превью
         document.querySelectorAll('[data-preview]').forEach(preview => {
@@ -0,0 +1,294 @@
+/**
+ * Подготовка фото заявки к отправке
+ *
+ * Фото с телефона (8+ МБ) уменьшаются в браузере до maxDimension по длинной
+ * стороне и перекодируются в WebP (или JPEG, если браузер не умеет WebP).
+ * Ориентация из EXIF применяется при декодировании, сами EXIF (в т.ч. GPS)
+ * в новый файл не попадают. Если браузер не смог декодировать фото
+ * (например, HEIC), отправляется оригинал - сервер решит сам.
+ *
+ * Фото отправляются частями на /api/uploads/ (см. hair_app/uploads.py),
+ * заявка - JSON со ссылками на загрузки.
+ */
+(function (global) {
+    'use strict';
+
+    const DEFAULT_MAX_DIMENSION = 2048;
+    const DEFAULT_QUALITY = 0.85;
+    // Маленькие фото в пределах размеров не перекодируем - выигрыша нет
+    const KEEP_ORIGINAL_BELOW = 512 * 1024;
+
+    async function decodeImage(file) {
+        if (global.createImageBitmap) {
+            try {
+                return await global.createImageBitmap(file, { imageOrientation: 'from-image' });
+            } catch (error) {
+                // Старые браузеры не знают опций - пробуем через <img>
+            }
+        }
+        return new Promise((resolve, reject) => {
+            const url = URL.createObjectURL(file);
+            const img = new Image();
+            img.onload = () => {
+                URL.revokeObjectURL(url);
+                resolve(img);
+            };
+            img.onerror = () => {
+                URL.revokeObjectURL(url);
+                reject(new Error('Cannot decode image'));
+            };
+            img.src = url;
+        });
+    }
+
+    function createCanvas(width, height) {
+        if (typeof OffscreenCanvas !== 'undefined') {
+            return new OffscreenCanvas(width, height);
+        }
+        const canvas = document.createElement('canvas');
+        canvas.width = width;
+        canvas.height = height;
+        return canvas;
+    }
+
+    function encodeCanvas(canvas, type, quality) {
+        if (canvas.convertToBlob) {
+            return canvas.convertToBlob({ type, quality });
+        }
+        return new Promise((resolve) => canvas.toBlob(resolve, type, quality));
+    }
+
+    async function encode(canvas, quality) {
+        const webp = await encodeCanvas(canvas, 'image/webp', quality);
+        // Браузер без WebP-кодировщика молча отдаёт PNG
+        if (webp && webp.type === 'image/webp') {
+            return webp;
+        }
+        return encodeCanvas(canvas, 'image/jpeg', quality);
+    }
+
+    /**
+     * Уменьшить фото до maxDimension; вернуть File (исходный, если уменьшать нечего)
+     */
+    async function downscalePhoto(file, options = {}) {
+        const maxDimension = options.maxDimension || DEFAULT_MAX_DIMENSION;
+        const quality = options.quality || DEFAULT_QUALITY;
+
+        if (!file || !file.type.startsWith('image/') || file.type === 'image/gif') {
+            return file;
+        }
+
+        let image;
+        try {
+            image = await decodeImage(file);
+        } catch (error) {
+            console.warn(`Photo ${file.name} sent as is: ${error.message}`);
+            return file;
+        }
+
+        const width = image.width;
+        const height = image.height;
+        const scale = Math.min(1, maxDimension / Math.max(width, height));
+        if (scale === 1 && file.size <= KEEP_ORIGINAL_BELOW) {
+            if (image.close) image.close();
+            return file;
+        }
+
+        const canvas = createCanvas(Math.round(width * scale), Math.round(height * scale));
+        const context = canvas.getContext('2d');
+        context.imageSmoothingQuality = 'high';
+        context.drawImage(image, 0, 0, canvas.width, canvas.height);
+        if (image.close) image.close();
+
+        const blob = await encode(canvas, quality);
+        if (!blob || (scale === 1 && blob.size >= file.size)) {
+            return file;
+        }
+
+        const extension = blob.type === 'image/webp' ? 'webp' : 'jpg';
+        const name = file.name.replace(/\.[^.]*$/, '') + '.' + extension;
+        console.log(`📉 ${file.name}: ${file.size} → ${blob.size} bytes (${canvas.width}×${canvas.height})`);
+        return new File([blob], name, { type: blob.type, lastModified: file.lastModified });
+    }
+
+    /**
+     * Запрос с прогрессом выгрузки тела (fetch его не сообщает).
+     * onProgress(loaded) вызывается по мере отправки тела запроса.
+     * Возвращает Response, как fetch; при обрыве связи - TypeError, как fetch.
+     */
+    function sendRequest(method, url, body, { headers = {}, onProgress } = {}) {
+        return new Promise((resolve, reject) => {
+            const xhr = new XMLHttpRequest();
+            xhr.open(method, url);
+            xhr.withCredentials = true;
+            for (const [name, value] of Object.entries(headers)) {
+                xhr.setRequestHeader(name, value);
+            }
+            if (onProgress) {
+                xhr.upload.onprogress = (event) => onProgress(event.loaded);
+            }
+            xhr.onload = () => {
+                const responseBody = xhr.status === 204 || xhr.status === 304 ? null : xhr.responseText;
+                resolve(new Response(responseBody, {
+                    status: xhr.status,
+                    statusText: xhr.statusText,
+                    headers: { 'Content-Type': xhr.getResponseHeader('Content-Type') || '' },
+                }));
+            };
+            xhr.onerror = () => reject(new TypeError('Network request failed'));
+            xhr.ontimeout = () => reject(new TypeError('Network request timed out'));
+            xhr.send(body);
+        });
+    }
+
+    // ===== ЗАГРУЗКА ЧАСТЯМИ (/api/uploads/) =====
+    // Обрыв связи стоит одной части: после паузы клиент спрашивает у сервера
+    // принятое смещение и продолжает с него. ID загрузки хранится в
+    // sessionStorage - после перезагрузки страницы файл тоже докачивается.
+
+    const UPLOADS_URL = '/api/uploads/';
+    const RETRY_DELAYS = [1000, 2000, 5000, 10000, 20000];
+
+    class UploadRejected extends Error {}
+
+    const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+    function resumeKey(file) {
+        return `photo-upload:${file.name}:${file.size}:${file.lastModified}`;
+    }
+
+    async function errorMessage(response) {
+        try {
+            const data = await response.json();
+            return data.message || data.detail || response.statusText;
+        } catch (error) {
+            return response.statusText;
+        }
+    }
+
+    async function getUploadState(id) {
+        const response = await fetch(`${UPLOADS_URL}${id}/`, { credentials: 'same-origin' });
+        return response.ok ? response.json() : null;
+    }
+
+    async function startUpload(file, headers) {
+        const saved = sessionStorage.getItem(resumeKey(file));
+        if (saved) {
+            const state = await getUploadState(saved);
+            if (state) return state;
+        }
+        const response = await fetch(UPLOADS_URL, {
+            method: 'POST',
+            headers: { ...headers, 'Content-Type': 'application/json' },
+            credentials: 'same-origin',
+            body: JSON.stringify({ filename: file.name, size: file.size }),
+        });
+        if (!response.ok) {
+            throw new UploadRejected(await errorMessage(response));
+        }
+        const state = await response.json();
+        sessionStorage.setItem(resumeKey(file), state.id);
+        return state;
+    }
+
+    /**
+     * Загрузить файл частями; вернуть ID загрузки для photoN_upload.
+     * onProgress(bytes) - сколько байт файла уже принято.
+     */
+    async function uploadPhoto(file, { headers = {}, onProgress = () => {} } = {}) {
+        let state = await startUpload(file, headers);
+        let attempt = 0;
+        onProgress(state.offset);
+
+        while (!state.complete) {
+            const offset = state.offset;
+            const chunk = file.slice(offset, offset + state.chunk_size);
+            try {
+                const response = await sendRequest('PATCH', `${UPLOADS_URL}${state.id}/`, chunk, {
+                    headers: {
+                        ...headers,
+                        'Upload-Offset': String(offset),
+                        'Content-Type': 'application/offset+octet-stream',
+                    },
+                    onProgress: (loaded) => onProgress(offset + loaded),
+                });
+                if (response.ok) {
+                    state = await response.json();
+                    attempt = 0;
+                    onProgress(state.offset);
+                } else if (response.status === 409) {
+                    // Часть уже принята (ответ потерялся) - сверяемся с сервером
+                    state = (await getUploadState(state.id)) || state;
+                } else if (response.status === 429 || response.status >= 500) {
+                    throw new TypeError(await errorMessage(response));
+                } else {
+                    sessionStorage.removeItem(resumeKey(file));
+                    throw new UploadRejected(await errorMessage(response));
+                }
+            } catch (error) {
+                if (error instanceof UploadRejected || attempt >= RETRY_DELAYS.length) {
+                    throw error;
+                }
+                console.warn(`Upload of ${file.name} interrupted, retrying: ${error.message}`);
+                await sleep(RETRY_DELAYS[attempt++]);
+                try {
+                    state = (await getUploadState(state.id)) || state;
+                } catch (stateError) {
+                    // Связи всё ещё нет - повторим часть со старого смещения
+                }
+            }
+        }
+        return state.id;
+    }
+
+    /**
+     * Отправить заявку в два этапа: фото уменьшаются и параллельно
+     * загружаются частями, затем заявка уходит коротким JSON с ID загрузок.
+     * onProgress(loaded, total) - по байтам всех фото.
+     * Возвращает Response ответа на создание заявки.
+     */
+    async function submitApplication(url, formData, { headers = {}, maxDimension, onProgress } = {}) {
+        const fields = {};
+        const photoKeys = [];
+        const originals = [];
+        for (const [key, value] of formData.entries()) {
+            if (value instanceof File) {
+                if (value.size > 0) {
+                    photoKeys.push(key);
+                    originals.push(value);
+                }
+            } else {
+                fields[key] = value;
+            }
+        }
+
+        const photos = await Promise.all(originals.map((file) => downscalePhoto(file, { maxDimension })));
+        const total = photos.reduce((sum, file) => sum + file.size, 0);
+        const loaded = photos.map(() => 0);
+        const report = () => onProgress && onProgress(loaded.reduce((a, b) => a + b, 0), total);
+
+        const uploadIds = await Promise.all(photos.map((file, index) => uploadPhoto(file, {
+            headers,
+            onProgress: (bytes) => {
+                loaded[index] = bytes;
+                report();
+            },
+        })));
+        photoKeys.forEach((key, index) => {
+            fields[`${key}_upload`] = uploadIds[index];
+        });
+
+        const response = await fetch(url, {
+            method: 'POST',
+            headers: { ...headers, 'Content-Type': 'application/json' },
+            credentials: 'same-origin',
+            body: JSON.stringify(fields),
+        });
+        if (response.ok) {
+            photos.forEach((file) => sessionStorage.removeItem(resumeKey(file)));
+        }
+        return response;
+    }
+
+    global.PhotoUpload = { downscalePhoto, uploadPhoto, submitApplication, sendRequest };
+})(window);
@@ -0,0 +1,51 @@
+"""
+Bot и Dispatcher, создаются при первом обращении
+
+Импорт модуля ничего не настраивает и не требует токена: веб-приложение
+подключает бота только когда отправляет уведомление или получает webhook.
+"""
+from functools import lru_cache
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+def check_configured():
+    """ImproperlyConfigured, если боту не хватает настроек"""
+    if not settings.TELEGRAM_BOT_TOKEN:
+        raise ImproperlyConfigured('TELEGRAM_BOT_TOKEN не задан')
+    get_admin_chat_id()
+
+
+def get_admin_chat_id():
+    chat_id = settings.TELEGRAM_ADMIN_CHAT_ID
+    if not chat_id:
+        raise ImproperlyConfigured('TELEGRAM_ADMIN_CHAT_ID не задан')
+    return chat_id
+
+
+@lru_cache(maxsize=None)
+def get_bot():
+    """
+    Один Bot на процесс. aiohttp-сессия создаётся при первом запросе
+    в том event loop, где бот используется.
+    """
+    from aiogram import Bot
+    from aiogram.client.default import DefaultBotProperties
+    from aiogram.enums import ParseMode
+
+    if not settings.TELEGRAM_BOT_TOKEN:
+        raise ImproperlyConfigured('TELEGRAM_BOT_TOKEN не задан')
+    return Bot(
+        token=settings.TELEGRAM_BOT_TOKEN,
+        default=DefaultBotProperties(parse_mode=ParseMode.HTML)
+    )
+
+
+@lru_cache(maxsize=None)
+def get_dispatcher():
+    from aiogram import Dispatcher
+    from telegram_bot.handlers import router
+
+    dp = Dispatcher()
+    dp.include_router(router)
+    return dp
@@ -0,0 +1,100 @@
+"""
+Доступ к БД из обработчиков бота
+
+Каждый обработчик делает один переход в поток: функции здесь синхронные
+и объединяют выборку с обновлением, а выполняются через run_db() в
+отдельном ограниченном пуле (TELEGRAM_DB_WORKERS). Потоки пула живут всё
+время процесса и переиспользуют свои соединения с БД (CONN_MAX_AGE);
+перед каждой задачей, как Django на каждом запросе, закрываются
+устаревшие и сломанные соединения.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Lock
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Count, Q
+from hair_app.models import HairApplication
+from hair_app.transitions import transition_application
+from telegram_bot.instrumentation import stats
+
+RECENT_LIMIT = 15
+
+_executor = None
+_executor_lock = Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.TELEGRAM_DB_WORKERS,
+                thread_name_prefix='bot-db'
+            )
+        return _executor
+
+
+def reset_after_fork():
+    """gunicorn post_fork: потоки пула master в дочерний процесс не копируются"""
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = Lock()
+
+
+def _call(func, args, kwargs):
+    close_old_connections()
+    return func(*args, **kwargs)
+
+
+async def run_db(func, *args, **kwargs):
+    """Выполнить func в пуле БД; время (с ожиданием в очереди) - в статистику db:<имя>"""
+    start = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            get_executor(), partial(_call, func, args, kwargs)
+        )
+    finally:
+        stats.record(f'db:{func.__name__}', time.perf_counter() - start)
+
+
+# ====================
+# ЗАПРОСЫ
+# ====================
+
+def get_application(app_id):
+    return HairApplication.objects.filter(pk=app_id).first()
+
+
+def get_open_applications():
+    # Все кроме completed и rejected. Индекс - (status, -created_at): частичный
+    # SQLite не берёт, когда статусы переданы параметрами запроса
+    return list(HairApplication.objects.filter(
+        status__in=HairApplication.OPEN_STATUSES
+    ).order_by('-created_at'))
+
+
+def get_recent_applications(limit=RECENT_LIMIT):
+    return list(HairApplication.objects.all().order_by('-created_at')[:limit])
+
+
+def get_status_counts():
+    """Все счётчики /stats одним агрегирующим запросом"""
+    counts = {'total': Count('id')}
+    for status, _ in HairApplication.STATUS_CHOICES:
+        counts[status] = Count('id', filter=Q(status=status))
+    return HairApplication.objects.aggregate(**counts)
+
+
+def change_status(app_id, new_status, actor):
+    """
+    Смена статуса и свежая заявка за один переход в поток.
+
+    Returns:
+        (app | None, old_status | None): old_status None - переход недопустим
+        (статус уже изменён другим админом или действие не применимо)
+    """
+    old_status = transition_application(app_id, new_status, source='bot', actor=actor)
+    return get_application(app_id), old_status
@@ -0,0 +1,77 @@
+"""
+Тексты сообщений бота о заявках
+"""
+
+
+def format_application_short(app) -> str:
+    """Краткое описание заявки"""
+    status_emoji = {
+        'new': '📥',
+        'viewed': '🕴',
+        'accepted': '✅',
+        'completed': '🎉',
+        'rejected': '❌'
+    }
+    
+    emoji = status_emoji.get(app.status, '📋')
+    status_text = app.get_status_display()
+    
+    text = (
+        f"{emoji} <b>Заявка #{app.id}</b>\n"
+        f"👤 {app.name}\n"
+        f"📂 {app.phone}\n"
+        f"📅 {app.created_at.strftime('%d.%m.%Y %H:%M')}\n"
+        f"🎯 Статус: <b>{status_text}</b>"
+    )
+    
+    return text
+
+def format_application_full(app) -> str:
+    """Полное описание заявки"""
+    status_emoji = {
+        'new': '📥',
+        'viewed': '🕴',
+        'accepted': '✅',
+        'completed': '🎉',
+        'rejected': '❌'
+    }
+    
+    emoji = status_emoji.get(app.status, '📋')
+    status_text = app.get_status_display()
+    
+    text = (
+        f"{emoji} <b>Заявка #{app.id}</b>\n\n"
+        f"👤 <b>Имя:</b> {app.name}\n"
+        f"📂 <b>Телефон:</b> {app.phone}\n"
+    )
+    
+    # Счётчики хранятся в самой заявке - без запросов на каждое сообщение
+    if app.is_duplicate:
+        text += f"⚠️ <b>Возможный дубль</b> (ранее заявок: {app.prior_applications})\n"
+    elif app.prior_applications:
+        text += f"🔁 <b>Повторный продавец:</b> ранее заявок: {app.prior_applications}\n"
+    
+    if app.email:
+        text += f"📧 <b>Email:</b> {app.email}\n"
+    
+    if app.city:
+        text += f"🎫 <b>Город:</b> {app.city}\n"
+    
+    text += f"\n📐 <b>Длина:</b> {app.get_length_display()}\n"
+    text += f"🎫 <b>Цвет:</b> {app.get_color_display()}\n"
+    text += f"🔬 <b>Структура:</b> {app.get_structure_display()}\n"
+    text += f"👶 <b>Возраст:</b> {app.get_age_display()}\n"
+    text += f"👧 <b>Состояние:</b> {app.get_condition_display()}\n"
+    
+    if app.comment:
+        text += f"\n🗣 <b>Комментарий:</b> {app.comment}\n"
+    
+    if app.estimated_price:
+        text += f"\n💰 <b>Предв. цена:</b> {app.estimated_price} ₽\n"
+    
+    text += (
+        f"\n📅 <b>Создано:</b> {app.created_at.strftime('%d.%m.%Y %H:%M')}\n"
+        f"🎯 <b>Статус:</b> {status_text}"
+    )
+    
+    return text
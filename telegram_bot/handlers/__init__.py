@@ -0,0 +1,226 @@
+"""
+Обработчики команд и кнопок бота
+
+Все обработчики на одном Router; Dispatcher собирается в telegram_bot.client.
+"""
+import os
+import asyncio
+import logging
+from aiogram import Router, types, F
+from aiogram.filters import Command
+from telegram_bot import db
+from telegram_bot.formatters import format_application_short, format_application_full
+from telegram_bot.instrumentation import HandlerLatencyMiddleware, format_latency_report
+from telegram_bot.keyboards import get_application_keyboard
+
+logger = logging.getLogger(__name__)
+
+router = Router(name='applications')
+router.message.middleware(HandlerLatencyMiddleware())
+router.callback_query.middleware(HandlerLatencyMiddleware())
+
+# Кнопка → целевой статус (просмотр меняет статус только у новой заявки)
+ACTION_STATUSES = {
+    'view': 'viewed',
+    'accept': 'accepted',
+    'complete': 'completed',
+    'reject': 'rejected',
+}
+
+ACTION_ANSWERS = {
+    'accept': "✅ Заявка принята в работу",
+    'complete': "🎉 Заявка завершена!",
+    'reject': "❌ Заявка отклонена",
+}
+
+# ====================
+# КОМАНДЫ
+# ====================
+
+@router.message(Command("start"))
+async def cmd_start(message: types.Message):
+    """Приветственное сообщение"""
+    await message.answer(
+        "👋 <b>Привет!</b>\n\n"
+        "Н бот для управления заявками на скупку волос.\n\n"
+        "<b>Доступные команды:</b>\n"
+        "/start - Показать это сообщение\n"
+        "/queue - Показать все незавершённые заявки (📂 очередь)\n"
+        "/all - Показать все заявки\n"
+        "/stats - Статистика\n"
+        "/latency - Задержки бота\n\n"
+        f"🔑 <b>Your Chat ID:</b> <code>{message.from_user.id}</code>\n"
+        "(Скопируй этот ID в TELEGRAM_ADMIN_CHAT_ID в .env)"
+    )
+
+@router.message(Command("queue"))
+async def cmd_queue_applications(message: types.Message):
+    """Показать все незавершённые заявки с фотографиями (новые, просмотренные, принятые)"""
+    pending_apps = await db.run_db(db.get_open_applications)
+    
+    if not pending_apps:
+        await message.answer("📂 <b>Очередь пуста</b>")
+        return
+    
+    # Статистика
+    new_count = sum(1 for app in pending_apps if app.status == 'new')
+    viewed_count = sum(1 for app in pending_apps if app.status == 'viewed')
+    accepted_count = sum(1 for app in pending_apps if app.status == 'accepted')
+    
+    summary = (
+        f"📂 <b>Очередь заявок ({len(pending_apps)}):</b>\n\n"
+        f"🔵 🎭 Активных:\n"
+        f"   🕴 Просмотренных: {viewed_count}\n"
+        f"   🟄 Принятых: {accepted_count}\n"
+        f"   📥 Новых: {new_count}\n\n"
+    )
+    
+    await message.answer(summary)
+    
+    # Отправляем каждую заявку отдельным сообщением с фотографиями
+    for app in pending_apps:
+        text = format_application_full(app)
+        keyboard = get_application_keyboard(app.id, app.status)
+        
+        # Получаем список фотографий
+        photo_files = []
+        photo_fields = ['photo1', 'photo2', 'photo3']
+        
+        for field_name in photo_fields:
+            photo_field = getattr(app, field_name, None)
+            if photo_field and photo_field.name:
+                try:
+                    file_path = photo_field.path
+                    if os.path.exists(file_path):
+                        photo_files.append({
+                            'path': file_path,
+                            'number': field_name[-1]
+                        })
+                except Exception as e:
+                    logger.error(f"Ошибка при проверке фото {field_name} для заявки #{app.id}: {e}")
+        
+        # Если есть фотографии - отправляем их группой
+        if photo_files:
+            try:
+                media_group = []
+                for idx, photo_info in enumerate(photo_files):
+                    caption = text if idx == 0 else None  # Текст заявки на первом фото
+                    media_group.append(
+                        types.InputMediaPhoto(
+                            media=types.FSInputFile(photo_info['path']),
+                            caption=caption
+                        )
+                    )
+                
+                # Отправляем медиа-группу
+                await message.bot.send_media_group(
+                    chat_id=message.chat.id,
+                    media=media_group
+                )
+                
+                # Отправляем кнопки отдельным сообщением
+                await message.answer(
+                    f"<b>Заявка #{app.id}</b> - выберите действие:",
+                    reply_markup=keyboard
+                )
+                
+                logger.info(f"Заявка #{app.id}: отправлено {len(photo_files)} фото + данные")
+            except Exception as e:
+                logger.error(f"Ошибка при отправке медиа-группы для заявки #{app.id}: {e}")
+                # Если ошибка - отправляем просто текст и кнопки
+                await message.answer(text, reply_markup=keyboard)
+        else:
+            # Если фотографий нет - отправляем просто текст и кнопки
+            await message.answer(text, reply_markup=keyboard)
+        
+        await asyncio.sleep(0.1)  # Короткая задержка для Telegram
+
+@router.message(Command("all"))
+async def cmd_all_applications(message: types.Message):
+    """Показать все заявки"""
+    all_apps = await db.run_db(db.get_recent_applications)
+    
+    if not all_apps:
+        await message.answer("📂 <b>Заявок нет</b>")
+        return
+    
+    text = f"📄 <b>Последние {len(all_apps)} заявок:</b>\n\n"
+    
+    for app in all_apps:
+        text += format_application_short(app)
+        text += "\n" + "-" * 30 + "\n\n"
+    
+    await message.answer(text)
+
+@router.message(Command("stats"))
+async def cmd_stats(message: types.Message):
+    """Показать статистику"""
+    stats = await db.run_db(db.get_status_counts)
+    
+    text = (
+        "📈 <b>Статистика заявок:</b>\n\n"
+        f"📋 Всего: <b>{stats['total']}</b>\n"
+        f"📥 Новых: <b>{stats['new']}</b>\n"
+        f"🕴 Просмотрено: <b>{stats['viewed']}</b>\n"
+        f"✅ Принято: <b>{stats['accepted']}</b>\n"
+        f"🎉 Завершено: <b>{stats['completed']}</b>\n"
+        f"❌ Отклонено: <b>{stats['rejected']}</b>"
+    )
+    
+    await message.answer(text)
+
+@router.message(Command("latency"))
+async def cmd_latency(message: types.Message):
+    """Задержки обработчиков и запросов к БД с момента запуска"""
+    await message.answer(format_latency_report())
+
+# ====================
+# CALLBACK ОБРАБОТЧИКИ
+# ====================
+
+@router.callback_query(F.data.regexp(r'^(view|accept|complete|reject)_\d+$'))
+async def process_application_callback(callback: types.CallbackQuery):
+    """Обработка кнопок управления заявкой"""
+    try:
+        # Парсим callback_data: "action_app_id"
+        parts = callback.data.split('_')
+        if len(parts) != 2:
+            logger.error(f"Неверный формат callback_data: {callback.data}")
+            await callback.answer("❌ Ошибка формата данных", show_alert=True)
+            return
+        
+        action, app_id_str = parts
+        app_id = int(app_id_str)
+        
+        logger.info(f"Обработка callback: action={action}, app_id={app_id}")
+        
+        # Смена статуса и свежая заявка - один переход в поток
+        new_status = ACTION_STATUSES[action]
+        app, old_status = await db.run_db(
+            db.change_status, app_id, new_status, str(callback.from_user.id)
+        )
+        
+        if not app:
+            await callback.answer("❌ Заявка не найдена", show_alert=True)
+            return
+        
+        if old_status is not None:
+            logger.info(f"Заявка #{app.id}: статус изменен {old_status} -> {new_status}")
+        elif action != "view":
+            # Просмотр уже обработанной заявки статус не меняет - это не ошибка
+            logger.warning(f"Заявка #{app.id}: переход {app.status} -> {new_status} недопустим")
+        
+        text = format_application_full(app)
+        keyboard = get_application_keyboard(app.id, app.status)
+        await callback.message.edit_text(text, reply_markup=keyboard)
+        
+        if action == "view":
+            await callback.answer("🕴 Заявка просмотрена")
+        elif old_status is None:
+            await callback.answer("⚠️ Статус заявки уже изменён", show_alert=True)
+        else:
+            await callback.answer(ACTION_ANSWERS[action])
+    
+    except Exception as e:
+        logger.error(f"Ошибка в process_application_callback: {e}", exc_info=True)
+        await callback.answer("❌ Ошибка обработки", show_alert=True)
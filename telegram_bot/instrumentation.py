@@ -0,0 +1,75 @@
+"""
+Замер задержек обработчиков бота и обращений к БД
+
+Статистика копится в памяти процесса; /latency показывает её в чате,
+медленные обработчики пишутся в лог с уровнем WARNING.
+"""
+import logging
+import time
+from collections import defaultdict, deque
+from aiogram import BaseMiddleware
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Сколько последних замеров хранить на имя (для p95)
+WINDOW = 500
+
+
+class LatencyStats:
+    """count / avg / p95 / max по имени обработчика или DB-функции"""
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.counts = defaultdict(int)
+        self.samples = defaultdict(lambda: deque(maxlen=self.window))
+
+    def record(self, name, seconds):
+        self.counts[name] += 1
+        self.samples[name].append(seconds)
+
+    def snapshot(self):
+        result = {}
+        for name, samples in self.samples.items():
+            ordered = sorted(samples)
+            result[name] = {
+                'count': self.counts[name],
+                'avg_ms': sum(ordered) / len(ordered) * 1000,
+                'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+                'max_ms': ordered[-1] * 1000,
+            }
+        return result
+
+
+stats = LatencyStats()
+
+
+class HandlerLatencyMiddleware(BaseMiddleware):
+    """Inner-middleware роутера: время обработчика целиком (БД + запросы к Telegram)"""
+
+    async def __call__(self, handler, event, data):
+        name = data['handler'].callback.__name__
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            elapsed = time.perf_counter() - start
+            stats.record(name, elapsed)
+            if elapsed * 1000 >= settings.TELEGRAM_SLOW_HANDLER_MS:
+                logger.warning(f'[BOT] Slow handler {name}: {elapsed * 1000:.0f} ms')
+
+
+def format_latency_report():
+    rows = sorted(stats.snapshot().items())
+    if not rows:
+        return "⏱ <b>Замеров пока нет</b>"
+    lines = ["⏱ <b>Задержки (avg / p95 / max, мс):</b>\n"]
+    for name, row in rows:
+        lines.append(
+            f"<code>{name}</code> ×{row['count']}: "
+            f"{row['avg_ms']:.0f} / {row['p95_ms']:.0f} / {row['max_ms']:.0f}"
+        )
+    return "\n".join(lines)
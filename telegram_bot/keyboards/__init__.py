@@ -0,0 +1,43 @@
+"""
+Inline-клавиатуры бота
+"""
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+
+def get_application_keyboard(app_id: int, status: str) -> InlineKeyboardMarkup:
+    """Создать клавиатуру для заявки в зависимости от статуса"""
+    buttons = []
+    
+    if status == 'new':
+        # Новая заявка: можно просмотреть, принять или отклонить
+        buttons.append([
+            InlineKeyboardButton(text="🕴 Просмотреть", callback_data=f"view_{app_id}")
+        ])
+        buttons.append([
+            InlineKeyboardButton(text="✅ Принять", callback_data=f"accept_{app_id}"),
+            InlineKeyboardButton(text="❌ Отклонить", callback_data=f"reject_{app_id}")
+        ])
+    
+    elif status == 'viewed':
+        # Просмотренная: можно принять или отклонить
+        buttons.append([
+            InlineKeyboardButton(text="✅ Принять", callback_data=f"accept_{app_id}"),
+            InlineKeyboardButton(text="❌ Отклонить", callback_data=f"reject_{app_id}")
+        ])
+    
+    elif status == 'accepted':
+        # Принятая: можно завершить или отклонить
+        buttons.append([
+            InlineKeyboardButton(text="🎉 Завершить", callback_data=f"complete_{app_id}"),
+            InlineKeyboardButton(text="❌ Отклонить", callback_data=f"reject_{app_id}")
+        ])
+    
+    elif status == 'completed':
+        # Завершенная: кнопок нет
+        pass
+    
+    elif status == 'rejected':
+        # Отклоненная: кнопок нет
+        pass
+    
+    return InlineKeyboardMarkup(inline_keyboard=buttons) if buttons else InlineKeyboardMarkup(inline_keyboard=[])
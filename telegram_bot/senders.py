@@ -0,0 +1,72 @@
+"""
+Исходящие сообщения бота (уведомления администратору)
+"""
+import os
+import logging
+from aiogram import types
+from telegram_bot.client import get_bot, get_admin_chat_id
+from telegram_bot.db import run_db, get_application
+from telegram_bot.formatters import format_application_full
+from telegram_bot.keyboards import get_application_keyboard
+
+logger = logging.getLogger(__name__)
+
+
+async def send_new_application_notification(app_id: int):
+    """
+    Отправить уведомление о новой заявке.
+    Вызывается из Django view после сохранения заявки.
+    """
+    bot = get_bot()
+    admin_chat_id = get_admin_chat_id()
+    
+    try:
+        app = await run_db(get_application, app_id)
+        
+        if not app:
+            logger.error(f"Заявка #{app_id} не найдена")
+            return
+        
+        text = (
+            "🔔 <b>НОВАЯ ЗАЯВКА!</b>\n\n"
+            + format_application_full(app)
+        )
+        
+        keyboard = get_application_keyboard(app.id, app.status)
+        
+        # Отправляем текстовое уведомление
+        await bot.send_message(
+            chat_id=admin_chat_id,
+            text=text,
+            reply_markup=keyboard
+        )
+        
+        # Отправляем фотографии, если есть
+        photo_fields = ['photo1', 'photo2', 'photo3']
+        media_group = []
+        
+        for field_name in photo_fields:
+            photo_field = getattr(app, field_name, None)
+            if photo_field and photo_field.name:
+                try:
+                    file_path = photo_field.path
+                    if os.path.exists(file_path):
+                        media_group.append(
+                            types.InputMediaPhoto(
+                                media=types.FSInputFile(file_path),
+                                caption=f"🖼 Фото {field_name[-1]}" if len(media_group) == 0 else None
+                            )
+                        )
+                except Exception as e:
+                    logger.error(f"Ошибка при загруже фото {field_name}: {e}")
+        
+        if media_group:
+            await bot.send_media_group(
+                chat_id=admin_chat_id,
+                media=media_group
+            )
+        
+        logger.info(f"✅ Уведомление о заявке #{app_id} отправлено успешно")
+        
+    except Exception as e:
+        logger.error(f"❌ Ошибка при отправке уведомления о заявке #{app_id}: {e}", exc_info=True)
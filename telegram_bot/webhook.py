@@ -0,0 +1,106 @@
+"""
+Webhook-режим Telegram-бота внутри Django (ASGI)
+
+Telegram присылает апдейты POST-запросом на settings.TELEGRAM_WEBHOOK_PATH,
+отдельный процесс с long polling не нужен. Апдейты обрабатываются в общем
+event loop уведомлений (hair_app.tasks): там же живёт aiohttp-сессия бота.
+
+Одновременно обрабатывается не больше TELEGRAM_WEBHOOK_CONCURRENCY апдейтов.
+Когда все слоты заняты, ответ Telegram задерживается до освобождения слота -
+Telegram сам притормаживает доставку, очередь в памяти не растёт.
+"""
+import asyncio
+import hmac
+import logging
+from concurrent.futures import Future
+import orjson
+from pydantic import ValidationError
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, HttpResponseNotFound, HttpResponseBadRequest
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from hair_app.tasks import dispatch
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+# (loop, semaphore): семафор привязан к циклу, после fork создаётся заново
+_semaphore = (None, None)
+
+
+def get_webhook_url():
+    """Полный URL webhook: TELEGRAM_WEBHOOK_URL (база сайта) + TELEGRAM_WEBHOOK_PATH"""
+    base = settings.TELEGRAM_WEBHOOK_URL.rstrip('/')
+    path = settings.TELEGRAM_WEBHOOK_PATH
+    return base if base.endswith(path) else base + path
+
+
+def get_bot_and_dispatcher():
+    from telegram_bot.client import get_bot, get_dispatcher
+    return get_bot(), get_dispatcher()
+
+
+def _get_semaphore():
+    global _semaphore
+    loop = asyncio.get_running_loop()
+    if _semaphore[0] is not loop:
+        _semaphore = (loop, asyncio.Semaphore(settings.TELEGRAM_WEBHOOK_CONCURRENCY))
+    return _semaphore[1]
+
+
+async def process_update(data, started):
+    """Обработать апдейт в общем цикле; started завершается, когда получен слот"""
+    try:
+        from aiogram.types import Update
+        bot, dp = get_bot_and_dispatcher()
+        update = Update.model_validate(data, context={'bot': bot})
+    except Exception as e:
+        started.set_exception(e)
+        return
+
+    async with _get_semaphore():
+        started.set_result(update.update_id)
+        try:
+            await dp.feed_update(bot, update)
+        except Exception as e:
+            logger.error(f'[WEBHOOK] Update {update.update_id} failed: {e}', exc_info=True)
+
+
+def is_valid_secret(request):
+    secret = settings.TELEGRAM_WEBHOOK_SECRET
+    received = request.headers.get(SECRET_HEADER, '')
+    return bool(secret) and hmac.compare_digest(received.encode(), secret.encode())
+
+
+@csrf_exempt
+@require_POST
+async def telegram_webhook(request):
+    """
+    POST settings.TELEGRAM_WEBHOOK_PATH - апдейт от Telegram
+    Без TELEGRAM_USE_WEBHOOK endpoint не существует; без верного
+    секретного заголовка (задаётся в setWebhook) - 403.
+    """
+    if not settings.TELEGRAM_USE_WEBHOOK:
+        return HttpResponseNotFound()
+    if not is_valid_secret(request):
+        logger.warning('[WEBHOOK] Rejected update with invalid secret token')
+        return HttpResponseForbidden()
+
+    try:
+        data = orjson.loads(request.body)
+    except orjson.JSONDecodeError:
+        return HttpResponseBadRequest()
+
+    started = Future()
+    dispatch(process_update(data, started))
+    try:
+        await asyncio.wrap_future(started)
+    except ValidationError as e:
+        logger.error(f'[WEBHOOK] Invalid update: {e}')
+        return HttpResponseBadRequest()
+    except Exception as e:
+        # Не 2xx - Telegram повторит доставку, когда бот будет настроен
+        logger.error(f'[WEBHOOK] Bot is not available: {e}')
+        return HttpResponse(status=503)
+    return HttpResponse()